@@ -0,0 +1,119 @@
+# language_cache.py
+"""
+언어 감지 결과 캐시 (메모리 LRU + 선택적 디스크 저장)
+"""
+import sqlite3
+import logging
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class LanguageCache:
+    """공백 제거한 텍스트를 키로 언어 감지 결과를 저장하는 캐시 클래스"""
+
+    def __init__(self, max_size=100000, cache_path=None, read_only=False):
+        self.max_size = max_size
+        self.cache_path = cache_path
+        # 읽기 전용: 디스크 캐시는 조회만 하고, 새 결과는 take_pending() 으로 넘겨 한 프로세스에서만 씀
+        # (여러 프로세스가 같은 SQLite 파일에 동시에 쓰지 않도록)
+        self.read_only = read_only
+        self._memory = OrderedDict()
+        self._pending = []  # 아직 디스크에 쓰지 않은 (텍스트, 언어) 목록
+        self._disk = None
+
+        # 적중/실패 횟수
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if cache_path:
+            self._open_disk(cache_path)
+
+    def _open_disk(self, cache_path):
+        """디스크 캐시(SQLite 파일) 열기"""
+        try:
+            if self.read_only:
+                self._disk = sqlite3.connect(Path(cache_path).resolve().as_uri() + '?mode=ro', uri=True)
+                self._disk.execute("SELECT 1 FROM language_cache LIMIT 1")
+            else:
+                self._disk = sqlite3.connect(cache_path)
+                self._disk.execute(
+                    "CREATE TABLE IF NOT EXISTS language_cache (text TEXT PRIMARY KEY, lang TEXT NOT NULL)"
+                )
+                self._disk.commit()
+            logger.info(f"언어 감지 디스크 캐시 사용: {cache_path}")
+        except sqlite3.Error as e:
+            logger.warning(f"디스크 캐시를 열 수 없어 메모리 캐시만 사용합니다: {e}")
+            self._disk = None
+
+    @staticmethod
+    def normalize(text):
+        """캐시 키 - 앞뒤 공백 제거한 문자열"""
+        return str(text).strip()
+
+    def get(self, key):
+        """캐시 조회 (메모리 -> 디스크 순), 없으면 None"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        if self._disk is not None:
+            row = self._disk.execute(
+                "SELECT lang FROM language_cache WHERE text = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                self._remember(key, row[0])
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def put(self, key, lang):
+        """감지 결과 저장"""
+        self._remember(key, lang)
+        if self._disk is not None or self.read_only:
+            self._pending.append((key, lang))
+
+    def _remember(self, key, lang):
+        """메모리 캐시에 저장, 최대 크기를 넘으면 가장 오래 안 쓴 항목 제거"""
+        self._memory[key] = lang
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def flush(self):
+        """새로 감지한 결과를 디스크에 반영 (읽기 전용이면 take_pending() 으로 가져갈 때까지 보관)"""
+        if self._disk is None or self.read_only or not self._pending:
+            return
+        self._disk.executemany(
+            "INSERT OR REPLACE INTO language_cache (text, lang) VALUES (?, ?)", self._pending
+        )
+        self._disk.commit()
+        self._pending = []
+
+    def take_pending(self):
+        """아직 디스크에 쓰지 않은 (텍스트, 언어) 목록을 꺼냄 (읽기 전용 캐시의 새 결과를 다른 프로세스에서 반영할 때)"""
+        pending, self._pending = self._pending, []
+        return pending
+
+    def close(self):
+        """디스크 캐시 반영 후 연결 종료"""
+        self.flush()
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def stats(self):
+        """캐시 적중 통계"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'size': len(self._memory),
+        }
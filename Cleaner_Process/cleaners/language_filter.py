@@ -3,9 +3,12 @@
 언어 감지 및 필터링 로직
 """
 import pandas as pd
+import numpy as np
 import re
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from langdetect import detect, DetectorFactory
+from cleaners.language_cache import LanguageCache
 
 # 언어 감지 결과의 일관성을 위해 시드 설정
 DetectorFactory.seed = 0
@@ -13,9 +16,38 @@ DetectorFactory.seed = 0
 logger = logging.getLogger(__name__)
 
 
+def _init_detect_worker():
+    """병렬 감지 워커 초기화 - 프로세스마다 한 번 시드 고정"""
+    DetectorFactory.seed = 0
+
+
+def _detect_chunk(texts):
+    """워커 프로세스에서 텍스트 묶음의 언어 감지"""
+    return [LanguageFilter.detect_language(text) for text in texts]
+
+
 class LanguageFilter:
     """언어 감지 및 필터링 클래스"""
     
+    # 단계별 판정 이름 (보고서 순서)
+    TIERS = ['missing', 'empty', 'short', 'numeric', 'korean', 'cache', 'langdetect']
+    
+    # 숫자/기호만 있는 문자열 (ASCII) - langdetect 는 특징이 없어 항상 실패(unknown)
+    NUMERIC_PATTERN = r'[0-9\s!-/:-@\[-`{-~]+'
+    
+    def __init__(self, cache=None, korean_threshold=0.8, workers=1, chunk_size=500):
+        # 여러 컬럼/파일에서 공유하는 감지 결과 캐시
+        self.cache = cache if cache is not None else LanguageCache()
+        # 글자 중 한글 비율이 이 값 이상이면 langdetect 없이 'ko' (None 이면 사용 안 함)
+        self.korean_threshold = korean_threshold
+        # 병렬 감지 설정 - workers 가 2 이상이면 프로세스 풀 사용, chunk_size 는 워커 하나에 넘길 텍스트 수
+        self.workers = workers
+        self.chunk_size = chunk_size
+        # 프로세스 풀은 처음 병렬 감지할 때 만들고 close() 까지 재사용 (컬럼/청크마다 프로세스를 새로 띄우지 않음)
+        self._executor = None
+        # 마지막 필터링에서 단계별로 판정한 셀 수
+        self.last_report = {}
+    
     @staticmethod
     def detect_language(text):
         """텍스트의 언어 감지"""
@@ -36,47 +68,192 @@ class LanguageFilter:
         except:
             return 'unknown'
     
-    @classmethod
-    def filter_by_language(cls, df, text_columns=None, target_language='ko'):
-        """언어 감지 및 필터링"""
-        logger.info("언어 감지 및 필터링 시작...")
+    def classify_scripts(self, texts):
+        """
+        문자 구성 비율로 빠르게 판정 (공백 제거된 문자열 배열 대상, 벡터 연산)
+        반환: (언어 배열 - 판정 못한 값은 None, 단계 이름 배열)
+        """
+        texts = pd.Series(texts, dtype=object)
+        length = texts.str.len().to_numpy()
+        hangul = texts.str.count(r'[가-힣]').to_numpy()
+        letters = texts.str.count(r'[^\W\d_]').to_numpy()  # 유니코드 문자(한글/영문 등)
+        numeric = texts.str.fullmatch(self.NUMERIC_PATTERN).to_numpy(dtype=bool)
+
+        langs = np.full(len(texts), None, dtype=object)
+        tiers = np.full(len(texts), 'langdetect', dtype=object)
+
+        # 빈 문자열 -> unknown
+        empty = length == 0
+        # 3글자 미만 -> 한글이 있으면 ko, 없으면 unknown (기존 규칙과 동일)
+        short = ~empty & (length < 3)
+        # 숫자/기호만 -> unknown
+        numeric = ~empty & ~short & numeric
+        # 한글 비율이 충분히 높으면 ko
+        korean = np.zeros(len(texts), dtype=bool)
+        if self.korean_threshold is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                hangul_ratio = np.where(letters > 0, hangul / letters, 0.0)
+            korean = ~empty & ~short & ~numeric & (hangul > 0) & (hangul_ratio >= self.korean_threshold)
+
+        langs[empty] = 'unknown'
+        langs[short] = np.where(hangul[short] > 0, 'ko', 'unknown')
+        langs[numeric] = 'unknown'
+        langs[korean] = 'ko'
+        tiers[empty] = 'empty'
+        tiers[short] = 'short'
+        tiers[numeric] = 'numeric'
+        tiers[korean] = 'korean'
+        return langs, tiers
+    
+    def _detect_many(self, texts):
+        """텍스트 목록의 언어 감지 (입력 순서대로 반환), 양이 많으면 프로세스 풀로 병렬 처리"""
+        if self.workers <= 1 or len(texts) <= self.chunk_size:
+            return [self.detect_language(text) for text in texts]
         
-        if text_columns is None:
-            text_columns = df.select_dtypes(include=['object']).columns.tolist()
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        logger.info(f"병렬 언어 감지: {len(texts)}개 텍스트, {len(chunks)}개 묶음, 워커 {self.workers}개")
         
-        df_with_lang = df.copy()
-        language_results = []
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_detect_worker)
         
-        for idx, row in df_with_lang.iterrows():
-            row_languages = []
-            for col in text_columns:
-                lang = cls.detect_language(row[col])
-                row_languages.append(lang)
-            
-            # 한국어가 하나라도 있으면 한국어로 분류
-            if target_language in row_languages:
-                language_results.append(target_language)
-            elif 'unknown' in row_languages and len(set(row_languages)) == 1:
-                language_results.append('unknown')
+        results = []
+        # map 은 입력 순서대로 결과를 돌려줌
+        for chunk_result in self._executor.map(_detect_chunk, chunks):
+            results.extend(chunk_result)
+        return results
+    
+    def close(self):
+        """병렬 감지용 프로세스 풀 종료"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def _detect_language_matrix(self, df, text_columns):
+        """
+        컬럼별 고유값만 언어 감지 후 (행 수 x 컬럼 수) 언어 번호 행렬로 펼침
+        반환: (행렬, 언어 목록) - 행렬 값은 언어 목록의 인덱스
+        """
+        # 1. 컬럼별 고유값 (codes: 각 행이 몇 번째 고유값인지, 결측치는 -1)
+        column_codes = []
+        column_uniques = []
+        for col in text_columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                # 범주형 컬럼은 이미 있는 정수 코드와 범주 목록을 그대로 사용
+                codes = df[col].cat.codes.to_numpy()
+                uniques = df[col].cat.categories
             else:
+                codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+            column_codes.append(codes)
+            column_uniques.append(np.asarray(uniques, dtype=object))
+
+        # 2. 모든 컬럼의 고유값을 공백 제거한 문자열 키로 합쳐서 한 번씩만 판정
+        all_uniques = np.concatenate(column_uniques) if column_uniques else np.array([], dtype=object)
+        keys = pd.Series(all_uniques, dtype=object).map(LanguageCache.normalize)
+        key_codes, distinct_keys = pd.factorize(keys)
+        distinct_keys = np.asarray(distinct_keys, dtype=object)
+
+        key_langs, key_tiers = self.classify_scripts(distinct_keys)
+
+        # 3. 애매한 나머지만 캐시 -> langdetect
+        to_detect = []
+        for k in np.flatnonzero(pd.isna(key_langs)):
+            lang = self.cache.get(distinct_keys[k])
+            if lang is None:
+                to_detect.append(k)
+            else:
+                key_tiers[k] = 'cache'
+                key_langs[k] = lang
+
+        detected = self._detect_many([distinct_keys[k] for k in to_detect])
+        for k, lang in zip(to_detect, detected):
+            self.cache.put(distinct_keys[k], lang)
+            key_langs[k] = lang
+
+        languages = ['unknown'] + sorted(set(key_langs) - {'unknown'})
+        language_ids = {lang: i for i, lang in enumerate(languages)}
+        key_lang_ids = np.array([language_ids[lang] for lang in key_langs], dtype=np.int32)
+
+        # 4. 행렬로 펼치기 + 단계별 셀 수 집계
+        report = dict.fromkeys(self.TIERS, 0)
+        tier_ids = np.array([self.TIERS.index(tier) for tier in key_tiers], dtype=np.int64)
+        matrix = np.zeros((len(df), len(text_columns)), dtype=np.int32)
+        offset = 0
+        for j, codes in enumerate(column_codes):
+            n_uniques = len(column_uniques[j])
+            unique_key_codes = key_codes[offset:offset + n_uniques]
+            offset += n_uniques
+
+            # 마지막 칸은 결측치(-1) 용 'unknown'
+            unique_ids = np.append(key_lang_ids[unique_key_codes], 0)
+            matrix[:, j] = unique_ids[codes]
+
+            report['missing'] += int((codes == -1).sum())
+            cell_tiers = np.bincount(
+                tier_ids[unique_key_codes], weights=np.bincount(codes[codes >= 0], minlength=n_uniques),
+                minlength=len(self.TIERS)
+            )
+            for tier, count in zip(self.TIERS, cell_tiers):
+                report[tier] += int(count)
+
+        self.last_report = report
+        return matrix, languages
+    
+    @staticmethod
+    def _decide_row_languages(matrix, languages, target_language):
+        """행 단위 언어 판정 (한국어 우선 -> 전부 unknown -> 최다 언어)"""
+        n_rows = matrix.shape[0]
+        unknown_id = 0
+        target_id = languages.index(target_language) if target_language in languages else -1
+
+        # 한국어가 하나라도 있으면 한국어로 분류
+        has_target = (matrix == target_id).any(axis=1)
+        all_unknown = (matrix == unknown_id).all(axis=1)
+
+        verdict = np.full(n_rows, unknown_id, dtype=np.int32)
+        verdict[has_target] = target_id
+        
+        # 나머지 행은 가장 많이 나온 언어로 분류
+        rest = np.flatnonzero(~has_target & ~all_unknown)
+        if len(rest):
+            sub = matrix[rest]
+            counts = np.stack(
+                [(sub == lang_id).sum(axis=1) for lang_id in range(len(languages))],
+                axis=1
+            )
+            top = counts.max(axis=1)
+            verdict[rest] = counts.argmax(axis=1)
+
+            # 최다 언어가 동점인 행은 기존 value_counts() 결과와 같도록 그대로 계산
+            tied = (counts == top[:, None]).sum(axis=1) > 1
+            for pos in np.flatnonzero(tied):
+                row_languages = [languages[lang_id] for lang_id in sub[pos]]
                 lang_counts = pd.Series(row_languages).value_counts()
-                language_results.append(lang_counts.index[0])
+                verdict[rest[pos]] = languages.index(lang_counts.index[0])
+
+        return np.array(languages, dtype=object)[verdict]
+    
+    def filter_by_language(self, df, text_columns=None, target_language='ko'):
+        """언어 감지 및 필터링"""
+        logger.info("언어 감지 및 필터링 시작...")
+        
+        if text_columns is None:
+            text_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
         
-        df_with_lang['detected_language'] = language_results
+        # 고유값 단위 감지 -> 행렬로 펼친 뒤 행별 판정
+        matrix, languages = self._detect_language_matrix(df, text_columns)
+        detected_language = self._decide_row_languages(matrix, languages, target_language)
+        self.cache.flush()
         
         # 목표 언어 데이터만 필터링 / 한국어 컬럼이 하나라도 있는 행 & 모든 컬럼이 판단 불가능한 행(unknown)
         if target_language == 'ko':
-            filtered_df = df_with_lang[
-                (df_with_lang['detected_language'] == 'ko') | 
-                (df_with_lang['detected_language'] == 'unknown')
-            ].copy()
+            keep_mask = (detected_language == 'ko') | (detected_language == 'unknown')
         else:
-            filtered_df = df_with_lang[
-                df_with_lang['detected_language'] == target_language
-            ].copy()
+            keep_mask = detected_language == target_language
         
-        # 언어 감지 컬럼 제거,
-        filtered_df = filtered_df.drop('detected_language', axis=1)
+        # 지정한 언어가 아닌 데이터는 모두 제거,
+        filtered_df = df[keep_mask].copy()
         
+        logger.info(f"언어 판정 단계별 셀 수: {self.last_report}")
+        logger.info(f"언어 감지 캐시 통계: {self.cache.stats()}")
         logger.info(f"언어 필터링 완료: {len(filtered_df)}행 남음")
         return filtered_df
\ No newline at end of file
@@ -0,0 +1,367 @@
+"""
+PostgreSQL COPY 기반 대량 적재 유틸리티
+
+행마다 INSERT ... ON CONFLICT 를 실행하는 대신, 테이블별로
+1) 임시 스테이징 테이블을 만들고
+2) COPY FROM STDIN 으로 모든 행을 한 번에 밀어 넣은 뒤
+3) INSERT ... SELECT ... ON CONFLICT 한 번으로 본 테이블에 병합한다.
+
+초기 적재 / 백필처럼 행이 아주 많을 때는 BulkLoadSession 안에서 실행하면
+인덱스와 제약조건을 지운 채 적재하고 끝날 때 한 번에 다시 만든다.
+"""
+import io
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from pg_binary import column_types, copy_binary
+
+# COPY 한 번에 보낼 최대 행 수 (메모리 사용량 제한용)
+COPY_CHUNK_ROWS = 50000
+# 바이너리 COPY 사용 (대상 컬럼 타입을 모두 지원하고 값 변환이 가능한 청크만, 나머지는 text COPY)
+COPY_BINARY = True
+# BulkLoadSession 에서 인덱스를 다시 만들 때 인덱스 하나에 쓰는 병렬 작업자 수 / 메모리
+BULK_MAINTENANCE_WORKERS = 4
+BULK_MAINTENANCE_WORK_MEM = '512MB'
+
+# 연결별로 진행 중인 BulkLoadSession (bulk_upsert 가 세션 대상 테이블이면 세션으로 적재)
+_sessions = {}
+
+
+def create_staging_table(cur, target, columns):
+    """대상 테이블과 같은 타입의 임시 스테이징 테이블 생성 (커밋 시 자동 삭제)"""
+    staging = f"_stage_{target.lower()}"
+    cur.execute(f"DROP TABLE IF EXISTS {staging};")
+    cur.execute(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT {', '.join(columns)} FROM {target} WITH NO DATA;"
+    )
+    # 엑셀 행 순서를 기억해 두었다가 중복 키 처리 시 사용
+    cur.execute(f"ALTER TABLE {staging} ADD COLUMN _seq BIGSERIAL;")
+    return staging
+
+
+def _to_copy_text(value):
+    """값 하나를 COPY text 형식으로 변환 (결측치는 \\N, 특수문자는 이스케이프)"""
+    if value is None:
+        return '\\N'
+    try:
+        if pd.isna(value):
+            return '\\N'
+    except (TypeError, ValueError):
+        pass
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def _copy_chunk(cur, table, columns, chunk, kinds):
+    """행 묶음 하나를 적재 - 가능하면 바이너리 COPY, 아니면 text COPY"""
+    if kinds is not None:
+        try:
+            # 파이썬 값을 그대로 두어야 큰 정수/날짜가 변환 없이 인코딩됨
+            frame = chunk if isinstance(chunk, pd.DataFrame) else pd.DataFrame(chunk, columns=columns, dtype=object)
+            return copy_binary(cur, table, columns, frame, kinds)
+        except (ValueError, TypeError):
+            pass
+
+    if isinstance(chunk, pd.DataFrame):
+        chunk = list(chunk.itertuples(index=False, name=None))
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    lines = ['\t'.join(_to_copy_text(v) for v in row) for row in chunk]
+    cur.copy_expert(sql, io.StringIO('\n'.join(lines) + '\n'))
+    return len(chunk)
+
+
+def copy_rows(cur, table, columns, rows, chunk_rows=COPY_CHUNK_ROWS, binary=COPY_BINARY):
+    """
+    튜플 행들을 COPY FROM STDIN 으로 테이블에 적재 (바이너리 형식 우선, 안 되면 text 형식)
+    rows 가 DataFrame 이면 (예: survey_transform 결과) 행 변환 없이 컬럼 단위로 청크를 나눔
+    """
+    kinds = None
+    if binary:
+        kinds = column_types(cur, table, columns)
+        if None in kinds:
+            kinds = None
+
+    total = 0
+    if isinstance(rows, pd.DataFrame):
+        frame = rows[list(columns)]
+        for start in range(0, len(frame), chunk_rows):
+            total += _copy_chunk(cur, table, columns, frame.iloc[start:start + chunk_rows], kinds)
+        return total
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            total += _copy_chunk(cur, table, columns, chunk, kinds)
+            chunk = []
+
+    if chunk:
+        total += _copy_chunk(cur, table, columns, chunk, kinds)
+    return total
+
+
+def bulk_upsert(cur, target, columns, rows, conflict_columns,
+                update_columns=(), now_columns=(), keep='last'):
+    """
+    스테이징 테이블 + 집합 단위 INSERT ... ON CONFLICT 로 행들을 병합
+
+    - update_columns 가 비어 있으면 ON CONFLICT DO NOTHING
+    - now_columns 는 INSERT/UPDATE 시 모두 NOW() 로 채울 컬럼 (예: updated_at)
+    - keep: 같은 키가 여러 번 나올 때 남길 행.
+      행 단위 DO UPDATE 는 마지막 행이, DO NOTHING 은 첫 번째 행이 남으므로
+      각각 'last', 'first' 를 넘기면 기존 결과와 동일해진다.
+    - BulkLoadSession 이 인덱스를 지운 테이블이면 세션의 병합 방식(UPDATE + INSERT)으로 적재
+    """
+    session = _sessions.get(id(cur.connection))
+    if session is not None and session.handles(target, conflict_columns):
+        return session.upsert(target, columns, rows, conflict_columns, update_columns, now_columns, keep)
+
+    staging = create_staging_table(cur, target, columns)
+    copied = copy_rows(cur, staging, columns, rows)
+    if copied == 0:
+        return 0
+
+    order = 'DESC' if keep == 'last' else 'ASC'
+    conflict = ', '.join(conflict_columns)
+    insert_columns = list(columns) + list(now_columns)
+    select_columns = list(columns) + ['NOW()'] * len(now_columns)
+
+    set_clauses = [f"{col} = EXCLUDED.{col}" for col in update_columns]
+    set_clauses += [f"{col} = NOW()" for col in now_columns]
+    if set_clauses:
+        action = f"DO UPDATE SET {', '.join(set_clauses)}"
+    else:
+        action = "DO NOTHING"
+
+    cur.execute(
+        f"INSERT INTO {target} ({', '.join(insert_columns)}) "
+        f"SELECT {', '.join(select_columns)} FROM ("
+        f"SELECT DISTINCT ON ({conflict}) * FROM {staging} "
+        f"ORDER BY {conflict}, _seq {order}"
+        f") s ON CONFLICT ({conflict}) {action};"
+    )
+    return cur.rowcount
+
+
+def _quote(identifier):
+    """PostgreSQL 식별자 따옴표 처리"""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+class BulkLoadSession:
+    """
+    초기 적재 / 백필용 대량 적재 모드 (with 블록)
+
+    1) 스키마 조회: 대상 테이블의 PK/UNIQUE, FK, 일반/UNIQUE 인덱스
+    2) 삭제: FK, PK/UNIQUE 제약조건과 UNIQUE 인덱스 (다른 테이블의 FK 가 참조하면 유지), 일반 인덱스
+       식 / 부분 / NULLS NOT DISTINCT UNIQUE 인덱스는 컬럼 중복 검사로 대신할 수 없으므로 유지
+    3) 적재: 블록 안의 bulk_upsert 는 ON CONFLICT 대신 스테이징 중복 제거 후 UPDATE + INSERT (해시 조인)
+    4) 검증: 지운 PK/UNIQUE 키 컬럼에 중복 키가 없는지 확인
+    5) 재생성: 인덱스를 하나씩 순서대로 만들되, 인덱스 하나는 max_parallel_maintenance_workers 로 나눠 정렬
+       (지운 인덱스와 적재한 행이 아직 커밋 전이라 다른 연결에서 동시에 만들 수는 없음), FK 재검증, ANALYZE
+
+    DDL 도 같은 트랜잭션이므로 도중에 실패해서 롤백하면 인덱스/제약조건도 원래대로 돌아간다.
+    대신 커밋할 때까지 대상 테이블은 잠겨 있으므로 다른 작업이 없는 초기 적재 / 백필에만 사용.
+    단계별 걸린 시간(초)은 timings 에 남음.
+    """
+
+    def __init__(self, cur, tables, workers=BULK_MAINTENANCE_WORKERS, work_mem=BULK_MAINTENANCE_WORK_MEM):
+        self.cur = cur
+        # 따옴표 없는 식별자는 소문자로 저장됨
+        self.tables = [table.lower() for table in tables]
+        self.workers = workers
+        self.work_mem = work_mem
+        self.timings = {}
+        self._constraints = []   # (테이블, 이름, 정의, 종류) - 삭제한 PK/UNIQUE/FK
+        self._indexes = []       # (테이블, 이름, CREATE INDEX 문) - 삭제한 일반/UNIQUE 인덱스
+        self._unique_keys = []   # (테이블, 이름, 컬럼 목록) - 삭제한 PK/UNIQUE 제약조건과 UNIQUE 인덱스
+
+    @contextmanager
+    def _phase(self, name):
+        """단계별 시간 누적"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    def __enter__(self):
+        with self._phase('스키마 조회'):
+            for table in self.tables:
+                self._introspect(table)
+        with self._phase('인덱스 삭제'):
+            # FK 를 먼저 지워야 PK/UNIQUE 를 지울 수 있음
+            for table, name, _, kind in sorted(self._constraints, key=lambda c: c[3] != 'f'):
+                self.cur.execute(f"ALTER TABLE {table} DROP CONSTRAINT {_quote(name)};")
+            for table, name, _ in self._indexes:
+                self.cur.execute(f"DROP INDEX {name};")
+        _sessions[id(self.cur.connection)] = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _sessions.pop(id(self.cur.connection), None)
+        if exc_type is not None:
+            # 호출한 쪽에서 롤백하면 지운 인덱스도 복구됨
+            return False
+        with self._phase('중복 검증'):
+            self._validate()
+        with self._phase('인덱스 재생성'):
+            self._rebuild()
+        with self._phase('ANALYZE'):
+            for table in self.tables:
+                self.cur.execute(f"ANALYZE {table};")
+        print("-> 대량 적재 단계별 시간: " + ", ".join(f"{name} {seconds:.2f}초" for name, seconds in self.timings.items()))
+        return False
+
+    def _introspect(self, table):
+        """테이블의 제약조건과 일반/UNIQUE 인덱스 조회"""
+        self.cur.execute(
+            """
+            SELECT con.conname, con.contype, pg_get_constraintdef(con.oid),
+                   ARRAY(
+                       SELECT a.attname::text
+                       FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, n)
+                       JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+                       ORDER BY k.n
+                   ),
+                   EXISTS (
+                       SELECT 1 FROM pg_constraint ref
+                       WHERE ref.contype = 'f' AND ref.confrelid = con.conrelid
+                         AND ref.conindid = con.conindid AND ref.conrelid <> con.conrelid
+                   )
+            FROM pg_constraint con
+            WHERE con.conrelid = to_regclass(%s) AND con.contype IN ('p', 'u', 'f')
+            ORDER BY con.conname;
+            """,
+            (table,)
+        )
+        for name, kind, definition, key_columns, referenced in self.cur.fetchall():
+            if referenced:
+                # 다른 테이블의 FK 가 참조하는 키는 지울 수 없으므로 유지 (이 키로는 ON CONFLICT 그대로 사용)
+                continue
+            self._constraints.append((table, name, definition, kind))
+            if kind in ('p', 'u'):
+                self._unique_keys.append((table, name, key_columns))
+
+        self.cur.execute(
+            """
+            SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid), i.indisunique,
+                   i.indexprs IS NULL AND i.indpred IS NULL
+                       AND pg_get_indexdef(i.indexrelid) NOT LIKE '%%NULLS NOT DISTINCT%%',
+                   ARRAY(
+                       SELECT a.attname::text
+                       FROM unnest(i.indkey::smallint[]) WITH ORDINALITY AS k(attnum, n)
+                       JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                       ORDER BY k.n
+                   ),
+                   EXISTS (
+                       SELECT 1 FROM pg_constraint ref
+                       WHERE ref.contype = 'f' AND ref.conindid = i.indexrelid AND ref.conrelid <> i.indrelid
+                   )
+            FROM pg_index i
+            WHERE i.indrelid = to_regclass(%s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint con
+                  WHERE con.conindid = i.indexrelid AND con.conrelid = i.indrelid
+              )
+            ORDER BY 1;
+            """,
+            (table,)
+        )
+        for name, definition, unique, plain_columns, key_columns, referenced in self.cur.fetchall():
+            if unique:
+                # 제약조건 없이 만든 UNIQUE 인덱스도 ON CONFLICT 대상이므로 PK/UNIQUE 와 같이 처리
+                # 컬럼 중복 검사로 대신할 수 없는 인덱스(식/부분/NULLS NOT DISTINCT)나 다른 테이블의 FK 가 참조하는 인덱스는 유지
+                if referenced or not plain_columns:
+                    continue
+                self._unique_keys.append((table, name, key_columns))
+            self._indexes.append((table, name, definition))
+
+    def handles(self, target, conflict_columns):
+        """target 의 conflict_columns 키(PK/UNIQUE)를 이 세션이 지웠는지"""
+        return any(
+            table == target.lower() and sorted(columns) == sorted(conflict_columns)
+            for table, _, columns in self._unique_keys
+        )
+
+    def upsert(self, target, columns, rows, conflict_columns, update_columns=(), now_columns=(), keep='last'):
+        """
+        인덱스 없이 bulk_upsert 와 같은 결과로 병합
+        스테이징에서 키마다 한 행만 남긴 뒤, 이미 있는 키는 UPDATE (update/now 컬럼이 있을 때), 없는 키는 INSERT
+        """
+        with self._phase('적재'):
+            staging = create_staging_table(self.cur, target, columns)
+            copied = copy_rows(self.cur, staging, columns, rows)
+            if copied == 0:
+                return 0
+
+            order = 'DESC' if keep == 'last' else 'ASC'
+            conflict = ', '.join(conflict_columns)
+            deduped = (
+                f"(SELECT DISTINCT ON ({conflict}) * FROM {staging} "
+                f"ORDER BY {conflict}, _seq {order}) s"
+            )
+            match = ' AND '.join(f"t.{col} = s.{col}" for col in conflict_columns)
+
+            merged = 0
+            set_clauses = [f"{col} = s.{col}" for col in update_columns]
+            set_clauses += [f"{col} = NOW()" for col in now_columns]
+            if set_clauses:
+                self.cur.execute(f"UPDATE {target} t SET {', '.join(set_clauses)} FROM {deduped} WHERE {match};")
+                merged += self.cur.rowcount
+
+            insert_columns = list(columns) + list(now_columns)
+            select_columns = [f"s.{col}" for col in columns] + ['NOW()'] * len(now_columns)
+            self.cur.execute(
+                f"INSERT INTO {target} ({', '.join(insert_columns)}) "
+                f"SELECT {', '.join(select_columns)} FROM {deduped} "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {target} t WHERE {match});"
+            )
+            return merged + self.cur.rowcount
+
+    def _validate(self):
+        """지운 PK/UNIQUE 키에 중복이 생기지 않았는지 확인 (NULL 은 UNIQUE 에서 중복으로 보지 않음)"""
+        for table, name, key_columns in self._unique_keys:
+            keys = ', '.join(_quote(col) for col in key_columns)
+            not_null = ' AND '.join(f"{_quote(col)} IS NOT NULL" for col in key_columns)
+            self.cur.execute(
+                f"SELECT {keys}, COUNT(*) FROM {table} WHERE {not_null} "
+                f"GROUP BY {keys} HAVING COUNT(*) > 1 LIMIT 5;"
+            )
+            duplicates = self.cur.fetchall()
+            if duplicates:
+                raise ValueError(f"{table} 의 {name} 키가 중복됩니다 (예: {duplicates})")
+
+    def _rebuild(self):
+        """PK/UNIQUE -> 일반/UNIQUE 인덱스 -> FK 순서로 하나씩 다시 생성 (인덱스 하나는 병렬 작업자가 나눠 정렬)"""
+        self.cur.execute(
+            "SELECT current_setting('max_parallel_maintenance_workers'), current_setting('maintenance_work_mem');"
+        )
+        previous_workers, previous_work_mem = self.cur.fetchone()
+        self.cur.execute(
+            "SELECT set_config('max_parallel_maintenance_workers', %s, true), "
+            "set_config('maintenance_work_mem', %s, true);",
+            (str(self.workers), self.work_mem)
+        )
+        for table, name, definition, kind in self._constraints:
+            if kind != 'f':
+                self.cur.execute(f"ALTER TABLE {table} ADD CONSTRAINT {_quote(name)} {definition};")
+        for _, _, definition in self._indexes:
+            self.cur.execute(definition + ';')
+        for table, name, definition, kind in self._constraints:
+            if kind == 'f':
+                self.cur.execute(f"ALTER TABLE {table} ADD CONSTRAINT {_quote(name)} {definition};")
+        # 트랜잭션의 나머지 작업은 원래 설정으로
+        self.cur.execute(
+            "SELECT set_config('max_parallel_maintenance_workers', %s, true), "
+            "set_config('maintenance_work_mem', %s, true);",
+            (previous_workers, previous_work_mem)
+        )
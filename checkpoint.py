@@ -0,0 +1,123 @@
+"""
+분할 커밋 + 체크포인트 (IMPORT_CHECKPOINTS 테이블)
+
+큰 파일을 한 트랜잭션으로 적재하면 마지막 몇 행에서 오류가 나도 처음부터 다시 해야 하고,
+트랜잭션이 길어서 잠금과 WAL 도 오래 붙잡는다.
+응답 행을 사용자 단위 청크로 나눠 청크마다 커밋하고, 커밋할 때 같은 트랜잭션에서
+(파일 내용 해시, 시트, 모드) -> 다음 청크 번호를 기록해 둔다.
+다시 실행하면 마지막으로 커밋한 청크 다음부터 이어서 적재한다.
+- 체크포인트가 데이터와 같은 트랜잭션으로 커밋되므로 청크를 건너뛰거나 두 번 반영하지 않음
+- 같은 사용자의 행은 모두 그 사용자가 처음 나온 행의 청크에 넣음 (사용자 단위 삭제/갱신이 청크를 넘지 않도록)
+- 파일 내용이 바뀌면 해시가 달라지므로 처음부터 적재
+- atomic=True 이면 기존처럼 전체를 한 트랜잭션으로 (커밋은 호출한 쪽에서)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from excel_cache import file_content_hash
+
+CHECKPOINT_TABLE = 'IMPORT_CHECKPOINTS'
+# 청크 하나에 넣을 응답 시트 행 수
+CHECKPOINT_CHUNK_ROWS = 50000
+
+
+def ensure_checkpoint_table(cur):
+    """체크포인트 테이블이 없으면 생성"""
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            content_hash CHAR(64) NOT NULL,
+            sheet TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            file_name TEXT,
+            chunk_rows INTEGER NOT NULL,
+            next_chunk INTEGER NOT NULL,
+            total_chunks INTEGER NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (content_hash, sheet, mode)
+        );
+        """
+    )
+
+
+def chunk_numbers(user_ids, chunk_rows):
+    """행마다 청크 번호 (같은 사용자의 행은 그 사용자가 처음 나온 행의 청크)"""
+    codes, _ = pd.factorize(np.asarray(user_ids, dtype=object))
+    positions = np.arange(len(codes))
+    first_position = pd.Series(positions).groupby(codes).transform('min').to_numpy()
+    return first_position // chunk_rows
+
+
+class ChunkedImport:
+    """
+    응답 시트를 사용자 단위 청크로 나눠 커밋하는 적재
+
+    plan = ChunkedImport(cur, file_path, sheet, mode, user_ids)  # user_ids: 응답 시트 행 순서의 사용자 ID
+    for chunk, users in plan.pending_chunks():                   # 이미 커밋한 청크는 건너뜀
+        ... users 의 행만 저장 ...
+        plan.commit(chunk)                                       # 체크포인트 기록 + 커밋
+    plan.finish()                                                # 체크포인트 삭제 (마지막 커밋은 호출한 쪽에서)
+    """
+
+    def __init__(self, cur, file_path, sheet, mode, user_ids,
+                 chunk_rows=CHECKPOINT_CHUNK_ROWS, atomic=False):
+        self.cur = cur
+        self.key = (file_content_hash(file_path), str(sheet), mode)
+        self.file_name = os.path.basename(file_path)
+        self.atomic = atomic
+        self.chunk_rows = chunk_rows
+        self.next_chunk = 0
+        self.user_ids = pd.Series(np.asarray(user_ids, dtype=object))
+
+        if not atomic:
+            ensure_checkpoint_table(cur)
+            cur.execute(
+                f"SELECT chunk_rows, next_chunk, total_chunks, updated_at FROM {CHECKPOINT_TABLE} "
+                "WHERE content_hash = %s AND sheet = %s AND mode = %s;",
+                self.key
+            )
+            previous = cur.fetchone()
+            if previous is not None:
+                # 이어서 적재할 때는 지난번 청크 크기를 그대로 사용해야 청크 경계가 같음
+                self.chunk_rows, self.next_chunk, total_chunks, updated_at = previous
+                print(f"-> 체크포인트에서 이어서 적재합니다: {updated_at:%Y-%m-%d %H:%M} 까지 "
+                      f"{self.next_chunk}/{total_chunks} 청크 커밋됨")
+
+        if atomic:
+            self.chunks = np.zeros(len(self.user_ids), dtype=np.int64)
+        else:
+            self.chunks = chunk_numbers(self.user_ids, self.chunk_rows)
+        self.total_chunks = int(self.chunks.max()) + 1 if len(self.chunks) else 0
+
+    def pending_chunks(self):
+        """아직 커밋하지 않은 (청크 번호, 그 청크의 사용자 ID Index)"""
+        for chunk in range(self.next_chunk, self.total_chunks):
+            yield chunk, pd.Index(self.user_ids[self.chunks == chunk].unique())
+
+    def commit(self, chunk):
+        """청크 하나를 체크포인트와 함께 커밋 (atomic 이면 아무것도 안 함)"""
+        if self.atomic:
+            return
+        self.cur.execute(
+            f"""
+            INSERT INTO {CHECKPOINT_TABLE} (content_hash, sheet, mode, file_name, chunk_rows, next_chunk, total_chunks, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+            ON CONFLICT (content_hash, sheet, mode) DO UPDATE SET
+                file_name = EXCLUDED.file_name, next_chunk = EXCLUDED.next_chunk, updated_at = NOW();
+            """,
+            self.key + (self.file_name, self.chunk_rows, chunk + 1, self.total_chunks)
+        )
+        self.cur.connection.commit()
+        self.next_chunk = chunk + 1
+        print(f"  ... 청크 {chunk + 1} / {self.total_chunks} 커밋 완료")
+
+    def finish(self):
+        """모든 청크를 적재했으면 체크포인트 삭제 (호출한 쪽의 마지막 커밋에 포함)"""
+        if self.atomic:
+            return
+        self.cur.execute(
+            f"DELETE FROM {CHECKPOINT_TABLE} WHERE content_hash = %s AND sheet = %s AND mode = %s;",
+            self.key
+        )
@@ -1,4 +1,9 @@
+import atexit
+import threading
+import time
+
 import psycopg2
+from psycopg2 import extensions, pool as pg_pool
 
 # DB 접속 정보
 DB_CONFIG = {
@@ -9,21 +14,211 @@ DB_CONFIG = {
     "port": "5432"
 }
 
+# 커넥션 풀 설정 (프로세스 안의 모든 업로드 스크립트가 DB 접속 정보별로 풀 하나를 공유)
+POOL_CONFIG = {
+    "pool_size": 2,           # 반환 후에도 열어 두는 연결 수
+    "max_overflow": 8,        # 모자랄 때 추가로 여는 연결 수 (반환 시 닫음)
+    "timeout": 30,            # 빈 연결을 기다리는 최대 시간(초)
+    "health_check": True,     # 꺼낼 때 SELECT 1 로 끊긴 연결인지 확인
+    # 연결마다 적용할 세션 설정 (대량 적재용)
+    # synchronous_commit 처럼 내구성을 낮추는 설정은 기본값에 넣지 않음
+    # (필요한 스크립트만 get_connection(DB_CONFIG, {**POOL_CONFIG, "session_settings": {...}}) 으로 별도 풀 사용)
+    "session_settings": {
+        "work_mem": "64MB",
+        "maintenance_work_mem": "256MB",
+    },
+}
+
+
+class PoolTimeout(pg_pool.PoolError):
+    """timeout 안에 빈 연결을 얻지 못함"""
+
+
+class ConnectionPool:
+    """크기/초과 한도, 꺼낼 때 상태 확인, 대기 시간 통계를 갖춘 psycopg2 커넥션 풀"""
+
+    def __init__(self, db_config, pool_size=2, max_overflow=8, timeout=30,
+                 health_check=True, session_settings=None):
+        self.timeout = timeout
+        self.health_check = health_check
+        self.max_connections = pool_size + max_overflow
+        # 끊긴 연결을 버리고 다시 꺼내는 최대 횟수 (보관 중인 연결이 모두 끊겼어도 새 연결까지는 시도)
+        self.max_retries = max(pool_size, 1)
+
+        # 세션 설정은 접속 시 시작 옵션으로 전달 (연결마다 SET 을 따로 보내지 않음)
+        # 접속 정보에 이미 options 가 있으면 그 뒤에 덧붙임 (같은 설정이면 뒤의 값이 적용됨)
+        connect_kwargs = dict(db_config)
+        if session_settings:
+            options = [connect_kwargs["options"]] if connect_kwargs.get("options") else []
+            options += [f"-c {name}={value}" for name, value in session_settings.items()]
+            connect_kwargs["options"] = " ".join(options)
+        # psycopg2 풀: minconn 개까지만 반환된 연결을 보관하고 나머지는 닫음
+        self._pool = pg_pool.ThreadedConnectionPool(pool_size, self.max_connections, **connect_kwargs)
+        # 풀이 가득 찼을 때 오류 대신 기다리도록 슬롯 수를 세마포어로 관리
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.discarded = 0
+
+    def getconn(self):
+        """연결 꺼내기 (빈 연결이 없으면 timeout 초까지 대기)"""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"{self.timeout}초 안에 DB 연결을 얻지 못했습니다 (최대 {self.max_connections}개)")
+        try:
+            conn = self._pool.getconn()
+            retries = 0
+            while not self._is_healthy(conn):
+                with self._lock:
+                    self.discarded += 1
+                self._pool.putconn(conn, close=True)
+                # 새로 연 연결도 계속 실패하면 (서버 이상 등) 무한히 다시 열지 않고 중단
+                if retries >= self.max_retries:
+                    raise psycopg2.OperationalError(
+                        f"상태 확인에 {retries + 1}번 연속 실패해 DB 연결을 얻지 못했습니다"
+                    )
+                retries += 1
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return conn
+
+    def _is_healthy(self, conn):
+        """끊긴 연결인지 확인"""
+        if conn.closed:
+            return False
+        if not self.health_check:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def putconn(self, conn):
+        """연결 반환 (끝나지 않은 트랜잭션은 롤백해서 다음 사용자에게 깨끗한 상태로)"""
+        try:
+            close = bool(conn.closed)
+            if not close and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+            self._pool.putconn(conn, close=close)
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        """대기 시간 통계"""
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "total_wait": self.total_wait,
+                "avg_wait": self.total_wait / self.checkouts if self.checkouts else 0.0,
+                "max_wait": self.max_wait,
+                "discarded": self.discarded,
+            }
+
+    def closeall(self):
+        """모든 연결 종료"""
+        if not self._pool.closed:
+            self._pool.closeall()
+
+
+# (DB 접속 정보, 풀 설정)별 풀 (프로세스 전체에서 공유)
+_pools = {}
+# 꺼낸 연결 -> 돌려줄 풀
+_owners = {}
+_registry_lock = threading.Lock()
+
+
+def _pool_key(db_config, pool_config):
+    """풀을 구분하는 키 (세션 설정이 다르면 다른 풀)"""
+    settings = tuple(sorted((pool_config.get("session_settings") or {}).items()))
+    options = tuple(sorted((name, value) for name, value in pool_config.items() if name != "session_settings"))
+    return tuple(sorted(db_config.items())), options, settings
+
+
+def get_pool(db_config=DB_CONFIG, pool_config=None):
+    """(DB 접속 정보, 풀 설정)에 해당하는 풀 반환 (처음 호출할 때 생성)"""
+    pool_config = pool_config or POOL_CONFIG
+    key = _pool_key(db_config, pool_config)
+    with _registry_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(db_config, **pool_config)
+        return _pools[key]
+
+
+def get_connection(db_config=DB_CONFIG, pool_config=None):
+    """풀에서 연결 꺼내기 - 사용 후 release_connection 으로 반환"""
+    pool = get_pool(db_config, pool_config)
+    conn = pool.getconn()
+    with _registry_lock:
+        _owners[id(conn)] = pool
+    return conn
+
+
+def release_connection(conn):
+    """꺼낸 연결을 풀에 반환"""
+    with _registry_lock:
+        pool = _owners.pop(id(conn), None)
+    if pool is None:
+        conn.close()
+    else:
+        pool.putconn(conn)
+
+
+def pool_stats():
+    """풀별 대기 시간 통계 (DB 이름, 세션 설정이 기본값과 다르면 그 설정도 표시)"""
+    default_settings = tuple(sorted(POOL_CONFIG["session_settings"].items()))
+    stats = {}
+    with _registry_lock:
+        for (db_items, _, settings), pool in _pools.items():
+            name = str(dict(db_items).get("dbname", "<default>"))
+            if settings != default_settings:
+                name += " (" + ", ".join(f"{key}={value}" for key, value in settings) + ")"
+            if name in stats:
+                name += f" #{len(stats) + 1}"
+            stats[name] = pool.stats()
+    return stats
+
+
+@atexit.register
+def close_pools():
+    """프로세스 종료 시 모든 풀의 연결 종료"""
+    with _registry_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+
+
 def connect_db():
     try:
-        conn = psycopg2.connect(**DB_CONFIG) # DB 연결
+        conn = get_connection(DB_CONFIG) # 풀에서 DB 연결 꺼내기
         cur = conn.cursor() # cursor 객체 생성
         print("데이터베이스에 성공적으로 연결되었습니다.")
         return conn, cur # 연결과 커서 반환
-    except psycopg2.Error as e: 
+    except psycopg2.Error as e:
         print(f"데이터베이스 연결 오류: {e}")
         return None, None
 
-def close_db(conn, cur): 
-    if cur: 
+def close_db(conn, cur):
+    if cur:
         cur.close()
-    if conn: 
-        conn.close()
+    if conn:
+        release_connection(conn) # 연결은 닫지 않고 풀에 반환
         print("데이터베이스 연결을 종료했습니다.")
 
 if __name__ == "__main__":
@@ -32,3 +227,4 @@ if __name__ == "__main__":
     if conn and cur:
         # 연결 테스트 후 바로 종료
         close_db(conn, cur)
+        print(f"커넥션 풀 통계: {pool_stats()}")
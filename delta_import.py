@@ -0,0 +1,150 @@
+"""
+행 단위 변경분(delta) 적재
+
+qpoll / Welcome 파일은 몇 행만 고친 수정본이 다시 배포되는 경우가 많다.
+지난번 적재한 설문의 행(사용자)별 지문을 IMPORT_ROW_FINGERPRINTS 테이블에 남겨 두고,
+새 파일의 지문과 한 번에 비교해서 추가 / 변경 / 삭제된 사용자만 DB 에 반영한다.
+- 지문: 한 사용자의 행들을 파일 순서대로 합친 64비트 해시 (값을 문자열로 바꿔서 해시하므로 dtype 이 달라져도 같은 값이면 같은 지문)
+- DB 쓰기 비용은 파일 크기가 아니라 바뀐 사용자 수에 비례
+"""
+import io
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_array, hash_pandas_object
+
+from bulk_loader import bulk_upsert
+
+FINGERPRINT_TABLE = 'IMPORT_ROW_FINGERPRINTS'
+
+
+def ensure_fingerprint_table(cur):
+    """지문 테이블이 없으면 생성"""
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {FINGERPRINT_TABLE} (
+            survey_key TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            fingerprint BIGINT NOT NULL,
+            PRIMARY KEY (survey_key, row_key)
+        );
+        """
+    )
+
+
+def row_fingerprints(df, keys, columns):
+    """
+    키(사용자)별 지문 Series (index: 키, 값: int64)
+    같은 키의 행이 여러 개면 행 순서까지 반영해서 하나로 합침
+    """
+    keys = np.asarray(keys, dtype=object)
+    if len(keys) == 0:
+        return pd.Series([], index=pd.Index([], dtype=object), dtype=np.int64)
+
+    # 없는 컬럼은 빈 값으로 (row.get 과 동일)
+    row_hashes = hash_pandas_object(df.reindex(columns=columns).astype(str), index=False).to_numpy()
+    codes, uniques = pd.factorize(keys)
+    # 같은 키 안에서의 순서를 섞어서, 행 순서가 바뀌거나 같은 행이 반복돼도 지문이 달라지게
+    position = pd.Series(codes).groupby(codes).cumcount().to_numpy().astype(np.uint64)
+    mixed = hash_array(row_hashes ^ position)
+
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    combined = np.bitwise_xor.reduceat(mixed[order], starts)
+    return pd.Series(combined.view(np.int64), index=pd.Index(uniques[sorted_codes[starts]], dtype=object))
+
+
+def load_fingerprints(cur, survey_key):
+    """지난 적재의 지문을 COPY 한 번으로 읽기"""
+    buffer = io.StringIO()
+    cur.copy_expert(
+        cur.mogrify(
+            f"COPY (SELECT row_key, fingerprint FROM {FINGERPRINT_TABLE} WHERE survey_key = %s) "
+            "TO STDOUT WITH (FORMAT csv)",
+            (survey_key,)
+        ).decode(),
+        buffer
+    )
+    buffer.seek(0)
+    previous = pd.read_csv(
+        buffer, names=['row_key', 'fingerprint'], dtype={'row_key': str, 'fingerprint': np.int64},
+        keep_default_na=False
+    )
+    return pd.Series(previous['fingerprint'].to_numpy(), index=pd.Index(previous['row_key'], dtype=object))
+
+
+class RowDelta:
+    """설문 하나의 지난 적재 대비 변경분 (inserted / changed / deleted 키)"""
+
+    def __init__(self, cur, survey_key, df, keys, columns):
+        ensure_fingerprint_table(cur)
+        self.survey_key = survey_key
+        self.current = row_fingerprints(df, keys, columns)
+        previous = load_fingerprints(cur, survey_key)
+        self.first_import = previous.empty
+
+        known = self.current.index.isin(previous.index)
+        known_keys = self.current.index[known]
+        differs = previous.loc[known_keys].to_numpy() != self.current[known].to_numpy()
+
+        self.inserted = self.current.index[~known]
+        self.changed = known_keys[differs]
+        self.deleted = previous.index.difference(self.current.index)
+        self.unchanged = len(known_keys) - len(self.changed)
+
+    @property
+    def touched(self):
+        """새로 써야 하는 키 (추가 + 변경)"""
+        return self.inserted.append(self.changed)
+
+    @property
+    def stale(self):
+        """기존 행을 지워야 하는 키 (변경 + 삭제)"""
+        return self.changed.append(self.deleted)
+
+    def summary(self):
+        return (f"추가 {len(self.inserted)}, 변경 {len(self.changed)}, "
+                f"삭제 {len(self.deleted)}, 변경 없음 {self.unchanged}")
+
+    def save(self, cur, keys=None):
+        """
+        이번 파일의 지문으로 갱신 (바뀐 키만 쓰고 사라진 키는 삭제)
+        keys: 분할 커밋할 때 이번 청크의 키 - 그 키의 지문만 씀 (사라진 키는 마지막에 forget_deleted)
+        """
+        touched = self.touched
+        if keys is None:
+            self.forget_deleted(cur)
+        else:
+            touched = touched.intersection(keys)
+        if len(touched):
+            rows = pd.DataFrame({
+                'survey_key': self.survey_key,
+                'row_key': touched.to_numpy(dtype=object),
+                'fingerprint': self.current.loc[touched].to_numpy(),
+            })
+            bulk_upsert(
+                cur, FINGERPRINT_TABLE, ['survey_key', 'row_key', 'fingerprint'], rows,
+                conflict_columns=['survey_key', 'row_key'],
+                update_columns=['fingerprint'],
+                keep='last'
+            )
+
+    def forget_deleted(self, cur):
+        """파일에서 사라진 키의 지문 삭제"""
+        if len(self.deleted):
+            cur.execute(
+                f"DELETE FROM {FINGERPRINT_TABLE} WHERE survey_key = %s AND row_key = ANY(%s);",
+                (self.survey_key, list(self.deleted))
+            )
+
+
+def delete_user_rows(cur, table, user_ids, column, values):
+    """table 에서 user_id 가 user_ids 이고 column 이 values 중 하나인 행 삭제 (바뀌거나 사라진 사용자의 이전 답변 정리)"""
+    if len(user_ids) == 0 or len(values) == 0:
+        return 0
+    cur.execute(
+        f"DELETE FROM {table} WHERE user_id = ANY(%s) AND {column} = ANY(%s);",
+        (list(user_ids), list(values))
+    )
+    return cur.rowcount
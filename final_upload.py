@@ -1,7 +1,16 @@
+import os
 import pandas as pd
-import psycopg2
-import re
+from connectDB import get_connection, release_connection
 from datetime import date
+from contextlib import nullcontext
+from bulk_loader import BulkLoadSession, bulk_upsert
+from survey_transform import build_user_frame, explode_multi_answers
+from user_cache import UserCache
+from import_registry import run_once
+from delta_import import RowDelta, delete_user_rows
+from checkpoint import ChunkedImport
+from excel_cache import read_excel_cached
+from workbook import SurveyWorkbook
 
 # PostgreSQL 데이터베이스 연결 정보
 DB_CONFIG = {
@@ -20,6 +29,42 @@ EXCEL_FILE_PATH = 'C:/Users/ecopl/Desktop/qpoll 데이터/필수/qpoll_join_2503
 # 'POLL'   : 단일 설문(Poll) 결과 저장 (시트 1만 사용)
 IMPORT_MODE = 'POLL' 
 
+# 이미 적재한 파일(내용 해시 + 시트 + 모드가 같음)도 다시 적재할지 여부
+# False: IMPORT_LOG 에 기록이 있으면 파일을 읽지 않고 건너뜀
+FORCE_RELOAD = False
+
+# 행 단위 변경분(delta) 적재
+# True : 지난 적재의 사용자별 지문과 비교해 추가/변경된 사용자만 쓰고, 변경된 사용자의 이전 답변은 지움
+#        (FORCE_RELOAD 이면 모든 사용자를 다시 씀, 같은 설문의 수정본을 다시 적재할 때만 사용)
+# False: 파일 전체를 매번 업서트 (기본값)
+DELTA_IMPORT = False
+# 지문을 구분하는 설문 이름 (PROFILE 모드, 같은 설문의 수정본끼리만 같은 이름을 써야 함)
+# None 이면 엑셀 파일 이름 (POLL 모드는 POLL_TITLE)
+DELTA_SURVEY_KEY = None
+# 지난 적재에는 있었는데 이번 파일에 없는 사용자의 이전 답변과 지문도 지울지 여부
+# (DELTA_IMPORT 일 때만, 다른 패널의 파일을 같은 설문 이름으로 적재하면 앞 파일의 답변이 모두 지워지므로 주의)
+DELTA_DELETE_MISSING = False
+# 지문에 포함할 사용자 컬럼 (답변 컬럼은 모드별로 추가)
+DELTA_USER_COLUMNS = ['고유번호', '성별', '나이', '지역', '설문일시']
+
+# 대량 적재 모드
+# True : 임시 테이블에 COPY 로 적재 후 테이블당 한 번의 INSERT ... ON CONFLICT 로 병합 (빠름)
+# False: 기존처럼 행마다 INSERT ... ON CONFLICT 실행
+BULK_LOAD = True
+# 초기 적재 / 백필 모드 (BULK_LOAD 일 때)
+# True : 선택지/응답 테이블의 인덱스와 제약조건을 지우고 적재한 뒤 다시 만듦 (인덱스마다 병렬 작업자 사용)
+#        (행이 아주 많을 때 빠름, 커밋할 때까지 테이블이 잠기므로 다른 작업이 없을 때만)
+# False: 인덱스를 유지한 채 ON CONFLICT 로 병합
+INITIAL_LOAD = False
+
+# 전체를 한 트랜잭션으로 적재할지 여부
+# True : 기존처럼 전부 성공하거나 전부 롤백 (기본값)
+# False: 사용자 단위 청크(checkpoint.CHECKPOINT_CHUNK_ROWS 행)마다 커밋하고 체크포인트를 남김 (큰 파일에서 선택)
+#        -> 도중에 실패해도 다시 실행하면 마지막으로 커밋한 청크 다음부터 이어서 적재
+#        -> 대신 도중에 실패하면 앞 청크까지만 반영된 상태가 DB 에 남음
+#        (INITIAL_LOAD 이면 False 여도 한 트랜잭션으로 적재)
+ATOMIC_IMPORT = True
+
 # --- 엑셀 시트 정보 PROFILE모드 ---
 SHEET_RESPONSES = 0       # 사용자 응답이 있는 시트 (첫 번째 시트)
 SHEET_QUESTION_INFO = 1   # 질문과 선택지 정보가 있는 시트 (두 번째 시트)
@@ -36,28 +81,104 @@ POLL_TITLE = '여러분은 본인을 위해 소비하는 것 중 가장 기분 
 POLL_ANSWER_COLUMN = '문항1' # Poll 답변이 있는 컬럼
 
 #ㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡ
-def parse_birthdate(text):
-    """ 'YYYY년 MM월 DD일 ...' 형식의 문자열에서 날짜만 추출 """
-    try:
-        date_str = re.match(r'\d{4}년 \d{2}월 \d{2}일', str(text))
-        if date_str:
-            return pd.to_datetime(date_str.group(), format='%Y년 %m월 %d일').date()
-    except (ValueError, TypeError):
-        pass
-    return None
+def save_users(cur, user_rows, cache=None):
+    """
+    USERS 테이블 저장. user_rows: user_id, gender, birth_date(datetime64), region 컬럼의 DataFrame
+    기존 USERS 와 비교해 새 사용자 / 값이 바뀐 사용자만 저장하고, 저장한 행 수를 반환
+    cache: 청크마다 나눠 저장할 때 한 번만 읽어 둔 UserCache
+    """
+    user_rows = (cache or UserCache(cur)).pending(user_rows)
+    if BULK_LOAD:
+        bulk_upsert(
+            cur, 'USERS', ['user_id', 'gender', 'birth_date', 'region'], user_rows,
+            conflict_columns=['user_id'],
+            update_columns=['gender', 'birth_date', 'region'],
+            now_columns=['updated_at'],
+            keep='last'
+        )
+        return len(user_rows)
+    for user_row in user_rows.itertuples(index=False, name=None):
+        cur.execute(
+            "INSERT INTO USERS (user_id, gender, birth_date, region, updated_at) VALUES (%s, %s, %s, %s, NOW()) ON CONFLICT (user_id) DO UPDATE SET gender = EXCLUDED.gender, birth_date = EXCLUDED.birth_date, region = EXCLUDED.region, updated_at = NOW();",
+            user_row
+        )
+    return len(user_rows)
+
+def chunked_import(cur, file_path, mode, df_responses):
+    """응답 시트를 사용자 단위 청크로 나눠 커밋하는 ChunkedImport (ATOMIC_IMPORT / INITIAL_LOAD 이면 한 번에)"""
+    user_ids = df_responses.reindex(columns=['고유번호'])['고유번호'].astype(str).str.strip()
+    return ChunkedImport(cur, file_path, SHEET_RESPONSES, mode, user_ids, atomic=ATOMIC_IMPORT or (BULK_LOAD and INITIAL_LOAD))
+
+def load_session(cur, tables):
+    """INITIAL_LOAD 이면 tables 의 인덱스를 지우고 적재하는 BulkLoadSession, 아니면 아무 일도 하지 않음"""
+    if BULK_LOAD and INITIAL_LOAD:
+        return BulkLoadSession(cur, tables)
+    return nullcontext()
+
+def save_answer_options(cur, option_rows):
+    """ PROFILE_ANSWER_OPTIONS 테이블 저장. option_rows: (question_id, option_code, option_text) 목록 """
+    if BULK_LOAD:
+        bulk_upsert(
+            cur, 'PROFILE_ANSWER_OPTIONS', ['question_id', 'option_code', 'option_text'], option_rows,
+            conflict_columns=['question_id', 'option_code'],
+            keep='first'
+        )
+        return
+    for option_row in option_rows:
+        cur.execute(
+            "INSERT INTO PROFILE_ANSWER_OPTIONS (question_id, option_code, option_text) VALUES (%s, %s, %s) ON CONFLICT (question_id, option_code) DO NOTHING;",
+            option_row
+        )
+
+def save_profile_answers(cur, answer_rows):
+    """ USER_PROFILE_ANSWERS 테이블 저장. answer_rows: user_id, question_id, answer_value, answered_at 컬럼의 DataFrame """
+    if BULK_LOAD:
+        bulk_upsert(
+            cur, 'USER_PROFILE_ANSWERS', ['user_id', 'question_id', 'answer_value', 'answered_at'], answer_rows,
+            conflict_columns=['user_id', 'question_id', 'answer_value'],
+            keep='first'
+        )
+        return
+    for answer_row in answer_rows.itertuples(index=False, name=None):
+        cur.execute(
+            "INSERT INTO USER_PROFILE_ANSWERS (user_id, question_id, answer_value, answered_at) VALUES (%s, %s, %s, %s) ON CONFLICT (user_id, question_id, answer_value) DO NOTHING;",
+            answer_row
+        )
+
+def save_poll_responses(cur, response_rows):
+    """ USER_POLL_RESPONSES 테이블 저장. response_rows: user_id, poll_id, response_value, responded_at 컬럼의 DataFrame """
+    if BULK_LOAD:
+        bulk_upsert(
+            cur, 'USER_POLL_RESPONSES', ['user_id', 'poll_id', 'response_value', 'responded_at'], response_rows,
+            conflict_columns=['user_id', 'poll_id'],
+            update_columns=['response_value', 'responded_at'],
+            keep='last'
+        )
+        return
+    for response_row in response_rows.itertuples(index=False, name=None):
+        cur.execute(
+            "INSERT INTO USER_POLL_RESPONSES (user_id, poll_id, response_value, responded_at) VALUES (%s, %s, %s, %s) ON CONFLICT (user_id, poll_id) DO UPDATE SET response_value = EXCLUDED.response_value, responded_at = EXCLUDED.responded_at;",
+            response_row
+        )
 
 def process_all_data_to_db(cur, file_path):
     """
     엑셀의 두 시트에서 모든 질문, 선택지, 사용자, 다중 답변을 읽어 DB에 저장합니다.
+    저장한 USER_PROFILE_ANSWERS 행 수를 반환합니다.
     """
     print("--- [프로필 모드 - 여러 문항]으로 임포트를 시작합니다. ---")
     
+    # 질문 시트와 응답 시트를 파일 한 번만 열어서 읽기
+    with SurveyWorkbook(file_path) as workbook:
+        # skiprows=[0] 옵션을 추가하여 첫 번째 행(헤더)을 건너뜁니다.
+        df_info = workbook.read_sheet(SHEET_QUESTION_INFO, header=None, skiprows=[0])
+        df_responses = workbook.read_sheet(SHEET_RESPONSES, header=HEADER_ROW_RESPONSES)
+
     # --- 1. 시트2에서 모든 질문/선택지 정보 처리 ---
-     # skiprows=[0] 옵션을 추가하여 첫 번째 행(헤더)을 건너뜁니다.
-    df_info = pd.read_excel(file_path, sheet_name=SHEET_QUESTION_INFO, header=None, skiprows=[0])
     
     
     print("-> 시트2에서 질문 및 선택지 정보를 읽어 DB에 저장합니다...")
+    option_rows = []
     for index, row in df_info.iterrows():
         question_text = row.iloc[0] # A열을 질문 내용으로 가정
         if pd.isna(question_text) or not str(question_text).strip():
@@ -95,97 +216,134 @@ def process_all_data_to_db(cur, file_path):
             #
             
             option_code = str(i + 1)
-            cur.execute(
-                "INSERT INTO PROFILE_ANSWER_OPTIONS (question_id, option_code, option_text) VALUES (%s, %s, %s) ON CONFLICT (question_id, option_code) DO NOTHING;",
-                (question_id, option_code, text_to_check)
-            )
-    print("-> 모든 질문/선택지 정보 처리를 완료했습니다.")
+            option_rows.append((question_id, option_code, text_to_check))
+    print("-> 모든 질문/선택지 정보를 읽었습니다. (선택지는 응답과 함께 저장)")
 
     # --- 2. 시트1에서 모든 사용자/답변 정보 처리 ---
-    df_responses = pd.read_excel(file_path, sheet_name=SHEET_RESPONSES, header=HEADER_ROW_RESPONSES)
     print(f"-> 응답 시트에서 총 {len(df_responses)}개의 응답 행을 읽었습니다.")
 
-    for index, row in df_responses.iterrows():
-        # 2a. USERS 테이블 처리
-        if any(pd.isna(row.get(col)) for col in ['고유번호', '성별', '나이', '지역']):
-            continue
-        user_id = str(row['고유번호']).strip()
-        birth_date = parse_birthdate(row['나이'])
-        if birth_date is None: continue
+    # 2a. USERS 테이블 처리 (필수 정보가 비었거나 생년월일 형식이 잘못된 행 제외)
+    user_rows = build_user_frame(df_responses)
 
-        cur.execute(
-            "INSERT INTO USERS (user_id, gender, birth_date, region, updated_at) VALUES (%s, %s, %s, %s, NOW()) ON CONFLICT (user_id) DO UPDATE SET gender = EXCLUDED.gender, birth_date = EXCLUDED.birth_date, region = EXCLUDED.region, updated_at = NOW();",
-            (user_id, str(row['성별']).strip(), birth_date, str(row['지역']).strip())
+    delta = None
+    if DELTA_IMPORT:
+        # 지난 적재 대비 추가/변경된 사용자만 남기고, 변경/삭제된 사용자의 이전 답변 삭제
+        delta = RowDelta(
+            cur, f"PROFILE:{DELTA_SURVEY_KEY or os.path.basename(file_path)}",
+            df_responses.loc[user_rows.index], user_rows['user_id'],
+            DELTA_USER_COLUMNS + list(QUESTION_COLUMN_MAPPING)
         )
-        
-        # 2b. 여러 문항에 대한 답변 처리
-        answered_at = row.get('설문일시')
-        
-        # 설정된 매핑 정보를 기준으로 반복 작업
-        for column_name, question_id in QUESTION_COLUMN_MAPPING.items():
-            answer_value_raw = row.get(column_name)
-            
-            if pd.notna(answer_value_raw) and str(answer_value_raw).strip():
-                # 쉼표로 답변 분리
-                answers = str(answer_value_raw).split(',')
-                for single_answer in answers:
-                    final_answer = single_answer.strip()
-                    if final_answer:
-                        # USER_PROFILE_ANSWERS 테이블에 각 답변을 별도 행으로 저장
-                        cur.execute(
-                            "INSERT INTO USER_PROFILE_ANSWERS (user_id, question_id, answer_value, answered_at) VALUES (%s, %s, %s, %s) ON CONFLICT (user_id, question_id, answer_value) DO NOTHING;",
-                            (user_id, question_id, final_answer, answered_at)
-                        )
+        print(f"-> 지난 적재 대비 {delta.summary()}")
+        if len(delta.deleted) and not DELTA_DELETE_MISSING:
+            print(f"-> 파일에 없는 사용자 {len(delta.deleted)}명의 이전 답변은 그대로 둡니다. (DELTA_DELETE_MISSING = False)")
+        if not FORCE_RELOAD:
+            user_rows = user_rows[user_rows['user_id'].isin(delta.touched)]
+
+    # 2b. 여러 문항에 대한 답변 처리 - 쉼표로 나눈 답변을 한 번에 한 행씩 펼침
+    answer_rows = explode_multi_answers(
+        df_responses.loc[user_rows.index], QUESTION_COLUMN_MAPPING, '고유번호',
+        extra_columns={'설문일시': 'answered_at'}
+    )
+
+    question_ids = list(QUESTION_COLUMN_MAPPING.values())
+    plan = chunked_import(cur, file_path, 'PROFILE', df_responses)
+    cache = UserCache(cur)
+    saved_users = 0
+    with load_session(cur, ['PROFILE_ANSWER_OPTIONS', 'USER_PROFILE_ANSWERS']):
+        save_answer_options(cur, option_rows)
+        # 사용자 단위 청크마다: 이전 답변 정리 -> USERS -> 답변 -> 지문 저장 후 커밋
+        for chunk, chunk_users in plan.pending_chunks():
+            if delta is not None:
+                delete_user_rows(cur, 'USER_PROFILE_ANSWERS', delta.changed.intersection(chunk_users), 'question_id', question_ids)
+            saved_users += save_users(cur, user_rows[user_rows['user_id'].isin(chunk_users)], cache)
+            save_profile_answers(cur, answer_rows[answer_rows['user_id'].isin(chunk_users)])
+            if delta is not None:
+                delta.save(cur, keys=chunk_users)
+            plan.commit(chunk)
+    if delta is not None and DELTA_DELETE_MISSING:
+        # 파일에서 사라진 사용자의 답변과 지문 정리
+        delete_user_rows(cur, 'USER_PROFILE_ANSWERS', delta.deleted, 'question_id', question_ids)
+        delta.forget_deleted(cur)
+    plan.finish()
+    print(f"-> USERS {len(user_rows)}행 (새로 쓰거나 갱신 {saved_users}행), USER_PROFILE_ANSWERS {len(answer_rows)}행 처리를 완료했습니다.")
+    return len(answer_rows)
 
 
 def run_poll_import(cur, file_path):
-    """'POLL' 모드: POLL 관련 3개 테이블에 데이터를 저장합니다."""
+    """'POLL' 모드: POLL 관련 3개 테이블에 데이터를 저장하고, 저장한 USER_POLL_RESPONSES 행 수를 반환합니다."""
     print("--- [POLL 모드]로 임포트를 시작합니다. ---")
     
-    # 1. POLLS 테이블에 설문 정보 저장
+    # 1. POLLS 테이블에 설문 정보 저장 (다시 적재해도 같은 설문이면 기존 poll_id 사용)
     cur.execute(
-        "INSERT INTO POLLS (poll_title, poll_date) VALUES (%s, %s) RETURNING poll_id;",
+        "INSERT INTO POLLS (poll_title, poll_date) VALUES (%s, %s) ON CONFLICT (poll_title) DO UPDATE SET poll_date = EXCLUDED.poll_date RETURNING poll_id;",
         (POLL_TITLE, date.today())
     )
     poll_id = cur.fetchone()[0]
     print(f"-> POLLS 테이블 처리 완료 (ID: {poll_id})")
 
     # 2. 시트1에서 사용자/응답 정보 처리
-    df_responses = pd.read_excel(file_path, sheet_name=SHEET_RESPONSES, header=HEADER_ROW_RESPONSES)
+    df_responses = read_excel_cached(file_path, sheet_name=SHEET_RESPONSES, header=HEADER_ROW_RESPONSES)
     print(f"-> 응답 시트에서 총 {len(df_responses)}개의 응답 행을 읽었습니다.")
 
-    for index, row in df_responses.iterrows():
-        if any(pd.isna(row.get(col)) for col in ['고유번호', '성별', '나이', '지역']):
-            continue
-        user_id = str(row['고유번호']).strip()
-        birth_date = parse_birthdate(row['나이'])
-        if birth_date is None: continue
+    user_rows = build_user_frame(df_responses)
 
-        cur.execute(
-            "INSERT INTO USERS (user_id, gender, birth_date, region, updated_at) VALUES (%s, %s, %s, %s, NOW()) ON CONFLICT (user_id) DO UPDATE SET gender = EXCLUDED.gender, birth_date = EXCLUDED.birth_date, region = EXCLUDED.region, updated_at = NOW();",
-            (user_id, str(row['성별']).strip(), birth_date, str(row['지역']).strip())
+    delta = None
+    if DELTA_IMPORT:
+        # 지난 적재 대비 추가/변경된 사용자만 남기고, 변경/삭제된 사용자의 이전 응답 삭제
+        delta = RowDelta(
+            cur, f"POLL:{POLL_TITLE}", df_responses.loc[user_rows.index], user_rows['user_id'],
+            DELTA_USER_COLUMNS + [POLL_ANSWER_COLUMN]
         )
-        
-        answer_value = row.get(POLL_ANSWER_COLUMN)
-        responded_at = row.get('설문일시')
-        if pd.notna(answer_value) and str(answer_value).strip():
-            final_answer = str(answer_value).strip()
-            cur.execute(
-                "INSERT INTO USER_POLL_RESPONSES (user_id, poll_id, response_value, responded_at) VALUES (%s, %s, %s, %s) ON CONFLICT (user_id, poll_id) DO UPDATE SET response_value = EXCLUDED.response_value, responded_at = EXCLUDED.responded_at;",
-                (user_id, poll_id, final_answer, responded_at)
-            )
+        print(f"-> 지난 적재 대비 {delta.summary()}")
+        if len(delta.deleted) and not DELTA_DELETE_MISSING:
+            print(f"-> 파일에 없는 사용자 {len(delta.deleted)}명의 이전 답변은 그대로 둡니다. (DELTA_DELETE_MISSING = False)")
+        if not FORCE_RELOAD:
+            user_rows = user_rows[user_rows['user_id'].isin(delta.touched)]
+
+    # 응답이 비어 있지 않은 행만 컬럼 단위로 골라 응답 행 생성 (컬럼이 없으면 빈 값으로 취급)
+    answers = df_responses.loc[user_rows.index].reindex(columns=[POLL_ANSWER_COLUMN, '설문일시'])
+    answer_text = answers[POLL_ANSWER_COLUMN].astype(str).str.strip()
+    answered = answers[POLL_ANSWER_COLUMN].notna() & (answer_text != '')
+    response_rows = pd.DataFrame({
+        'user_id': user_rows.loc[answered, 'user_id'],
+        'poll_id': poll_id,
+        'response_value': answer_text[answered],
+        'responded_at': answers.loc[answered, '설문일시']
+    }, columns=['user_id', 'poll_id', 'response_value', 'responded_at']).reset_index(drop=True)
+
+    plan = chunked_import(cur, file_path, 'POLL', df_responses)
+    cache = UserCache(cur)
+    saved_users = 0
+    with load_session(cur, ['USER_POLL_RESPONSES']):
+        # 사용자 단위 청크마다: 이전 응답 정리 -> USERS -> 응답 -> 지문 저장 후 커밋
+        for chunk, chunk_users in plan.pending_chunks():
+            if delta is not None:
+                delete_user_rows(cur, 'USER_POLL_RESPONSES', delta.changed.intersection(chunk_users), 'poll_id', [poll_id])
+            saved_users += save_users(cur, user_rows[user_rows['user_id'].isin(chunk_users)], cache)
+            save_poll_responses(cur, response_rows[response_rows['user_id'].isin(chunk_users)])
+            if delta is not None:
+                delta.save(cur, keys=chunk_users)
+            plan.commit(chunk)
+    if delta is not None and DELTA_DELETE_MISSING:
+        # 파일에서 사라진 사용자의 응답과 지문 정리
+        delete_user_rows(cur, 'USER_POLL_RESPONSES', delta.deleted, 'poll_id', [poll_id])
+        delta.forget_deleted(cur)
+    plan.finish()
+    print(f"-> USERS {len(user_rows)}행 (새로 쓰거나 갱신 {saved_users}행), USER_POLL_RESPONSES {len(response_rows)}행 처리를 완료했습니다.")
+    return len(response_rows)
 
 if __name__ == "__main__":
     conn = None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_connection(DB_CONFIG)  # 프로세스 공용 커넥션 풀에서 꺼내기
         cur = conn.cursor()
         print("데이터베이스에 성공적으로 연결되었습니다.")
         
+        # 같은 파일 + 시트 + 모드를 이미 적재했으면 IMPORT_LOG 만 확인하고 건너뜀
         if IMPORT_MODE == 'PROFILE':
-            process_all_data_to_db(cur, EXCEL_FILE_PATH)
+            run_once(cur, EXCEL_FILE_PATH, SHEET_RESPONSES, IMPORT_MODE, process_all_data_to_db, force=FORCE_RELOAD)
         elif IMPORT_MODE == 'POLL':
-            run_poll_import(cur, EXCEL_FILE_PATH)
+            run_once(cur, EXCEL_FILE_PATH, SHEET_RESPONSES, IMPORT_MODE, run_poll_import, force=FORCE_RELOAD)
         else:
             print(f"오류: 잘못된 IMPORT_MODE 입니다. ('PROFILE' 또는 'POLL'만 가능)")
         
@@ -197,10 +355,14 @@ if __name__ == "__main__":
     except Exception as e:
         if conn:
             conn.rollback()
-        print(f"\n오류가 발생하여 작업을 취소하고 롤백했습니다.\n에러: {e}")
+        if ATOMIC_IMPORT or (BULK_LOAD and INITIAL_LOAD):
+            print(f"\n오류가 발생하여 작업을 취소하고 롤백했습니다.\n에러: {e}")
+        else:
+            print(f"\n오류가 발생하여 마지막 커밋 이후의 작업을 롤백했습니다.\n에러: {e}")
+            print("다시 실행하면 커밋한 청크 다음부터 이어서 적재합니다.")
 
     finally:
         if conn:
             cur.close()
-            conn.close()
+            release_connection(conn)  # 닫지 않고 풀에 반환
             print("데이터베이스 연결을 종료했습니다.")
\ No newline at end of file
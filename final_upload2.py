@@ -1,7 +1,10 @@
 import pandas as pd
-import psycopg2
-import re
+from workbook import SurveyWorkbook
+from connectDB import get_connection, release_connection
 from datetime import date
+from bulk_loader import bulk_upsert
+from survey_transform import build_user_frame, explode_multi_answers
+from user_cache import UserCache
 
 DB_CONFIG = {
     "dbname": "Qpoll_Data2",
@@ -15,22 +18,16 @@ SHEET_RESPONSES = 0      # 사용자 응답이 있는 시트 (첫 번째 시트)
 SHEET_QUESTIONS = 1      # 질문/선택지 정보가 있는 시트 (두 번째 시트)
 HEADER_ROW_RESPONSES = 1 # 응답 시트의 헤더 행
 
-# 날짜 
-def parse_birthdate(text):
-    try:
-        date_str = re.match(r'\d{4}년 \d{2}월 \d{2}일', str(text))
-        if date_str:
-            return pd.to_datetime(date_str.group(), format='%Y년 %m월 %d일').date()
-    except (ValueError, TypeError):
-        pass
-    return None
-
 def process_dynamic_survey_from_excel(cur, file_path):
     """
     하나의 시트 안에 여러 질문 블록이 있는 엑셀 구조를 동적으로 처리
     """    
+    # 질문 시트와 응답 시트를 파일 한 번만 열어서 읽기
+    with SurveyWorkbook(file_path) as workbook:
+        df_questions = workbook.read_sheet(SHEET_QUESTIONS, header=0)
+        df_responses = workbook.read_sheet(SHEET_RESPONSES, header=HEADER_ROW_RESPONSES)
+
     # === 1. 질문/선택지 시트(두 번째 시트) 처리 ===
-    df_questions = pd.read_excel(file_path, sheet_name=SHEET_QUESTIONS, header=0)
     
     # 질문 텍스트를 key로, PROFILE 질문 ID와 POLL ID를 값으로 저장하는 딕셔너리
     question_text_to_ids_map = {}
@@ -86,53 +83,31 @@ def process_dynamic_survey_from_excel(cur, file_path):
     print("-> 모든 질문/선택지 정보 처리를 완료했습니다.")
 
     # === 2. 사용자 응답 시트(첫 번째 시트) 처리 ===
-    df_responses = pd.read_excel(file_path, sheet_name=SHEET_RESPONSES, header=HEADER_ROW_RESPONSES)
     print(f"-> 응답 시트에서 총 {len(df_responses)}개의 응답 행을 읽었습니다.")
 
     # 응답 시트의 컬럼명 중 질문 텍스트와 매칭되는 컬럼만 추출
     answer_columns = [col for col in df_responses.columns if col in question_text_to_ids_map]
     print(f"-> 처리할 답변 컬럼: {answer_columns}")
 
-    for index, row in df_responses.iterrows():
-        # USERS 테이블 처리 (기존과 동일)
-        if any(pd.isna(row.get(col)) for col in ['고유번호', '성별', '나이', '지역']):
-            continue
-        user_id = str(row['고유번호']).strip()
-        birth_date = parse_birthdate(row['나이'])
-        if birth_date is None: continue
+    # USERS 테이블 처리 (필수 정보가 비었거나 생년월일 형식이 잘못된 행 제외)
+    user_rows = build_user_frame(df_responses)
+    # 이미 있는 사용자는 DO NOTHING 이므로 새 사용자만 INSERT
+    new_users = UserCache(cur).pending(user_rows, update=False)
+    for user_row in new_users.itertuples(index=False, name=None):
         cur.execute(
             "INSERT INTO USERS (user_id, gender, birth_date, region) VALUES (%s, %s, %s, %s) ON CONFLICT (user_id) DO NOTHING;",
-            (user_id, str(row['성별']).strip(), birth_date, str(row['지역']).strip())
+            user_row
         )
-        
+
+    for index, row in df_responses.loc[user_rows.index].iterrows():
+        user_id = user_rows.at[index, 'user_id']
         answered_at = row.get('설문일시')
         
         for col_name in answer_columns:
-            ids = question_text_to_ids_map[col_name]
-            profile_question_id = ids['profile_id']
-            poll_id = ids['poll_id'] # poll_id 가져오기
-            
+            poll_id = question_text_to_ids_map[col_name]['poll_id']
             answer_value_raw = row.get(col_name) # 나누기 전 원본 답변
             
             if pd.notna(answer_value_raw) and str(answer_value_raw).strip():
-                # USER_PROFILE_ANSWERS 테이블 처리 
-                answers = str(answer_value_raw).split(',')
-                for single_answer in answers:
-                    final_answer_str = single_answer.strip()
-                    if final_answer_str:
-                        final_answer_for_db = final_answer_str  # 기본값은 원래 문자열
-
-                try:
-                    # 숫자 형태의 문자열(예: '4.0')을 정수 문자열(예: '4')로 변환 시도
-                    final_answer_for_db = str(int(float(final_answer_str)))
-                except ValueError:
-                    # 변환에 실패하면(예: '기타' 같은 텍스트 답변) 원래 값 사용
-                    pass
-
-                cur.execute(
-                    "INSERT INTO USER_PROFILE_ANSWERS (user_id, question_id, answer_value, answered_at) VALUES (%s, %s, %s, %s) ON CONFLICT (user_id, question_id, answer_value) DO NOTHING;",
-                    (user_id, profile_question_id, final_answer_for_db, answered_at) # final_answer 대신 final_answer_for_db 사용
-                )
                 # USER_POLL_RESPONSES 테이블 처리 
                 raw_parts = str(answer_value_raw).split(',')
                 clean_parts = []
@@ -155,11 +130,24 @@ def process_dynamic_survey_from_excel(cur, file_path):
                     (user_id, poll_id, poll_response_value, answered_at)
                 )
 
+    # USER_PROFILE_ANSWERS 테이블 처리 - 쉼표로 나눈 답변 하나하나를 정수 문자열(예: '4.0' -> '4')로 한 번에 펼침
+    profile_columns = {col_name: question_text_to_ids_map[col_name]['profile_id'] for col_name in answer_columns}
+    answer_rows = explode_multi_answers(
+        df_responses.loc[user_rows.index], profile_columns, '고유번호',
+        extra_columns={'설문일시': 'answered_at'}, normalize_codes=True
+    )
+    bulk_upsert(
+        cur, 'USER_PROFILE_ANSWERS', ['user_id', 'question_id', 'answer_value', 'answered_at'], answer_rows,
+        conflict_columns=['user_id', 'question_id', 'answer_value'],
+        keep='first'
+    )
+    print(f"-> USER_PROFILE_ANSWERS {len(answer_rows)}행 처리를 완료했습니다.")
+
 # --- 메인 실행 로직 (기존과 동일) ---
 if __name__ == "__main__":
     conn = None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_connection(DB_CONFIG)  # 프로세스 공용 커넥션 풀에서 꺼내기
         cur = conn.cursor()
         print("데이터베이스에 성공적으로 연결되었습니다.")
         
@@ -178,5 +166,5 @@ if __name__ == "__main__":
     finally:
         if conn:
             cur.close()
-            conn.close()
+            release_connection(conn)  # 닫지 않고 풀에 반환
             print("데이터베이스 연결을 종료했습니다.")
\ No newline at end of file
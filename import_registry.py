@@ -0,0 +1,85 @@
+"""
+임포트 기록 (IMPORT_LOG 테이블)
+
+같은 엑셀 파일로 업로드 스크립트를 다시 실행하면 파싱/정제/업서트를 처음부터 반복하게 된다.
+적재가 끝날 때마다 (파일 내용 해시, 시트, 모드) 를 키로 행 수와 걸린 시간을 기록해 두고,
+다음 실행에서는 파일 해시만 계산해 이미 적재한 입력이면 바로 건너뛴다.
+- 파일 이름/경로가 바뀌어도 내용이 같으면 같은 입력으로 봄
+- 다시 적재하려면 force=True (각 스크립트의 FORCE_RELOAD)
+"""
+import os
+import time
+
+from excel_cache import file_content_hash
+
+IMPORT_LOG_TABLE = 'IMPORT_LOG'
+
+
+def ensure_import_log(cur):
+    """IMPORT_LOG 테이블이 없으면 생성"""
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {IMPORT_LOG_TABLE} (
+            content_hash CHAR(64) NOT NULL,
+            sheet TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            file_name TEXT,
+            target_table TEXT,
+            row_count BIGINT,
+            duration_seconds DOUBLE PRECISION,
+            imported_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (content_hash, sheet, mode)
+        );
+        """
+    )
+
+
+def find_import(cur, content_hash, sheet, mode):
+    """이전 적재 기록 (row_count, duration_seconds, imported_at, file_name) 반환, 없으면 None"""
+    cur.execute(
+        f"SELECT row_count, duration_seconds, imported_at, file_name FROM {IMPORT_LOG_TABLE} "
+        "WHERE content_hash = %s AND sheet = %s AND mode = %s;",
+        (content_hash, str(sheet), mode)
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return dict(zip(['row_count', 'duration_seconds', 'imported_at', 'file_name'], row))
+
+
+def record_import(cur, content_hash, sheet, mode, file_name, row_count, duration_seconds):
+    """적재 기록 저장 (강제 재적재면 기존 기록을 덮어씀)"""
+    cur.execute(
+        f"""
+        INSERT INTO {IMPORT_LOG_TABLE} (content_hash, sheet, mode, file_name, row_count, duration_seconds, imported_at)
+        VALUES (%s, %s, %s, %s, %s, %s, NOW())
+        ON CONFLICT (content_hash, sheet, mode) DO UPDATE SET
+            file_name = EXCLUDED.file_name, row_count = EXCLUDED.row_count,
+            duration_seconds = EXCLUDED.duration_seconds, imported_at = NOW();
+        """,
+        (content_hash, str(sheet), mode, os.path.basename(file_name), row_count, duration_seconds)
+    )
+
+
+def run_once(cur, file_path, sheet, mode, import_func, force=False):
+    """
+    import_func(cur, file_path) 를 입력당 한 번만 실행하고 기록
+    import_func 는 적재한 행 수를 반환해야 함
+    반환: (실행 여부, 행 수) - 이미 적재한 입력이면 (False, 기록된 행 수)
+    """
+    ensure_import_log(cur)
+    content_hash = file_content_hash(file_path)
+    if not force:
+        previous = find_import(cur, content_hash, sheet, mode)
+        if previous is not None:
+            print(f"-> 이미 적재한 파일입니다 ({previous['imported_at']:%Y-%m-%d %H:%M}, "
+                  f"{previous['row_count']}행, {previous['duration_seconds']:.1f}초). 건너뜁니다. "
+                  f"(다시 적재하려면 FORCE_RELOAD = True)")
+            return False, previous['row_count']
+
+    started = time.perf_counter()
+    row_count = import_func(cur, file_path)
+    duration = time.perf_counter() - started
+    record_import(cur, content_hash, sheet, mode, file_path, row_count, duration)
+    print(f"-> 적재 기록 저장: {row_count}행, {duration:.1f}초")
+    return True, row_count
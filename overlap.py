@@ -1,56 +1,308 @@
+"""
+중복 행 분석기
+
+모든 컬럼(대소문자/앞뒤 띄어쓰기 무시)이 같은 행들을 중복 그룹으로 묶어
+그룹 번호, 그룹 크기, 행 번호를 리포트 파일(Parquet/CSV)로 저장하고 요약 통계만 출력한다.
+- 컬럼별 고유값만 정규화/해시한 뒤 행마다 128비트 키(64비트 해시 2개)로 합쳐 한 번에 그룹화
+- 수백만 행 파일에서도 행 단위 파이썬 반복이나 전체 컬럼 groupby 없이 동작
+
+띄어쓰기/문장부호나 답변 한두 개만 다른 유사 중복 응답은 MinHash + LSH 로 찾는다.
+- 행마다 (컬럼, 정규화한 값) 토큰 집합의 MinHash 시그니처를 만들고
+  밴드별 버킷이 같은 행만 후보로 삼아 실제 자카드 유사도로 확인 (전체 쌍 비교 없음)
+
+다른 스크립트에서는 find_duplicate_groups(df), find_near_duplicate_groups(df) 로
+리포트 DataFrame 만 받아 쓸 수 있다.
+"""
+import os
+import re
+
+import numpy as np
 import pandas as pd
+from pandas.util import hash_array
 
-# 엑셀 파일 읽기
+from excel_cache import read_excel_cached
+
+# --- 설정 ---
 file_path = r'C:/Users/ecopl/Desktop/qpoll 데이터/qpoll_join_250704.xlsx'
-df = pd.read_excel(file_path, header=1, engine='openpyxl')
-# 데이터프레임의 모든 열 이름을 리스트로 가져오기
-all_columns = list(df.columns)
-
-print("=== 비교 대상 컬럼 목록 (전체) ===")
-print(all_columns)
-print("=== 데이터 전체 행 수 ===")
-print(f"총 {len(df)}개의 행이 있습니다.\n")
-
-
-# 데이터 정규화 (대소문자 통일, 띄어쓰기 제거)
-print("=== 데이터 전처리 중 ===")
-print("- 대소문자를 소문자로 통일")
-print("- 앞뒤 띄어쓰기 제거\n")
-
-df_normalized = df.copy()
-for col in df_normalized.columns:
-    if df_normalized[col].dtype == 'object':  # 문자열 컬럼만
-        df_normalized[col] = df_normalized[col].astype(str).str.lower().str.strip()
-
-# 전체 행 기준 완전 중복 확인
-print("=== 완전히 동일한 중복 행 확인 (대소문자/띄어쓰기 무시) ===")
-print(f"총 {len(df.columns)}개의 컬럼을 모두 비교합니다.")
-print(f"비교 중인 컬럼: {list(df.columns)}\n")
-duplicates_mask = df_normalized.duplicated(keep=False)
-duplicates_all = df[duplicates_mask]  # 원본 데이터로 표시
-
-if len(duplicates_all) > 0:
-    print(f"완전히 동일한 중복 행이 {len(duplicates_all)}개 있습니다.\n")
-    
-    # 중복된 행들을 그룹으로 묶어서 보여주기
-    duplicate_groups = df_normalized[duplicates_mask].groupby(list(df_normalized.columns))
-    
-    group_num = 1
-    for name, group in duplicate_groups:
-        print(f"[중복 그룹 {group_num}] - {len(group)}개의 동일한 행:")
-        # 원본 데이터로 표시 (정규화 전)
-        print(df.loc[group.index])
-        print(f"행 번호 (인덱스): {list(group.index)}")
-        print("-" * 80)
-        group_num += 1
-        
-    # 중복 제거 시 남을 행 수
-    unique_count = len(df_normalized.drop_duplicates())
-    removed_count = len(df) - unique_count
-    print(f"\n중복 제거 시: {unique_count}개 행이 남고, {removed_count}개 행이 제거됩니다.")
-    
-else:
-    print("완전히 동일한 중복 행이 없습니다.")
-
-print("\n" + "="*50 + "\n")
+HEADER_ROW = 1                              # 두 번째 행을 헤더로 사용
+REPORT_PATH = 'overlap_report.parquet'      # .parquet 또는 .csv (pyarrow 가 없으면 CSV 로 저장)
+
+# 유사 중복 설정
+NEAR_DUPLICATE_THRESHOLD = 0.8              # 자카드 유사도 기준 (컬럼 10개 중 1개만 다르면 9/11 = 0.82)
+NEAR_DUPLICATE_COLUMNS = None               # 비교할 답변 컬럼 (None: 전체 컬럼, 고유번호 같은 ID 컬럼은 빼는 것을 권장)
+NUM_PERM = 64                               # MinHash 시그니처 길이 (클수록 정확, 느림)
+NEAR_REPORT_PATH = 'near_duplicate_report.parquet'
+
+# 128비트 키를 만드는 두 해시의 키 (16바이트)
+_HASH_KEYS = ('0123456789123456', 'qpolloverlapkey2')
+# 결측치(문자열 컬럼 제외) 자리에 쓰는 값 - 실제 값과 겹치지 않도록 제어 문자 사용
+_MISSING_TOKEN = '\x00<NA>'
+
+
+def _normalized_uniques(series):
+    """
+    컬럼의 고유값을 정규화한 문자열 배열과 행별 코드 반환
+    마지막 칸은 결측치(코드 -1) 자리
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    uniques = np.asarray(uniques, dtype=object)
+    if series.dtype == object:
+        # 문자열 컬럼: 소문자 + 앞뒤 띄어쓰기 제거 (결측치도 기존과 같이 'nan' 으로 취급)
+        keys = [str(value).lower().strip() for value in uniques] + ['nan']
+    else:
+        keys = [str(value) for value in uniques] + [_MISSING_TOKEN]
+    return np.array(keys, dtype=object), codes
+
+
+def normalized_row_keys(df, columns=None):
+    """행마다 정규화한 값들의 128비트 키 (uint64 배열 2개)"""
+    columns = list(df.columns) if columns is None else list(columns)
+    keys = [np.zeros(len(df), dtype=np.uint64) for _ in _HASH_KEYS]
+    multiplier = np.uint64(1000003)
+
+    for col in columns:
+        uniques, codes = _normalized_uniques(df[col])
+        for i, hash_key in enumerate(_HASH_KEYS):
+            # 문자열 해시는 고유값 수만큼만, 행 단위는 정수 연산만
+            column_hash = hash_array(uniques, hash_key=hash_key)[codes]
+            keys[i] = keys[i] * multiplier ^ column_hash
+    return keys
+
+
+def find_duplicate_groups(df, columns=None):
+    """
+    중복 그룹 리포트 생성
+    반환: 중복 행마다 한 줄인 DataFrame (group_id, group_size, row_index)
+          group_id 는 그룹이 처음 나온 순서대로 1부터
+    """
+    high, low = normalized_row_keys(df, columns)
+    group_codes = pd.DataFrame({'high': high, 'low': low}).groupby(
+        ['high', 'low'], sort=False
+    ).ngroup().to_numpy()
+    group_sizes = np.bincount(group_codes)
+
+    duplicated = group_sizes[group_codes] > 1
+    positions = np.flatnonzero(duplicated)
+
+    # 중복 그룹만 등장 순서대로 다시 번호 매기기
+    duplicate_group_ids, _ = pd.factorize(group_codes[positions])
+    report = pd.DataFrame({
+        'group_id': duplicate_group_ids + 1,
+        'group_size': group_sizes[group_codes[positions]],
+        'row_index': df.index.to_numpy()[positions],
+    })
+    return report.sort_values(['group_id', 'row_index'], kind='stable', ignore_index=True)
+
+
+def write_report(report, path):
+    """리포트 저장 (확장자가 .parquet 이면 Parquet, 아니면 CSV), 저장한 경로 반환"""
+    if path.endswith('.parquet'):
+        try:
+            report.to_parquet(path, index=False)
+            return path
+        except ImportError:
+            path = os.path.splitext(path)[0] + '.csv'
+            print("- pyarrow 가 없어 CSV 로 저장합니다.")
+    report.to_csv(path, index=False, encoding='utf-8-sig')
+    return path
+
+
+def print_summary(df, report):
+    """요약 통계 출력"""
+    print("=== 완전히 동일한 중복 행 확인 (대소문자/띄어쓰기 무시) ===")
+    print(f"총 {len(df.columns)}개의 컬럼을 모두 비교합니다.")
+    print(f"전체 행 수: {len(df)}")
+
+    if report.empty:
+        print("완전히 동일한 중복 행이 없습니다.")
+        return
+
+    group_sizes = report.drop_duplicates('group_id')['group_size']
+    print(f"중복 행 수: {len(report)}개 ({len(group_sizes)}개 그룹)")
+    print(f"가장 큰 그룹: {group_sizes.max()}개 행")
+
+    print("\n그룹 크기별 그룹 수:")
+    print(group_sizes.value_counts().sort_index().rename_axis('group_size').to_string())
+
+    # 그룹마다 한 행씩만 남음
+    unique_count = len(df) - len(report) + len(group_sizes)
+    print(f"\n중복 제거 시: {unique_count}개 행이 남고, {len(df) - unique_count}개 행이 제거됩니다.")
+
+
+# --- 유사 중복 (MinHash + LSH) ---
+
+# MinHash 토큰 해시 키 (128비트 키를 만드는 _HASH_KEYS 와 다른 두 키 -> 서로 독립인 64비트 해시 2개)
+_MINHASH_TOKEN_KEYS = ('qpollminhashkey1', 'qpollminhashkey2')
+_PUNCTUATION_PATTERN = re.compile(r'[\s\W_]+')
+
+
+def _near_duplicate_tokens(df, columns):
+    """
+    컬럼마다 (행별 코드, 고유값 토큰 해시 2개 (uint64 배열 튜플), 고유값 정규화 번호) 반환
+    토큰은 '컬럼명 + 띄어쓰기/문장부호 제거한 소문자 값', 마지막 칸은 결측치 자리
+    """
+    tokens = []
+    for col in columns:
+        codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+        values = [str(value) for value in np.asarray(uniques, dtype=object)] + ['nan']
+        normalized = [_PUNCTUATION_PATTERN.sub('', value.lower()) for value in values]
+        token_strings = np.array([f"{col}\x1f{value}" for value in normalized], dtype=object)
+        token_hashes = tuple(hash_array(token_strings, hash_key=hash_key) for hash_key in _MINHASH_TOKEN_KEYS)
+        normalized_ids, _ = pd.factorize(pd.Series(normalized, dtype=object))
+        tokens.append((codes, token_hashes, normalized_ids))
+    return tokens
+
+
+def minhash_signatures(tokens, n_rows, num_perm=NUM_PERM, seed=1, block_rows=65536):
+    """
+    행마다 토큰 집합의 MinHash 시그니처 ((행 수, num_perm) uint64), 메모리는 block_rows 단위로 사용
+    순열마다 64비트 키 2개를 뽑아 토큰 해시 2개에 각각 XOR 한 뒤 섞어서(splitmix64) 합침
+    ((a * x + b) mod p 를 같은 해시값 x 에 돌리면 순열끼리 상관이 생겨 재현율이 이론값보다 낮아짐)
+    """
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(0, np.iinfo(np.uint64).max, (2, num_perm), dtype=np.uint64, endpoint=True)
+
+    signatures = np.empty((n_rows, num_perm), dtype=np.uint64)
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        block = np.full((stop - start, num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+        for codes, (high, low), _ in tokens:
+            # 블록에 나온 고유값만 순열마다 해시 후 행으로 펼침 (정수 배열 hash_array 는 splitmix64 섞기)
+            present, inverse = np.unique(codes[start:stop], return_inverse=True)
+            permuted = (
+                hash_array((high[present][:, None] ^ keys[0]).ravel())
+                ^ hash_array((low[present][:, None] ^ keys[1]).ravel())
+            ).reshape(len(present), num_perm)
+            np.minimum(block, permuted[inverse], out=block)
+        signatures[start:stop] = block
+    return signatures
+
+
+def _lsh_bands(threshold, num_perm, recall=0.95):
+    """
+    (밴드 수, 밴드당 행 수) 선택 - 유사도가 threshold 인 쌍이 recall 이상의 확률로 후보가 되는
+    가장 큰 밴드당 행 수 (후보는 실제 유사도로 다시 확인하므로 놓치지 않는 쪽을 우선)
+    """
+    for rows in range(num_perm, 0, -1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return num_perm, 1
+
+
+def _candidate_pairs(signatures, bands, rows_per_band):
+    """밴드마다 시그니처 조각이 같은 행을 버킷의 첫 행과 짝지음 (버킷 크기에 비례, 전체 쌍 아님)"""
+    n_rows = len(signatures)
+    positions = np.arange(n_rows)
+    pairs = []
+    for band in range(bands):
+        band_values = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        bucket_key = np.zeros(n_rows, dtype=np.uint64)
+        for j in range(rows_per_band):
+            bucket_key = bucket_key * np.uint64(1000003) ^ band_values[:, j]
+
+        # 버킷 번호(0..k-1)마다 처음 나온 행 위치
+        bucket_codes, _ = pd.factorize(bucket_key)
+        _, first = np.unique(bucket_codes, return_index=True)
+        representative = first[bucket_codes]
+        members = np.flatnonzero(representative != positions)
+        pairs.append(np.stack([representative[members], members], axis=1))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def _jaccard(tokens, left, right):
+    """행 쌍의 토큰 집합 자카드 유사도 (컬럼마다 토큰 하나: 같은 컬럼 수 / (2 * 컬럼 수 - 같은 컬럼 수))"""
+    same = np.zeros(len(left), dtype=np.int64)
+    for codes, _, normalized_ids in tokens:
+        same += normalized_ids[codes[left]] == normalized_ids[codes[right]]
+    return same / (2 * len(tokens) - same)
+
+
+def find_near_duplicate_groups(df, columns=None, threshold=NEAR_DUPLICATE_THRESHOLD,
+                               num_perm=NUM_PERM, seed=1):
+    """
+    유사 중복 그룹 리포트 생성
+    반환: 그룹에 속한 행마다 한 줄인 DataFrame (cluster_id, cluster_size, row_index)
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    empty = pd.DataFrame({'cluster_id': [], 'cluster_size': [], 'row_index': []}, dtype=np.int64)
+    if len(df) < 2 or not columns:
+        return empty
+
+    tokens = _near_duplicate_tokens(df, columns)
+    signatures = minhash_signatures(tokens, len(df), num_perm, seed)
+    bands, rows_per_band = _lsh_bands(threshold, num_perm)
+    pairs = _candidate_pairs(signatures, bands, rows_per_band)
+
+    # 후보 쌍 중 실제 유사도가 기준 이상인 것만 연결
+    pairs = pairs[_jaccard(tokens, pairs[:, 0], pairs[:, 1]) >= threshold]
+    if len(pairs) == 0:
+        return empty
+
+    # union-find 로 연결된 행끼리 묶기 (후보 쌍 수만큼만 반복)
+    parent = {}
+
+    def find(x):
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while parent.get(x, x) != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for left, right in pairs.tolist():
+        left_root, right_root = find(left), find(right)
+        if left_root != right_root:
+            parent[max(left_root, right_root)] = min(left_root, right_root)
+
+    positions = np.array(sorted(set(pairs.ravel().tolist())), dtype=np.int64)
+    roots = np.array([find(position) for position in positions.tolist()], dtype=np.int64)
+    cluster_codes, _ = pd.factorize(roots)
+    cluster_sizes = np.bincount(cluster_codes)
+    report = pd.DataFrame({
+        'cluster_id': cluster_codes + 1,
+        'cluster_size': cluster_sizes[cluster_codes],
+        'row_index': df.index.to_numpy()[positions],
+    })
+    return report.sort_values(['cluster_id', 'row_index'], kind='stable', ignore_index=True)
+
+
+def print_near_summary(report, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """유사 중복 요약 통계 출력"""
+    print(f"=== 유사 중복 행 확인 (MinHash/LSH, 자카드 유사도 {threshold} 이상) ===")
+    if report.empty:
+        print("유사 중복 행이 없습니다.")
+        return
+
+    cluster_sizes = report.drop_duplicates('cluster_id')['cluster_size']
+    print(f"유사 중복 행 수: {len(report)}개 ({len(cluster_sizes)}개 그룹)")
+    print(f"가장 큰 그룹: {cluster_sizes.max()}개 행")
+
+
+def main():
+    df = read_excel_cached(file_path, header=HEADER_ROW)
+    print(f"'{file_path}' 파일에서 {len(df)}개 행을 읽었습니다.\n")
+
+    report = find_duplicate_groups(df)
+    print_summary(df, report)
+
+    if not report.empty:
+        saved_path = write_report(report, REPORT_PATH)
+        print(f"\n중복 그룹 리포트 저장: {saved_path} ({len(report)}행)")
+
+    print()
+    near_report = find_near_duplicate_groups(df, NEAR_DUPLICATE_COLUMNS)
+    print_near_summary(near_report)
+
+    if not near_report.empty:
+        saved_path = write_report(near_report, NEAR_REPORT_PATH)
+        print(f"\n유사 중복 그룹 리포트 저장: {saved_path} ({len(near_report)}행)")
+
+    print("\n" + "="*50 + "\n")
+
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+PostgreSQL 바이너리 COPY 인코더
+
+COPY ... FROM STDIN WITH (FORMAT binary) 형식으로 DataFrame 을 인코딩한다.
+text/CSV COPY 는 날짜, 시각, 정수를 파이썬에서 문자열로 만들고 PostgreSQL 이 다시 파싱하지만,
+바이너리 형식은 NumPy 배열 값을 빅엔디안 바이트로 바꿔 그대로 보낸다.
+- 행 단위 파이썬 반복 없이 컬럼별 배열 연산으로 한 번에 버퍼를 채움
+- 문자열은 고유값만 UTF-8 인코딩 (pyarrow 가 있으면 Arrow 버퍼 사용)
+- 지원 타입: int2/int4/int8, float4/float8, bool, date, timestamp(tz), text/varchar
+- 컬럼 타입은 대상 테이블에서 읽은 OID 로 결정 (지원하지 않는 타입이 있으면 호출하는 쪽에서 text COPY 사용)
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+# PostgreSQL 타입 OID -> 인코딩 방식
+BOOL, INT2, INT4, INT8, FLOAT4, FLOAT8, TEXT, DATE, TIMESTAMP, TIMESTAMPTZ = (
+    'bool', 'int2', 'int4', 'int8', 'float4', 'float8', 'text', 'date', 'timestamp', 'timestamptz'
+)
+PG_BINARY_TYPES = {
+    16: BOOL,
+    21: INT2,
+    23: INT4,
+    20: INT8,
+    700: FLOAT4,
+    701: FLOAT8,
+    25: TEXT,
+    1043: TEXT,       # varchar
+    1042: TEXT,       # char(n)
+    1082: DATE,
+    1114: TIMESTAMP,
+    1184: TIMESTAMPTZ,
+}
+
+# 고정 길이 타입의 빅엔디안 NumPy 형식
+_FIXED_FORMATS = {
+    BOOL: '>u1', INT2: '>i2', INT4: '>i4', INT8: '>i8', FLOAT4: '>f4', FLOAT8: '>f8',
+    DATE: '>i4', TIMESTAMP: '>i8', TIMESTAMPTZ: '>i8',
+}
+_INT_RANGES = {INT2: np.iinfo(np.int16), INT4: np.iinfo(np.int32), INT8: np.iinfo(np.int64)}
+# 날짜/시각 컬럼으로 받을 값 종류 (문자열은 PostgreSQL 과 해석이 다를 수 있어 text COPY 로)
+_DATETIME_INFERRED = ('date', 'datetime', 'datetime64', 'empty')
+
+_SIGNATURE = b'PGCOPY\n\xff\r\n\x00' + b'\x00\x00\x00\x00' + b'\x00\x00\x00\x00'
+_TRAILER = b'\xff\xff'
+# PostgreSQL 날짜/시각의 기준점
+_PG_EPOCH = np.datetime64('2000-01-01T00:00:00', 'ns')
+_NS_PER_DAY = 86400 * 10**9
+
+
+def column_types(cursor, table, columns):
+    """대상 테이블 컬럼의 타입 OID 를 읽어 인코딩 방식 목록으로 반환 (지원하지 않는 타입은 None)"""
+    cursor.execute(f"SELECT {', '.join(columns)} FROM {table} LIMIT 0")
+    return [PG_BINARY_TYPES.get(desc[1]) for desc in cursor.description]
+
+
+def _datetime_values(present, kind):
+    """결측치를 뺀 날짜/시각 값 -> 2000-01-01 기준 나노초 (int64)"""
+    if present.dtype == object and pd.api.types.infer_dtype(present) not in _DATETIME_INFERRED:
+        raise TypeError(f"날짜/시각이 아닌 값이 있습니다: {present.name}")
+    values = pd.to_datetime(present, errors='raise')
+    if values.dt.tz is not None:
+        values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+    elif kind == TIMESTAMPTZ and len(present):
+        # 시간대 없는 값은 세션 시간대 기준으로 해석해야 하므로 text COPY 로
+        raise TypeError(f"timestamptz 컬럼에 시간대 없는 값이 있습니다: {present.name}")
+    return (values.to_numpy(dtype='datetime64[ns]') - _PG_EPOCH).astype(np.int64)
+
+
+def _round_microseconds(ns):
+    """
+    나노초 -> 마이크로초, text 입력과 같은 방식으로 반올림
+    PostgreSQL 은 초 아래 소수를 double 로 읽어 rint(frac * 1000000) 하므로 (0.5 는 짝수 쪽)
+    버리면 text/CSV COPY 와 1마이크로초 달라질 수 있음
+    """
+    seconds, frac_ns = np.divmod(ns, 10**9)
+    frac = frac_ns.astype(np.float64) / 1e9
+    return seconds * 10**6 + np.rint(frac * 1e6).astype(np.int64)
+
+
+def _integer_values(present, kind):
+    """결측치를 뺀 정수 컬럼 값 -> int64 (소수/범위 초과/bool 은 오류)"""
+    numbers = pd.to_numeric(present, errors='raise').to_numpy()
+    if numbers.dtype.kind == 'f':
+        if not np.array_equal(numbers, np.trunc(numbers)):
+            raise ValueError(f"정수 컬럼에 소수 값이 있습니다: {present.name}")
+    elif numbers.dtype.kind not in 'iu':
+        raise TypeError(f"정수가 아닌 값이 있습니다: {present.name}")
+    limits = _INT_RANGES[kind]
+    if len(numbers) and (numbers.min() < limits.min or numbers.max() > limits.max):
+        raise ValueError(f"정수 범위를 벗어난 값이 있습니다: {present.name}")
+    return numbers.astype(np.int64)
+
+
+def _encode_fixed(series, kind):
+    """고정 길이 컬럼 -> (값 바이트 (행 수, 폭) uint8, 결측치 마스크)"""
+    mask = series.isna().to_numpy()
+    present = series[~mask]
+
+    if kind in (DATE, TIMESTAMP, TIMESTAMPTZ):
+        ns = _datetime_values(present, kind)
+        # 날짜는 일 수, 시각은 마이크로초
+        values = ns // _NS_PER_DAY if kind == DATE else _round_microseconds(ns)
+    elif kind == BOOL:
+        if pd.api.types.infer_dtype(present) not in ('boolean', 'empty'):
+            raise TypeError(f"bool 이 아닌 값이 있습니다: {series.name}")
+        values = present.to_numpy(dtype=bool)
+    elif kind in _INT_RANGES:
+        values = _integer_values(present, kind)
+    else:
+        values = pd.to_numeric(present, errors='raise').to_numpy(dtype=np.float64)
+
+    data = np.zeros(len(series), dtype=_FIXED_FORMATS[kind])
+    data[~mask] = values
+    return data.view(np.uint8).reshape(len(series), data.dtype.itemsize), mask
+
+
+def _encode_strings(values):
+    """문자열 목록 -> (UTF-8 바이트 버퍼 uint8, 오프셋 배열 int64)"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+    array = pa.array(values, type=pa.large_string())
+    _, offset_buffer, data_buffer = array.buffers()
+    offsets = np.frombuffer(offset_buffer, dtype=np.int64)[:len(array) + 1]
+    if data_buffer is None:
+        return np.zeros(0, dtype=np.uint8), offsets
+    return np.frombuffer(data_buffer, dtype=np.uint8), offsets
+
+
+def _encode_text(series):
+    """문자열 컬럼 -> (UTF-8 버퍼, 행별 시작 위치, 행별 길이, 결측치 마스크) - 고유값만 인코딩"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    # 문자열이 아닌 값은 str() 로 (text COPY 와 동일)
+    data, offsets = _encode_strings(
+        [value if isinstance(value, str) else str(value) for value in uniques]
+    )
+
+    # 마지막 칸은 결측치(코드 -1) 자리
+    starts = np.append(offsets[:-1], 0)[codes]
+    lengths = np.append(np.diff(offsets), 0)[codes]
+    return data, starts, lengths, codes < 0
+
+
+def _scatter_bytes(buffer, destinations, source, source_starts, lengths):
+    """행마다 source[source_starts[i]:+lengths[i]] 를 buffer[destinations[i]:] 로 복사 (반복문 없이)"""
+    total = int(lengths.sum())
+    if total == 0:
+        return
+    before = np.cumsum(lengths) - lengths
+    step = np.arange(total, dtype=np.int64)
+    buffer[np.repeat(destinations - before, lengths) + step] = \
+        source[np.repeat(source_starts - before, lengths) + step]
+
+
+def encode_binary_copy(df, kinds):
+    """
+    DataFrame -> 바이너리 COPY 데이터 (bytes)
+    kinds: 컬럼별 인코딩 방식 (column_types 결과), 변환할 수 없는 값이 있으면 ValueError/TypeError
+    """
+    n_rows = len(df)
+    encoded = []
+    # 행마다 필드 수(2바이트) + 필드별 길이(4바이트)
+    row_sizes = np.full(n_rows, 2 + 4 * len(kinds), dtype=np.int64)
+    for position, kind in enumerate(kinds):
+        series = df.iloc[:, position]
+        if kind == TEXT:
+            data, starts, lengths, mask = _encode_text(series)
+            encoded.append((kind, data, starts, lengths, mask))
+        else:
+            data, mask = _encode_fixed(series, kind)
+            lengths = np.where(mask, 0, data.shape[1])
+            encoded.append((kind, data, None, lengths, mask))
+        row_sizes += lengths
+
+    row_starts = np.zeros(n_rows, dtype=np.int64)
+    np.cumsum(row_sizes[:-1], out=row_starts[1:])
+    body_size = int(row_sizes.sum())
+    buffer = np.empty(len(_SIGNATURE) + body_size + len(_TRAILER), dtype=np.uint8)
+    buffer[:len(_SIGNATURE)] = np.frombuffer(_SIGNATURE, dtype=np.uint8)
+    buffer[len(_SIGNATURE) + body_size:] = np.frombuffer(_TRAILER, dtype=np.uint8)
+    row_starts += len(_SIGNATURE)
+
+    # 필드 수
+    field_count = np.frombuffer(np.array(len(kinds), dtype='>i2').tobytes(), dtype=np.uint8)
+    buffer[row_starts[:, None] + np.arange(2)] = field_count
+
+    position = row_starts + 2
+    for kind, data, starts, lengths, mask in encoded:
+        # 필드 길이 (결측치는 -1)
+        length_field = np.where(mask, -1, lengths).astype('>i4').view(np.uint8).reshape(-1, 4)
+        buffer[position[:, None] + np.arange(4)] = length_field
+        values_at = position + 4
+        if kind == TEXT:
+            _scatter_bytes(buffer, values_at, data, starts, lengths)
+        else:
+            present = ~mask
+            buffer[values_at[present][:, None] + np.arange(data.shape[1])] = data[present]
+        position = values_at + lengths
+
+    return buffer.tobytes()
+
+
+def copy_binary(cursor, table, columns, df, kinds):
+    """
+    DataFrame 을 바이너리 COPY 로 적재, 적재한 행 수 반환
+    인코딩을 모두 마친 뒤 전송하므로 변환 오류(ValueError/TypeError)가 나면 아무것도 보내지 않음
+    """
+    data = encode_binary_copy(df, kinds)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)"
+    cursor.copy_expert(sql, io.BytesIO(data))
+    return len(df)
@@ -2,23 +2,35 @@
 """
 전체 데이터 처리 파이프라인
 """
+import hashlib
+import json
 import logging
-from cleaners.data_cleaner import DataCleaner
+import time
+from contextlib import nullcontext
+from cleaners.data_cleaner import DataCleaner, SeenRows
 from cleaners.language_filter import LanguageFilter
+from cleaners.language_cache import LanguageCache
 from utils.db_manager import DatabaseManager
 from utils.data_loader import DataLoader
+from utils.excel_cache import file_content_hash
 
 logger = logging.getLogger(__name__)
 
 
-class DataPipeline:
-    """전체 데이터 처리 파이프라인 클래스"""
+class CleaningPipeline:
+    """엑셀 로드 + 정제 파이프라인 클래스 (DB 연결 없음, 일괄 처리의 정제 프로세스에서도 사용)"""
     
-    def __init__(self, db_config, question_mappings=None):
-        self.db_manager = DatabaseManager(db_config)
+    def __init__(self, question_mappings=None, language_cache_config=None, language_filter_config=None):
         self.data_loader = DataLoader(question_mappings)
         self.data_cleaner = DataCleaner()
-        self.language_filter = LanguageFilter()
+        # 언어 감지 캐시는 파이프라인 하나가 처리하는 모든 컬럼/파일에서 공유
+        self.language_cache = LanguageCache(**(language_cache_config or {}))
+        self.language_filter = LanguageFilter(self.language_cache, **(language_filter_config or {}))
+    
+    def close(self):
+        """언어 감지 프로세스 풀 종료 + 새로 감지한 언어 결과를 디스크 캐시에 반영"""
+        self.language_filter.close()
+        self.language_cache.close()
     
     def process(self, file_path, text_columns=None, sheet_name=None, 
                 target_language='ko', header=1):
@@ -31,8 +43,9 @@ class DataPipeline:
         # 2. 스트레스 문항 매핑
         df = self.data_loader.map_stress_values(df)
         
-        # 3. 기본 정제
+        # 3. 기본 정제 + 고유값이 적은 컬럼은 범주형으로 변환
         df = self.data_cleaner.basic_cleaning(df)
+        df = self.data_cleaner.to_categorical(df)
         
         # 4. 중복 제거
         df = self.data_cleaner.remove_duplicates(df)
@@ -43,11 +56,122 @@ class DataPipeline:
         logger.info("데이터 정제 프로세스 완료")
         return df
     
+    def process_in_chunks(self, file_path, text_columns=None, sheet_name=None,
+                          target_language='ko', header=1, chunk_size=50000):
+        """
+        분할 데이터 정제 프로세스 (제너레이터)
+        엑셀을 chunk_size 행씩 읽어 매핑 -> 정제 -> 중복 제거 -> 언어 필터링 후 순서대로 반환
+        """
+        logger.info(f"분할 데이터 정제 프로세스 시작 (chunk_size={chunk_size})")
+        
+        # 이전 청크에서 이미 나온 행 (청크 간 중복 제거용, 해시가 같으면 실제 값까지 비교)
+        seen_rows = SeenRows()
+        
+        # 청크의 dtype 은 data_loader 가 첫 청크에 맞춰 주므로 같은 행은 청크가 달라도 해시가 같음
+        for chunk in self.data_loader.iter_excel_chunks(file_path, sheet_name, header, chunk_size):
+            chunk = self.data_loader.map_stress_values(chunk)
+            chunk = self.data_cleaner.basic_cleaning(chunk)
+            chunk = self.data_cleaner.to_categorical(chunk)
+            # 중복 제거에서 계산한 행 해시를 청크 간 비교에 그대로 사용
+            chunk, row_hashes = self.data_cleaner.remove_duplicates(chunk, return_fingerprints=True)
+            
+            # 이전 청크와 겹치는 행 제거 (범주형 컬럼도 값 기준으로 해시되어 청크 간 비교 가능)
+            chunk, _ = seen_rows.filter_new(chunk, row_hashes)
+            
+            chunk = self.language_filter.filter_by_language(chunk, text_columns, target_language)
+            yield chunk
+        
+        logger.info("분할 데이터 정제 프로세스 완료")
+
+
+class DataPipeline(CleaningPipeline):
+    """전체 데이터 처리 파이프라인 클래스 (정제 + DB 저장)"""
+    
+    def __init__(self, db_config, question_mappings=None, language_cache_config=None,
+                 language_filter_config=None, pool_config=None):
+        # 같은 DB 를 쓰는 파이프라인끼리 커넥션 풀 공유
+        self.db_manager = DatabaseManager(db_config, pool_config)
+        super().__init__(question_mappings, language_cache_config, language_filter_config)
+    
+    def _import_mode(self, table_name, text_columns, target_language, header):
+        """적재 기록의 모드 - 대상 테이블 + 정제 설정 (설정이 바뀌면 다른 적재로 봄)"""
+        settings = json.dumps(
+            [self.data_loader.question_mappings, text_columns, target_language, header],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return f"pipeline:{table_name}:{hashlib.sha256(settings.encode('utf-8')).hexdigest()[:12]}"
+    
+    def _previous_import(self, content_hash, sheet_name, mode, table_name, if_exists):
+        """같은 입력을 이미 적재했으면 기록 반환 (테이블을 덮어쓰는 적재는 마지막 적재일 때만)"""
+        previous = self.db_manager.find_import(
+            content_hash, sheet_name or 0, mode,
+            target_table=table_name if if_exists == 'replace' else None
+        )
+        if previous is not None:
+            logger.info(
+                f"이미 적재한 파일이라 건너뜀: {previous['file_name']} -> {table_name} "
+                f"({previous['imported_at']}, {previous['row_count']}행)"
+            )
+        return previous
+    
+    def process_and_save_in_chunks(self, file_path, table_name, text_columns=None,
+                                   sheet_name=None, target_language='ko',
+                                   if_exists='replace', header=0, chunk_size=50000,
+                                   force_reload=False):
+        """
+        분할 프로세스: 청크마다 정제 + 저장, 저장한 전체 행 수 반환
+        같은 입력을 이미 적재했으면 (force_reload=False) 아무것도 하지 않고 None 반환
+        """
+        content_hash = file_content_hash(file_path)
+        mode = self._import_mode(table_name, text_columns, target_language, header)
+        if not force_reload and self._previous_import(content_hash, sheet_name, mode, table_name, if_exists):
+            return None
+        
+        started = time.perf_counter()
+        saved_count = 0
+        
+        def record(conn=None):
+            """적재 기록 (conn 이 있으면 데이터를 커밋하는 트랜잭션 안에서)"""
+            self.db_manager.record_import(
+                content_hash, sheet_name or 0, mode, file_path, saved_count,
+                time.perf_counter() - started, target_table=table_name, conn=conn
+            )
+        
+        # replace 는 모든 청크를 새 테이블에 쌓은 뒤 한 번에 교체 (적재 중에도 기존 테이블을 읽을 수 있음)
+        # 적재 기록은 교체하는 트랜잭션에서 함께 커밋
+        if if_exists == 'replace':
+            replacing = self.db_manager.replace_table(table_name, on_commit=record)
+        else:
+            replacing = nullcontext(table_name)
+        with replacing as target_table:
+            for i, chunk in enumerate(self.process_in_chunks(
+                file_path, text_columns, sheet_name, target_language, header, chunk_size
+            )):
+                # 첫 청크만 if_exists 규칙을 따르고 이후 청크는 이어 붙임
+                chunk_mode = 'append' if i > 0 or if_exists == 'replace' else if_exists
+                self.db_manager.save_dataframe(chunk, target_table, chunk_mode, verify=False)
+                saved_count += len(chunk)
+        
+        if if_exists != 'replace':
+            # 청크마다 커밋하는 이어 붙이기는 마지막에 따로 기록
+            record()
+        self.db_manager._verify_save(table_name)
+        return saved_count
+    
     # 기본값 None -> main.py에서 지정한 값이 전달됨
     def process_and_save(self, file_path, table_name, text_columns=None, 
                         sheet_name=None, target_language='ko',   
-                        if_exists='replace', header=0):
-        """전체 프로세스: 정제 + 저장"""
+                        if_exists='replace', header=0, force_reload=False):
+        """
+        전체 프로세스: 정제 + 저장
+        같은 입력을 이미 적재했으면 (force_reload=False) 파일을 읽지 않고 None 반환
+        """
+        if not force_reload and self.already_imported(
+            file_path, table_name, text_columns, sheet_name, target_language, if_exists, header
+        ):
+            return None
+        
+        started = time.perf_counter()
         # 데이터 정제
         cleaned_df = self.process(
             file_path, 
@@ -58,6 +182,34 @@ class DataPipeline:
         )
         
         # 데이터베이스 저장
-        self.db_manager.save_dataframe(cleaned_df, table_name, if_exists)
+        self.save_cleaned(
+            cleaned_df, file_path, table_name, text_columns, sheet_name, target_language,
+            if_exists, header, clean_seconds=time.perf_counter() - started
+        )
         
-        return cleaned_df
\ No newline at end of file
+        return cleaned_df
+    
+    def already_imported(self, file_path, table_name, text_columns=None, sheet_name=None,
+                         target_language='ko', if_exists='replace', header=0):
+        """같은 입력(파일 내용 + 시트 + 테이블/정제 설정)을 이미 적재했는지"""
+        mode = self._import_mode(table_name, text_columns, target_language, header)
+        previous = self._previous_import(file_content_hash(file_path), sheet_name, mode, table_name, if_exists)
+        return previous is not None
+    
+    def save_cleaned(self, cleaned_df, file_path, table_name, text_columns=None, sheet_name=None,
+                     target_language='ko', if_exists='replace', header=0, clean_seconds=0.0):
+        """
+        정제한 DataFrame 저장 + 적재 기록
+        clean_seconds: 정제에 걸린 시간 (적재 기록에 저장 시간과 합쳐서 남김)
+        """
+        started = time.perf_counter()
+        content_hash = file_content_hash(file_path)
+        mode = self._import_mode(table_name, text_columns, target_language, header)
+        # 적재 기록은 데이터를 커밋하는 트랜잭션에서 함께 (저장과 기록 사이에 중단되어 기록 없이 데이터만 남지 않도록)
+        self.db_manager.save_dataframe(
+            cleaned_df, table_name, if_exists,
+            on_commit=lambda conn: self.db_manager.record_import(
+                content_hash, sheet_name or 0, mode, file_path, len(cleaned_df),
+                clean_seconds + time.perf_counter() - started, target_table=table_name, conn=conn
+            )
+        )
@@ -0,0 +1,212 @@
+"""
+여러 엑셀 파일 일괄 처리 (batch.py 가 이 문항의 설정으로 사용)
+
+디렉터리 또는 glob 패턴에 맞는 파일(예: qpoll_join_*.xlsx)을
+1) 프로세스 풀에서 파일마다 읽기 + 정제 (CPU 작업을 코어 수만큼 병렬로, 정제 프로세스는 DB 에 연결하지 않음)
+2) 정제 결과를 정해진 수의 DB 저장 스레드가 커넥션 풀을 공유해 저장
+파일 하나가 실패해도 나머지 파일은 계속 처리하고, 끝나면 파일별 상태와 처리량을 출력한다.
+
+언어 감지 디스크 캐시는 정제 프로세스에서 읽기 전용으로만 열고,
+정제 프로세스가 새로 감지한 결과는 이 프로세스로 돌려받아 한 번에 반영한다 (SQLite 파일에 동시에 쓰지 않음).
+"""
+import glob
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# 정제 프로세스에서 쓰는 정제 파이프라인 (프로세스마다 하나)
+_worker_cleaner = None
+
+
+def find_files(pattern):
+    """디렉터리면 그 안의 .xlsx 파일, 아니면 glob 패턴에 맞는 파일 (엑셀 임시 파일 '~$' 제외)"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.xlsx')
+    return sorted(
+        path for path in glob.glob(pattern)
+        if os.path.isfile(path) and not os.path.basename(path).startswith('~$')
+    )
+
+
+def table_name_for(file_path):
+    """파일 이름 -> 테이블 이름 (qpoll_join_250224.xlsx -> qpoll_250224, 날짜가 없으면 파일 이름)"""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    dates = re.findall(r'\d{6}', stem)
+    if dates:
+        return f"qpoll_{dates[-1]}"
+    return re.sub(r'\W+', '_', stem).strip('_').lower()
+
+
+def _init_clean_worker(cleaner_class, question_mappings, language_cache_config, language_filter_config,
+                       log_level, log_format):
+    """
+    정제 프로세스 초기화 - DB 연결 없는 정제 파이프라인 생성
+    언어 감지는 파일 단위로 이미 병렬이므로 프로세스 안에서는 1개, 디스크 캐시는 읽기 전용
+    """
+    global _worker_cleaner
+    logging.basicConfig(level=log_level, format=log_format)
+    _worker_cleaner = cleaner_class(
+        question_mappings,
+        {**(language_cache_config or {}), 'read_only': True},
+        {**(language_filter_config or {}), 'workers': 1}
+    )
+
+
+def _clean_file(file_path, text_columns, sheet_name, target_language, header):
+    """파일 하나 읽기 + 정제 (정제 프로세스에서 실행), (정제 결과, 걸린 시간, 새로 감지한 언어 결과) 반환"""
+    started = time.perf_counter()
+    cleaned_df = _worker_cleaner.process(file_path, text_columns, sheet_name, target_language, header)
+    return cleaned_df, time.perf_counter() - started, _worker_cleaner.language_cache.take_pending()
+
+
+def run_batch(pattern, config, pipeline_class, cleaner_class, text_columns=None, sheet_name=0,
+              target_language='ko', if_exists='replace', header=1, clean_workers=None, db_workers=2,
+              max_pending=2, force_reload=False):
+    """
+    pattern 에 맞는 파일들을 일괄 정제 + 저장하고 파일별 상태 목록 반환
+    config: 문항 패키지의 설정 모듈 (DB_CONFIG, QUESTION_MAPPINGS, LANGUAGE_CACHE_CONFIG,
+            LANGUAGE_FILTER_CONFIG, POOL_CONFIG, LOG_LEVEL, LOG_FORMAT)
+    pipeline_class: 저장에 쓰는 DataPipeline, cleaner_class: 정제 프로세스에서 쓰는 CleaningPipeline
+    clean_workers: 정제 프로세스 수 (None: CPU 수)
+    db_workers: DB 저장 스레드 수 (커넥션 풀 크기 이하로)
+    max_pending: 저장을 기다릴 수 있는 정제 결과 수 (메모리 사용량 제한, 넘으면 다음 파일 정제를 멈추고 기다림)
+    """
+    started = time.perf_counter()
+    # 저장 + 언어 감지 디스크 캐시 쓰기는 이 프로세스에서만
+    pipeline = pipeline_class(
+        config.DB_CONFIG, config.QUESTION_MAPPINGS, config.LANGUAGE_CACHE_CONFIG,
+        config.LANGUAGE_FILTER_CONFIG, config.POOL_CONFIG
+    )
+    files = find_files(pattern)
+    statuses = [
+        {'file': path, 'table': table_name_for(path), 'status': 'pending', 'rows': 0,
+         'clean_seconds': 0.0, 'save_seconds': 0.0, 'error': None}
+        for path in files
+    ]
+    print(f"-> {len(files)}개 파일을 찾았습니다: {pattern}")
+
+    # 같은 테이블로 가는 파일이 여러 개면 서로 덮어쓰므로 처음 파일만 처리
+    tables = {}
+    for status in statuses:
+        if status['table'] in tables:
+            status['status'] = 'failed'
+            status['error'] = f"테이블 이름 중복 ({os.path.basename(tables[status['table']])} 와 같은 {status['table']})"
+        else:
+            tables[status['table']] = status['file']
+
+    # 이미 적재한 파일은 읽지 않고 건너뜀
+    todo = []
+    for status in statuses:
+        if status['status'] != 'pending':
+            continue
+        try:
+            if not force_reload and pipeline.already_imported(
+                status['file'], status['table'], text_columns, sheet_name, target_language, if_exists, header
+            ):
+                status['status'] = 'skipped'
+                continue
+        except Exception as e:
+            status['status'] = 'failed'
+            status['error'] = str(e)
+            continue
+        todo.append(status)
+
+    # 정제 중이거나 저장을 기다리는 파일 수 제한 (정제 결과가 메모리에 쌓이지 않도록)
+    clean_workers = clean_workers or os.cpu_count() or 1
+    slots = threading.Semaphore(clean_workers + max_pending)
+    results = queue.Queue()
+    # 정제 프로세스가 새로 감지한 언어 결과 (끝나면 이 프로세스의 캐시에 반영)
+    detections = []
+
+    def save_worker():
+        """DB 저장 스레드 - 정제가 끝난 파일을 하나씩 저장 (실패해도 다음 파일 계속)"""
+        while True:
+            item = results.get()
+            if item is None:
+                return
+            status, future = item
+            try:
+                cleaned_df, status['clean_seconds'], new_detections = future.result()
+                detections.extend(new_detections)
+                save_started = time.perf_counter()
+                pipeline.save_cleaned(
+                    cleaned_df, status['file'], status['table'], text_columns, sheet_name,
+                    target_language, if_exists, header, clean_seconds=status['clean_seconds']
+                )
+                status['save_seconds'] = time.perf_counter() - save_started
+                status['rows'] = len(cleaned_df)
+                status['status'] = 'done'
+                print(f"  [완료] {os.path.basename(status['file'])} -> {status['table']} ({status['rows']}행)")
+            except Exception as e:
+                status['status'] = 'failed'
+                status['error'] = str(e)
+                logger.error(f"파일 처리 실패: {status['file']} ({e})")
+            finally:
+                slots.release()
+
+    savers = [threading.Thread(target=save_worker, daemon=True) for _ in range(db_workers)]
+    for saver in savers:
+        saver.start()
+    try:
+        initargs = (
+            cleaner_class, config.QUESTION_MAPPINGS, config.LANGUAGE_CACHE_CONFIG,
+            config.LANGUAGE_FILTER_CONFIG, config.LOG_LEVEL, config.LOG_FORMAT
+        )
+        with ProcessPoolExecutor(max_workers=clean_workers, initializer=_init_clean_worker,
+                                 initargs=initargs) as executor:
+            for status in todo:
+                slots.acquire()
+                try:
+                    future = executor.submit(
+                        _clean_file, status['file'], text_columns, sheet_name, target_language, header
+                    )
+                except Exception as e:
+                    # 정제 프로세스가 비정상 종료되어 풀을 쓸 수 없는 경우 등
+                    status['status'] = 'failed'
+                    status['error'] = str(e)
+                    slots.release()
+                    continue
+                # 정제가 끝나는 순서대로 저장 스레드에 넘김
+                future.add_done_callback(lambda done, status=status: results.put((status, done)))
+    finally:
+        for _ in savers:
+            results.put(None)
+        for saver in savers:
+            saver.join()
+        # 새로 감지한 언어 결과를 디스크 캐시에 한 번에 반영 (SQLite 연결을 만든 이 스레드에서)
+        for text, lang in detections:
+            pipeline.language_cache.put(text, lang)
+        pipeline.close()
+
+    _print_report(statuses, time.perf_counter() - started)
+    logger.info(f"언어 감지 캐시에 반영한 새 결과: {len(detections)}개")
+    logger.info(f"커넥션 풀 통계: {pipeline.db_manager.pool_stats()}")
+    return statuses
+
+
+def _print_report(statuses, elapsed):
+    """파일별 상태와 전체 처리량 출력"""
+    labels = {'done': '완료', 'skipped': '건너뜀', 'failed': '실패', 'pending': '미처리'}
+    print("\n" + "=" * 50)
+    for status in statuses:
+        name = os.path.basename(status['file'])
+        line = f"[{labels[status['status']]}] {name} -> {status['table']}"
+        if status['status'] == 'done':
+            seconds = status['clean_seconds'] + status['save_seconds']
+            line += (f": {status['rows']}행, 정제 {status['clean_seconds']:.1f}초, "
+                     f"저장 {status['save_seconds']:.1f}초 ({status['rows'] / max(seconds, 1e-9):.0f}행/초)")
+        elif status['status'] == 'failed':
+            line += f": {status['error']}"
+        print(line)
+
+    counts = {key: sum(status['status'] == key for status in statuses) for key in labels}
+    total_rows = sum(status['rows'] for status in statuses)
+    print("=" * 50)
+    print(f"파일 {len(statuses)}개 (완료 {counts['done']}, 건너뜀 {counts['skipped']}, 실패 {counts['failed']}), "
+          f"{total_rows}행, {elapsed:.1f}초 ({total_rows / max(elapsed, 1e-9):.0f}행/초)")
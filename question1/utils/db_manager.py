@@ -2,37 +2,128 @@
 """
 데이터베이스 연결 및 저장 관리
 """
+import io
 import logging
-from sqlalchemy import create_engine, text
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pandas.io.sql import get_schema
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.pool import QueuePool
+from utils.pg_binary import column_types, copy_binary
 
 logger = logging.getLogger(__name__)
 
+# 이 행 수 이상이면 기본으로 COPY 사용 (작은 DataFrame 은 기존 to_sql)
+COPY_THRESHOLD_ROWS = 10000
+# COPY 한 번에 보낼 행 수 (메모리 버퍼 크기 제한)
+COPY_CHUNK_ROWS = 50000
+# COPY CSV 에서 NULL 을 나타내는 문자열 (빈 문자열과 구분)
+COPY_NULL = '\\N'
+# 바이너리 COPY 사용 (테이블 컬럼 타입을 모두 지원하고 값 변환이 가능한 청크만, 나머지는 CSV)
+COPY_BINARY = True
+
+# if_exists='replace' 방식
+# 'swap': UNLOGGED 섀도 테이블에 적재 -> LOGGED 전환, 인덱스 생성, ANALYZE -> 짧은 트랜잭션에서 이름 교체
+#         (적재하는 동안에도 기존 테이블을 그대로 읽을 수 있고, 실패하면 기존 테이블은 그대로)
+# 'drop': 기존처럼 테이블을 지우고 같은 이름으로 다시 만들어 적재
+REPLACE_STRATEGY = 'swap'
+# 섀도 테이블 / 인덱스 이름 뒤에 붙이는 문자열
+SHADOW_SUFFIX = '__shadow'
+# 이름 교체 시 기존 테이블 잠금을 기다리는 최대 시간 (오래 걸리는 조회가 있으면 교체를 포기하고 예외)
+SWAP_LOCK_TIMEOUT = '10s'
+# PostgreSQL 오류 코드: 없는 컬럼
+UNDEFINED_COLUMN = '42703'
+
+# 적재 기록 테이블 (파일 내용 해시 + 시트 + 모드 -> 행 수, 걸린 시간)
+IMPORT_LOG_TABLE = 'import_log'
+
+# 커넥션 풀 기본 설정 (config 의 POOL_CONFIG 로 덮어씀)
+DEFAULT_POOL_CONFIG = {
+    'pool_size': 5,           # 반환 후에도 열어 두는 연결 수
+    'max_overflow': 10,       # 모자랄 때 추가로 여는 연결 수
+    'pool_timeout': 30,       # 빈 연결을 기다리는 최대 시간(초)
+    'pool_recycle': 1800,     # 이 시간(초)보다 오래된 연결은 새로 연결
+    'pre_ping': True,         # 꺼낼 때 끊긴 연결인지 확인
+    'session_settings': {},   # 연결마다 적용할 세션 설정 (예: {'work_mem': '64MB'})
+}
+
+# (연결 문자열, 풀 설정)별 엔진과 엔진별 풀 대기 시간 통계 (프로세스 안의 모든 DatabaseManager 가 공유)
+_engines = {}
+_pool_waits = {}
+_engines_lock = threading.Lock()
+
+
+def _engine_key(connection_string, pool_config):
+    """엔진을 구분하는 키 (풀 크기나 세션 설정이 다르면 다른 엔진)"""
+    settings = tuple(sorted(pool_config['session_settings'].items()))
+    options = tuple(sorted((name, value) for name, value in pool_config.items() if name != 'session_settings'))
+    return connection_string, options, settings
+
+
+def _shared_engine(connection_string, pool_config):
+    """(연결 문자열, 풀 설정)에 해당하는 공용 엔진 반환 (처음 호출할 때 QueuePool 로 생성)"""
+    key = _engine_key(connection_string, pool_config)
+    with _engines_lock:
+        if key not in _engines:
+            connect_args = {}
+            if pool_config['session_settings']:
+                # 세션 설정은 접속 시 시작 옵션으로 전달
+                connect_args['options'] = ' '.join(
+                    f"-c {name}={value}" for name, value in pool_config['session_settings'].items()
+                )
+            engine = create_engine(
+                connection_string,
+                poolclass=QueuePool,
+                pool_size=pool_config['pool_size'],
+                max_overflow=pool_config['max_overflow'],
+                pool_timeout=pool_config['pool_timeout'],
+                pool_recycle=pool_config['pool_recycle'],
+                pool_pre_ping=pool_config['pre_ping'],
+                connect_args=connect_args
+            )
+            _engines[key] = engine
+            _pool_waits[engine] = {'checkouts': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+        return _engines[key]
+
 
 class DatabaseManager:
     """PostgreSQL 데이터베이스 연결 및 저장 관리 클래스"""
     
-    def __init__(self, db_config):
+    def __init__(self, db_config, pool_config=None):
         self.db_config = db_config
+        self.pool_config = {**DEFAULT_POOL_CONFIG, **(pool_config or {})}
         self.engine = None
+        self.connection_string = None
+        # 적재 중인 섀도 테이블 (UNLOGGED 로 생성)
+        self._shadow_tables = set()
         self.connect()
     
     def connect(self):
         """데이터베이스 연결"""
         try:
-            connection_string = (
+            self.connection_string = (
                 f"postgresql://{self.db_config['username']}:"
                 f"{self.db_config['password']}@"
                 f"{self.db_config['host']}:{self.db_config['port']}/"
                 f"{self.db_config['database']}"
             )
-            self.engine = create_engine(connection_string)
+            # 같은 DB 를 쓰는 DatabaseManager 끼리 엔진(커넥션 풀)을 공유
+            self.engine = _shared_engine(self.connection_string, self.pool_config)
             logger.info("데이터베이스 연결 성공")
         except Exception as e:
             logger.error(f"데이터베이스 연결 실패: {e}")
             raise
     
-    def save_dataframe(self, df, table_name, if_exists='replace'):
-        """DataFrame을 데이터베이스에 저장"""
+    def save_dataframe(self, df, table_name, if_exists='replace', verify=True, method=None, on_commit=None):
+        """
+        DataFrame을 데이터베이스에 저장
+        method: 'copy' (COPY FROM STDIN), 'insert' (to_sql 다중 INSERT), None 이면 행 수로 자동 선택
+        on_commit: 데이터를 커밋하는 트랜잭션 안에서 on_commit(conn) 실행 (적재 기록을 데이터와 함께 커밋)
+        """
         try:
             # 컬럼명 정리 (PostgreSQL 호환)
             df_copy = df.copy()
@@ -41,28 +132,404 @@ class DatabaseManager:
                 for col in df_copy.columns
             ]
             
+            if method is None:
+                method = 'copy' if len(df_copy) >= COPY_THRESHOLD_ROWS else 'insert'
+            
             # 데이터베이스에 저장
-            df_copy.to_sql(
+            if if_exists == 'replace' and REPLACE_STRATEGY == 'swap':
+                with self.replace_table(table_name, on_commit) as target:
+                    self._write(df_copy, target, 'append', method)
+            else:
+                self._write(df_copy, table_name, if_exists, method, on_commit)
+            
+            logger.info(f"데이터베이스 저장 완료: {table_name} 테이블에 {len(df_copy)}행 저장")
+            
+            # 저장된 데이터 확인 (분할 저장 시에는 마지막에 한 번만)
+            if verify:
+                self._verify_save(table_name)
+            
+        except Exception as e:
+            logger.error(f"데이터베이스 저장 실패: {e}")
+            raise
+    
+    def _write(self, df, table_name, if_exists, method, on_commit=None):
+        """method 에 따라 COPY 또는 to_sql 로 저장 (on_commit 은 같은 트랜잭션의 마지막에 실행)"""
+        if method == 'copy':
+            self._copy_dataframe(df, table_name, if_exists, on_commit)
+            return
+        
+        with self._connection(begin=True) as conn: # 풀에서 꺼낸 연결, 블록이 끝나면 커밋
+            if table_name in self._shadow_tables and not inspect(conn).has_table(table_name):
+                # to_sql 이 만드는 테이블은 LOGGED 이므로 섀도 테이블은 직접 생성
+                conn.execute(text(self._create_table_sql(df, table_name, conn)))
+            if if_exists == 'replace':
+                # to_sql 의 replace 도 기존 테이블을 DROP 하므로 같은 확인
+                self._check_replaceable(conn, table_name)
+            df.to_sql(
                 table_name, 
-                self.engine, # self.engine은 데이터베이스 연결 객체 
+                conn, 
                 if_exists=if_exists, # main.py에서 지정한 값 사용
                 index=False, # 인덱스 컬럼 저장 안함
                 method='multi' # 여러 행을 한번에 삽입(성능 향상)
             )
+            if on_commit is not None:
+                on_commit(conn)
+    
+    def _create_table_sql(self, df, table_name, conn):
+        """DataFrame 에 맞는 CREATE TABLE 문 (to_sql 과 같은 타입), 섀도 테이블이면 UNLOGGED"""
+        ddl = get_schema(df, table_name, con=conn)
+        if table_name in self._shadow_tables:
+            ddl = ddl.replace('CREATE TABLE', 'CREATE UNLOGGED TABLE', 1)
+        return ddl
+    
+    @contextmanager
+    def replace_table(self, table_name, on_commit=None):
+        """
+        table_name 을 새 데이터로 통째로 바꾸는 적재 (if_exists='replace')
+        블록 안에서 넘겨받은 테이블에 'append' 로 적재하면 블록이 끝날 때 교체됨 (분할 저장도 한 번에 교체)
+        - 'swap': 섀도 테이블에 적재 후 이름 교체, 예외가 나면 섀도 테이블만 지움
+                  on_commit(conn) 은 이름을 바꾸는 트랜잭션 안에서 실행
+        - 'drop': 기존 테이블을 지우고 같은 이름으로 적재 (청크마다 커밋하므로 on_commit 은 마지막에 따로 실행)
+        """
+        if REPLACE_STRATEGY != 'swap':
+            with self._connection(begin=True) as conn:
+                self._check_replaceable(conn, table_name)
+                conn.execute(text(f'DROP TABLE IF EXISTS {self._quote(table_name)}'))
+            yield table_name
+            if on_commit is not None:
+                with self._connection(begin=True) as conn:
+                    on_commit(conn)
+            return
+        
+        shadow = f"{table_name}{SHADOW_SUFFIX}"
+        with self._connection(begin=True) as conn:
+            # 교체할 수 없는 테이블이면 적재하기 전에 중단
+            self._check_replaceable(conn, table_name)
+            # 이전 실행이 실패해서 남은 섀도 테이블 정리
+            conn.execute(text(f'DROP TABLE IF EXISTS {self._quote(shadow)}'))
+        self._shadow_tables.add(shadow)
+        try:
+            yield shadow
+            self._swap_shadow(shadow, table_name, on_commit)
+        except Exception:
+            try:
+                with self._connection(begin=True) as conn:
+                    conn.execute(text(f'DROP TABLE IF EXISTS {self._quote(shadow)}'))
+            except Exception as e:
+                logger.warning(f"섀도 테이블 정리 실패: {shadow} ({e})")
+            raise
+        finally:
+            self._shadow_tables.discard(shadow)
+    
+    def _replace_blockers(self, conn, table_name):
+        """테이블을 지우면 함께 사라지거나 DROP 을 막는 객체 (뷰, 다른 테이블의 FK, RLS 정책, 트리거, 규칙)"""
+        rows = conn.execute(text(
+            "SELECT 'view ' || r.ev_class::regclass::text "
+            "FROM pg_depend d JOIN pg_rewrite r ON r.oid = d.objid "
+            "WHERE d.classid = 'pg_rewrite'::regclass AND d.refclassid = 'pg_class'::regclass "
+            "AND d.refobjid = to_regclass(:table) AND r.ev_class <> d.refobjid "
+            "UNION "
+            "SELECT 'foreign key ' || quote_ident(con.conname) || ' on ' || con.conrelid::regclass::text "
+            "FROM pg_constraint con "
+            "WHERE con.contype = 'f' AND con.confrelid = to_regclass(:table) AND con.conrelid <> con.confrelid "
+            "UNION "
+            "SELECT 'policy ' || quote_ident(p.polname) FROM pg_policy p WHERE p.polrelid = to_regclass(:table) "
+            "UNION "
+            "SELECT 'trigger ' || quote_ident(t.tgname) FROM pg_trigger t "
+            "WHERE t.tgrelid = to_regclass(:table) AND NOT t.tgisinternal "
+            "UNION "
+            "SELECT 'rule ' || quote_ident(r.rulename) FROM pg_rewrite r "
+            "WHERE r.ev_class = to_regclass(:table) AND r.rulename <> '_RETURN' "
+            "ORDER BY 1"
+        ), {'table': self._quote(table_name)}).fetchall()
+        return [row[0] for row in rows]
+    
+    def _check_replaceable(self, conn, table_name):
+        """교체(DROP 후 다시 생성)하면 사라지는 객체가 있으면 ValueError (데이터를 바꾸기 전에 확인)"""
+        blockers = self._replace_blockers(conn, table_name)
+        if blockers:
+            raise ValueError(
+                f"'{table_name}' 테이블을 교체하면 함께 사라지는 객체가 있어 교체하지 않습니다: {', '.join(blockers)} "
+                f"(if_exists='append' 로 적재하거나 객체를 먼저 정리하세요)"
+            )
+    
+    def _copy_table_properties(self, conn, table_name, shadow):
+        """기존 테이블의 소유자, 권한(테이블/컬럼), 주석, 행 보안 설정을 섀도 테이블로 복사"""
+        table, shadow_q = self._quote(table_name), self._quote(shadow)
+        params = {'table': table, 'shadow': shadow_q}
+        row = conn.execute(text(
+            "SELECT quote_ident(pg_get_userbyid(c.relowner)), c.relowner <> s.relowner, "
+            "obj_description(c.oid, 'pg_class'), c.relrowsecurity, c.relforcerowsecurity "
+            "FROM pg_class c, pg_class s WHERE c.oid = to_regclass(:table) AND s.oid = to_regclass(:shadow)"
+        ), params).fetchone()
+        if row is None:
+            return
+        owner, other_owner, comment, row_security, force_row_security = row
+        
+        grants = conn.execute(text(
+            "SELECT a.privilege_type, NULL, "
+            "CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END, a.is_grantable "
+            "FROM pg_class c CROSS JOIN aclexplode(c.relacl) a "
+            "WHERE c.oid = to_regclass(:table) AND a.grantee <> c.relowner "
+            "UNION ALL "
+            "SELECT a.privilege_type, quote_ident(att.attname), "
+            "CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END, a.is_grantable "
+            "FROM pg_attribute att CROSS JOIN aclexplode(att.attacl) a "
+            "JOIN pg_attribute s ON s.attrelid = to_regclass(:shadow) AND s.attname = att.attname AND NOT s.attisdropped "
+            "WHERE att.attrelid = to_regclass(:table) AND att.attnum > 0 AND NOT att.attisdropped"
+        ), params).fetchall()
+        for privilege, column, role, grantable in grants:
+            target = f"{privilege} ({column})" if column else privilege
+            conn.execute(text(
+                f"GRANT {target} ON {shadow_q} TO {role}" + (" WITH GRANT OPTION" if grantable else "")
+            ))
+        
+        if comment is not None:
+            conn.execute(text(f"COMMENT ON TABLE {shadow_q} IS :comment"), {'comment': comment})
+        column_comments = conn.execute(text(
+            "SELECT quote_ident(a.attname), col_description(a.attrelid, a.attnum) "
+            "FROM pg_attribute a "
+            "JOIN pg_attribute s ON s.attrelid = to_regclass(:shadow) AND s.attname = a.attname AND NOT s.attisdropped "
+            "WHERE a.attrelid = to_regclass(:table) AND a.attnum > 0 AND NOT a.attisdropped "
+            "AND col_description(a.attrelid, a.attnum) IS NOT NULL"
+        ), params).fetchall()
+        for column, column_comment in column_comments:
+            conn.execute(text(f"COMMENT ON COLUMN {shadow_q}.{column} IS :comment"), {'comment': column_comment})
+        
+        if row_security:
+            conn.execute(text(f"ALTER TABLE {shadow_q} ENABLE ROW LEVEL SECURITY"))
+        if force_row_security:
+            conn.execute(text(f"ALTER TABLE {shadow_q} FORCE ROW LEVEL SECURITY"))
+        # 소유자는 마지막에 (권한 부여는 섀도 테이블을 만든 소유자로)
+        if other_owner:
+            conn.execute(text(f"ALTER TABLE {shadow_q} OWNER TO {owner}"))
+    
+    def _index_definitions(self, conn, table_name):
+        """기존 테이블의 인덱스 (이름, CREATE INDEX 문, 제약조건 종류 'p'/'u'/None)"""
+        rows = conn.execute(text(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid), con.contype "
+            "FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "LEFT JOIN pg_constraint con ON con.conindid = i.indexrelid AND con.contype IN ('p', 'u') "
+            "WHERE i.indrelid = to_regclass(:table) "
+            "ORDER BY c.relname"
+        ), {'table': self._quote(table_name)}).fetchall()
+        return [tuple(row) for row in rows]
+    
+    def _swap_shadow(self, shadow, table_name, on_commit=None):
+        """
+        섀도 테이블을 table_name 으로 교체
+        1) 교체할 수 있는지 확인 (뷰/FK/정책 등이 기존 테이블을 참조하면 LOGGED 전환 전에 중단)
+           LOGGED 전환 (테이블을 한 번에 WAL 로 기록), 기존 테이블의 인덱스를 섀도 테이블에 생성,
+           소유자/권한/주석/행 보안 설정 복사, ANALYZE
+           - 기존 테이블은 건드리지 않으므로 읽는 쪽은 막히지 않음
+        2) 짧은 트랜잭션: 기존 테이블 삭제 -> 섀도 테이블/인덱스 이름 변경 -> on_commit(conn)
+        """
+        started = time.perf_counter()
+        shadow_q = self._quote(shadow)
+        with self._connection(begin=True) as conn:
+            if not inspect(conn).has_table(shadow):
+                # 적재한 청크가 없으면 기존 테이블을 그대로 둠
+                if on_commit is not None:
+                    on_commit(conn)
+                return
+            self._check_replaceable(conn, table_name)
+            # 인덱스를 먼저 만들면 SET LOGGED 가 인덱스까지 다시 만드므로 LOGGED 전환이 먼저
+            conn.execute(text(f'ALTER TABLE {shadow_q} SET LOGGED'))
             
-            logger.info(f"데이터베이스 저장 완료: {table_name} 테이블에 {len(df_copy)}행 저장")
+            indexes = []
+            for name, definition, constraint in self._index_definitions(conn, table_name):
+                shadow_index = f"{name}{SHADOW_SUFFIX}"
+                # 'CREATE [UNIQUE] INDEX 이름 ON [ONLY] 테이블 ...' 의 이름과 테이블만 바꿈
+                definition = re.sub(
+                    r'^(CREATE (?:UNIQUE )?INDEX )(?:"(?:[^"]|"")*"|\S+)( ON (?:ONLY )?)(?:"(?:[^"]|"")*"|\S+)',
+                    lambda m: f"{m.group(1)}{self._quote(shadow_index)}{m.group(2)}{shadow_q}",
+                    definition
+                )
+                try:
+                    with conn.begin_nested():
+                        conn.execute(text(definition))
+                        if constraint is not None:
+                            kind = 'PRIMARY KEY' if constraint == 'p' else 'UNIQUE'
+                            conn.execute(text(
+                                f'ALTER TABLE {shadow_q} ADD CONSTRAINT {self._quote(shadow_index)} '
+                                f'{kind} USING INDEX {self._quote(shadow_index)}'
+                            ))
+                    indexes.append(name)
+                except ProgrammingError as e:
+                    # 새 데이터에 없는 컬럼의 인덱스만 건너뜀 (중복 키 등은 교체 중단, 기존 테이블 유지)
+                    if getattr(e.orig, 'pgcode', None) != UNDEFINED_COLUMN:
+                        raise
+                    logger.warning(f"새 테이블에 없는 컬럼의 인덱스라 건너뜁니다: {name}")
+            self._copy_table_properties(conn, table_name, shadow)
+            conn.execute(text(f'ANALYZE {shadow_q}'))
+        prepared = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        with self._connection(begin=True) as conn:
+            # 잠금을 오래 기다리면 뒤에 오는 조회까지 막히므로 제한 시간을 둠
+            conn.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'"))
+            # 준비하는 동안 새로 생긴 뷰 등이 없는지 다시 확인 (있으면 섀도 테이블만 지워짐)
+            self._check_replaceable(conn, table_name)
+            conn.execute(text(f'DROP TABLE IF EXISTS {self._quote(table_name)}'))
+            conn.execute(text(f'ALTER TABLE {shadow_q} RENAME TO {self._quote(table_name)}'))
+            for name in indexes:
+                conn.execute(text(
+                    f'ALTER INDEX {self._quote(name + SHADOW_SUFFIX)} RENAME TO {self._quote(name)}'
+                ))
+            if on_commit is not None:
+                on_commit(conn)
+        logger.info(
+            f"테이블 교체 완료: {table_name} (인덱스 {len(indexes)}개, 준비 {prepared:.2f}초, "
+            f"교체 {time.perf_counter() - started:.3f}초)"
+        )
+    
+    def _copy_dataframe(self, df, table_name, if_exists, on_commit=None):
+        """
+        COPY FROM STDIN 으로 저장 - 테이블 생성(if_exists 규칙)과 데이터 전송(+ on_commit)을 한 트랜잭션으로
+        테이블 구조는 to_sql 과 같은 방식(pandas get_schema)으로 만듦
+        청크는 바이너리 형식으로 보내고, 변환할 수 없는 청크만 CSV 형식으로 보냄
+        """
+        with self._connection(begin=True) as conn:
+            exists = inspect(conn).has_table(table_name)
+            if exists and if_exists == 'fail':
+                raise ValueError(f"Table '{table_name}' already exists.")
+            if exists and if_exists == 'replace':
+                self._check_replaceable(conn, table_name)
+                conn.execute(text(f'DROP TABLE {self._quote(table_name)}'))
+            if not exists or if_exists == 'replace':
+                conn.execute(text(self._create_table_sql(df, table_name, conn)))
             
-            # 저장된 데이터 확인
-            self._verify_save(table_name)
+            table = self._quote(table_name)
+            columns = [self._quote(col) for col in df.columns]
+            copy_sql = (
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN "
+                f"WITH (FORMAT csv, NULL '{COPY_NULL}')"
+            )
+            cursor = conn.connection.cursor()
+            try:
+                kinds = column_types(cursor, table, columns) if COPY_BINARY else [None]
+                for start in range(0, len(df), COPY_CHUNK_ROWS):
+                    chunk = df.iloc[start:start + COPY_CHUNK_ROWS]
+                    if None not in kinds:
+                        try:
+                            copy_binary(cursor, table, columns, chunk, kinds)
+                            continue
+                        except (ValueError, TypeError) as e:
+                            logger.debug(f"바이너리 COPY 불가, CSV 로 전송: {e}")
+                    
+                    # 메모리 버퍼에 CSV 로 쓰고 바로 전송
+                    buffer = io.StringIO()
+                    chunk.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_sql, buffer)
+            finally:
+                cursor.close()
+            if on_commit is not None:
+                on_commit(conn)
+    
+    @contextmanager
+    def _connection(self, begin=False):
+        """풀에서 연결 꺼내기 (기다린 시간 기록), begin=True 이면 트랜잭션으로 감싸고 끝나면 커밋"""
+        started = time.perf_counter()
+        conn = self.engine.connect()
+        self._record_wait(time.perf_counter() - started)
+        try:
+            if begin:
+                with conn.begin():
+                    yield conn
+            else:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _record_wait(self, waited):
+        """풀 대기 시간 통계 갱신"""
+        with _engines_lock:
+            waits = _pool_waits[self.engine]
+            waits['checkouts'] += 1
+            waits['total_wait'] += waited
+            waits['max_wait'] = max(waits['max_wait'], waited)
+    
+    def pool_stats(self):
+        """공용 커넥션 풀 상태와 대기 시간 통계"""
+        with _engines_lock:
+            waits = dict(_pool_waits[self.engine])
+        waits['avg_wait'] = waits['total_wait'] / waits['checkouts'] if waits['checkouts'] else 0.0
+        waits['status'] = self.engine.pool.status()
+        return waits
+    
+    def _ensure_import_log(self, conn):
+        """적재 기록 테이블이 없으면 생성"""
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {IMPORT_LOG_TABLE} ("
+            "content_hash CHAR(64) NOT NULL, sheet TEXT NOT NULL, mode TEXT NOT NULL, "
+            "file_name TEXT, target_table TEXT, row_count BIGINT, duration_seconds DOUBLE PRECISION, "
+            "imported_at TIMESTAMP NOT NULL DEFAULT NOW(), "
+            "PRIMARY KEY (content_hash, sheet, mode))"
+        ))
+    
+    def find_import(self, content_hash, sheet, mode, target_table=None):
+        """
+        이전 적재 기록 반환 (없으면 None)
+        target_table: 테이블을 덮어쓰는 적재(if_exists='replace')면 테이블 이름
+                      -> 그 테이블에 마지막으로 적재한 입력일 때만 기록을 반환
+        """
+        key = {'content_hash': content_hash, 'sheet': str(sheet), 'mode': mode}
+        with self._connection(begin=True) as conn:
+            self._ensure_import_log(conn)
+            previous = conn.execute(text(
+                f"SELECT row_count, duration_seconds, imported_at, file_name FROM {IMPORT_LOG_TABLE} "
+                "WHERE content_hash = :content_hash AND sheet = :sheet AND mode = :mode"
+            ), key).mappings().fetchone()
+            if previous is None:
+                return None
             
-        except Exception as e:
-            logger.error(f"데이터베이스 저장 실패: {e}")
-            raise
+            if target_table is not None:
+                latest = conn.execute(text(
+                    f"SELECT content_hash, sheet, mode FROM {IMPORT_LOG_TABLE} "
+                    "WHERE target_table = :target_table ORDER BY imported_at DESC LIMIT 1"
+                ), {'target_table': target_table}).fetchone()
+                if latest is None or tuple(latest) != (content_hash, str(sheet), mode):
+                    return None
+        return dict(previous)
+    
+    def record_import(self, content_hash, sheet, mode, file_name, row_count, duration_seconds,
+                      target_table=None, conn=None):
+        """
+        적재 기록 저장 (강제 재적재면 기존 기록을 덮어씀)
+        conn: 데이터를 저장한 트랜잭션의 연결 (save_dataframe 의 on_commit 에서), 없으면 따로 커밋
+        """
+        if conn is None:
+            with self._connection(begin=True) as conn:
+                self.record_import(content_hash, sheet, mode, file_name, row_count, duration_seconds,
+                                   target_table, conn)
+            return
+        
+        self._ensure_import_log(conn)
+        conn.execute(text(
+            f"INSERT INTO {IMPORT_LOG_TABLE} "
+            "(content_hash, sheet, mode, file_name, target_table, row_count, duration_seconds, imported_at) "
+            "VALUES (:content_hash, :sheet, :mode, :file_name, :target_table, :row_count, :duration_seconds, NOW()) "
+            "ON CONFLICT (content_hash, sheet, mode) DO UPDATE SET "
+            "file_name = EXCLUDED.file_name, target_table = EXCLUDED.target_table, "
+            "row_count = EXCLUDED.row_count, duration_seconds = EXCLUDED.duration_seconds, imported_at = NOW()"
+        ), {
+            'content_hash': content_hash, 'sheet': str(sheet), 'mode': mode,
+            'file_name': os.path.basename(file_name), 'target_table': target_table,
+            'row_count': int(row_count), 'duration_seconds': duration_seconds
+        })
+        logger.info(f"적재 기록 저장: {os.path.basename(file_name)} -> {target_table} ({row_count}행, {duration_seconds:.1f}초)")
+    
+    @staticmethod
+    def _quote(identifier):
+        """PostgreSQL 식별자 따옴표 처리"""
+        return '"' + str(identifier).replace('"', '""') + '"'
     
     def _verify_save(self, table_name):
         """저장된 데이터 검증"""
         try:
-            with self.engine.connect() as conn:
+            with self._connection() as conn:
                 result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
                 count = result.fetchone()[0]
                 logger.info(f"저장 확인: {table_name} 테이블에 총 {count}행 존재")
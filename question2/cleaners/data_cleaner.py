@@ -13,31 +13,208 @@ class DataCleaner:
     """데이터 정제 처리 클래스"""
     
     @staticmethod
-    def basic_cleaning(df):
-        """기본 정제 - 공백 제거, 결측치 처리"""
+    def basic_cleaning(df, copy=True):
+        """
+        기본 정제 - 공백 제거, 결측치 처리
+        copy=False 이면 복사본을 만들지 않고 df 를 직접 수정
+        """
         logger.info("기본 정제 시작...")
         
-        cleaned_df = df.copy()
+        # 컬럼 단위로 통째로 교체하므로 얕은 복사만으로 원본이 보존됨
+        cleaned_df = df.copy(deep=False) if copy else df
         
-        # 문자열 컬럼에 대해 앞뒤 공백 제거
-        string_columns = cleaned_df.select_dtypes(include=['object']).columns
+        # 문자열 컬럼에 대해 앞뒤 공백 제거, 빈 문자열/'nan' 은 NaN 으로
+        string_columns = cleaned_df.select_dtypes(include=['object', 'category']).columns
         for col in string_columns:
-            cleaned_df[col] = cleaned_df[col].astype(str).str.strip()
-            # 빈 문자열을 NaN으로 변환
-            cleaned_df[col] = cleaned_df[col].replace('', np.nan)
-            cleaned_df[col] = cleaned_df[col].replace('nan', np.nan)
+            cleaned = DataCleaner._clean_column(cleaned_df[col])
+            # 이미 정제된 컬럼은 건드리지 않음
+            if cleaned is not None:
+                cleaned_df[col] = cleaned
         
         logger.info(f"기본 정제 완료: {len(cleaned_df)}행 남음")
         return cleaned_df
     
     @staticmethod
-    def remove_duplicates(df):
-        """중복 데이터 제거"""
+    def _clean_value(value):
+        """값 하나 정제 (문자열로 변환 후 공백 제거, 빈 문자열/'nan' -> NaN)"""
+        text = (value if isinstance(value, str) else str(value)).strip()
+        return np.nan if text == '' or text == 'nan' else text
+    
+    @staticmethod
+    def _clean_column(series):
+        """
+        컬럼 정제 - 고유값만 한 번씩 정제한 뒤 코드로 펼침
+        결측치는 문자열로 바꾸지 않고 그대로 두며, 바뀌는 값이 없으면 None 반환
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        
+        uniques = np.asarray(uniques, dtype=object)
+        cleaned = np.array([DataCleaner._clean_value(value) for value in uniques], dtype=object)
+        if all(isinstance(u, str) and c == u for c, u in zip(cleaned, uniques)):
+            return None
+        
+        # 마지막 칸은 결측치(-1) 용 NaN
+        values = np.append(cleaned, np.nan)[codes]
+        result = pd.Series(values, index=series.index, name=series.name, dtype=object)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            result = result.astype('category')
+        return result
+    
+    @staticmethod
+    def to_categorical(df, max_unique_ratio=0.1):
+        """
+        고유값이 적은 문자열 컬럼(성별, 지역, 구분 등)을 범주형으로 변환
+        행마다 문자열 객체를 두지 않고 정수 코드만 저장하므로 메모리와 중복 제거 비용이 줄어듦
+        """
+        if len(df) == 0:
+            return df
+        
+        # 고유값 수가 행 수 * max_unique_ratio 이하인 컬럼만 변환 (고유번호 같은 컬럼은 그대로)
+        categorical_columns = [
+            col for col in df.select_dtypes(include=['object']).columns
+            if df[col].nunique(dropna=True) <= max_unique_ratio * len(df)
+        ]
+        if not categorical_columns:
+            return df
+        
+        logger.info(f"범주형 변환: {categorical_columns}")
+        return df.astype({col: 'category' for col in categorical_columns})
+    
+    @staticmethod
+    def value_token(value):
+        """값 하나 -> 타입 구분이 붙은 문자열 (1, 1.0, True 처럼 == 로 같은 숫자는 같은 토큰, 결측치는 제어 문자)"""
+        if pd.isna(value):
+            return '\x00'
+        if isinstance(value, str):
+            return 's' + value
+        if isinstance(value, (int, float, np.number, np.bool_)):
+            return 'n' + repr(float(value))
+        return 'o' + str(value)
+    
+    @staticmethod
+    def value_tokens(series):
+        """컬럼 값 -> 값 토큰 배열 (고유값만 변환, 범주형은 범주 값 기준)"""
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        tokens = [DataCleaner.value_token(value) for value in np.asarray(uniques, dtype=object)]
+        # 마지막 칸은 결측치(-1) 자리
+        return np.array(tokens + ['\x00'], dtype=object)[codes]
+    
+    @staticmethod
+    def row_fingerprints(df):
+        """
+        행마다 모든 컬럼 값을 합친 64비트 해시 (인덱스 제외)
+        정수/실수 컬럼은 실수 값으로 해시 (청크마다 int64/float64 로 달라도 같은 값이면 같은 해시)
+        문자/범주형 컬럼은 값 토큰으로 해시 (청크마다 범주형/문자열로 달라지거나 1 과 1.0 중
+        먼저 나온 값이 달라도 같은 값이면 같은 해시)
+        """
+        converted = [
+            position for position, dtype in enumerate(df.dtypes)
+            if dtype.kind in 'iuO' or isinstance(dtype, pd.CategoricalDtype)
+        ]
+        if converted:
+            df = df.copy(deep=False)
+            for position in converted:
+                column = df.iloc[:, position]
+                if column.dtype.kind in 'iu':
+                    df.isetitem(position, column.astype('float64'))
+                else:
+                    df.isetitem(position, DataCleaner.value_tokens(column))
+        return pd.util.hash_pandas_object(df, index=False)
+    
+    @staticmethod
+    def remove_duplicates(df, return_fingerprints=False):
+        """
+        중복 데이터 제거 - 행 해시 하나로 중복을 찾고, 해시가 같은 행은 실제 값까지 비교
+        return_fingerprints=True 이면 (정제된 DataFrame, 남은 행의 해시) 반환
+        """
         logger.info("중복 데이터 제거 시작...")
         
         initial_count = len(df)
-        cleaned_df = df.drop_duplicates(keep='first')
+        fingerprints = DataCleaner.row_fingerprints(df).to_numpy()
+        
+        # 해시별 첫 등장 위치 -> 첫 등장이 아닌 행이 중복 후보
+        codes, _ = pd.factorize(fingerprints)
+        _, first_index = np.unique(codes, return_index=True)
+        first_of_row = first_index[codes]
+        duplicated = first_of_row != np.arange(initial_count)
+        
+        # 해시 충돌 확인: 중복 후보와 첫 등장 행의 값을 컬럼별로 비교
+        candidates = np.flatnonzero(duplicated)
+        same = np.ones(len(candidates), dtype=bool)
+        for col in range(df.shape[1]):
+            series = df.iloc[:, col]
+            # 범주형 컬럼은 문자열 대신 정수 코드 비교
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                values = series.cat.codes.to_numpy()
+            else:
+                values = series.to_numpy()
+            a, b = values[candidates], values[first_of_row[candidates]]
+            same &= (a == b) | (pd.isna(a) & pd.isna(b))
+        
+        if not same.all():
+            # 값이 다른데 해시가 같은 행(극히 드묾)은 해당 해시의 행들만 drop_duplicates 로 정확히 판정
+            collided_codes = codes[candidates[~same]]
+            suspects = np.flatnonzero(np.isin(codes, collided_codes))
+            duplicated[suspects] = df.iloc[suspects].duplicated(keep='first').to_numpy()
+            logger.warning(f"행 해시 충돌 {int((~same).sum())}건 - 실제 값으로 다시 비교")
+        
+        cleaned_df = df[~duplicated]
         removed_count = initial_count - len(cleaned_df)
         
         logger.info(f"중복 제거 완료: {removed_count}개 중복 행 제거, {len(cleaned_df)}행 남음")
-        return cleaned_df
\ No newline at end of file
+        if return_fingerprints:
+            return cleaned_df, pd.Series(fingerprints[~duplicated], index=cleaned_df.index)
+        return cleaned_df
+
+
+class SeenRows:
+    """
+    청크 간 중복 제거용 - 앞 청크에서 남긴 행의 해시와 정규화한 행 키(bytes)만 보관
+    해시가 같은 행은 행 키까지 비교해서 같을 때만 중복으로 봄 (해시 충돌로 다른 행을 지우지 않음)
+    청크 DataFrame 은 보관하지 않으므로 메모리는 남긴 행 수 x (해시 + 행 키) 만큼만 늘어남
+    """
+    
+    def __init__(self):
+        # 해시 -> 그 해시를 가진 첫 행의 키, 해시 충돌(극히 드묾)로 더 나온 행의 키는 _collided 에
+        self._keys = {}
+        self._collided = {}
+    
+    @staticmethod
+    def row_keys(df):
+        """행마다 모든 컬럼의 값 토큰을 이어 붙인 bytes (토큰마다 길이를 앞에 붙여 구분)"""
+        keys = pd.Series([''] * len(df), index=df.index, dtype=object)
+        for position in range(df.shape[1]):
+            tokens = pd.Series(DataCleaner.value_tokens(df.iloc[:, position]), index=df.index, dtype=object)
+            keys = keys + tokens.str.len().astype(str) + ':' + tokens
+        return keys.str.encode('utf-8').to_numpy()
+    
+    def filter_new(self, chunk, fingerprints):
+        """앞 청크에 이미 나온 행을 뺀 (청크, 해시) 반환, 남은 행의 해시와 행 키를 등록"""
+        fingerprints = np.asarray(fingerprints)
+        row_keys = self.row_keys(chunk)
+        repeated = np.zeros(len(chunk), dtype=bool)
+        collided = 0
+        
+        for i, (fingerprint, key) in enumerate(zip(fingerprints.tolist(), row_keys)):
+            owner = self._keys.get(fingerprint)
+            if owner is None:
+                continue
+            if owner == key or key in self._collided.get(fingerprint, ()):
+                repeated[i] = True
+            else:
+                collided += 1
+        if collided:
+            logger.warning(f"청크 간 행 해시 충돌 {collided}건 - 실제 값으로 다시 비교")
+        
+        new_chunk = chunk[~repeated]
+        new_fingerprints = fingerprints[~repeated]
+        for fingerprint, key in zip(new_fingerprints.tolist(), row_keys[~repeated]):
+            if fingerprint in self._keys:
+                self._collided.setdefault(fingerprint, []).append(key)
+            else:
+                self._keys[fingerprint] = key
+        return new_chunk, new_fingerprints
@@ -3,7 +3,10 @@
 메인 실행 스크립트
 """
 import logging
-from config.db_config import DB_CONFIG, QUESTION_MAPPINGS, LOG_LEVEL
+from config.db_config import (
+    DB_CONFIG, QUESTION_MAPPINGS, LANGUAGE_CACHE_CONFIG, LANGUAGE_FILTER_CONFIG, POOL_CONFIG,
+    LOG_LEVEL
+)
 from pipeline import DataPipeline
 
 # 로깅 설정
@@ -18,16 +21,43 @@ def main():
     """메인 실행 함수"""
     
     # 데이터 파이프라인 초기화
-    pipeline = DataPipeline(DB_CONFIG, QUESTION_MAPPINGS) # DB 설정과 매핑 정보 전달
+    pipeline = DataPipeline( # DB 설정, 매핑 정보, 언어 감지 캐시/필터 설정, 커넥션 풀 설정 전달
+        DB_CONFIG, QUESTION_MAPPINGS, LANGUAGE_CACHE_CONFIG, LANGUAGE_FILTER_CONFIG, POOL_CONFIG
+    )
     
     # 엑셀 파일 경로 및 설정
     excel_file_path = 'C:/Users/ecopl/Desktop/qpoll 데이터/필수/qpoll_join_250304.xlsx'  # 실제 파일 경로로 변경
     table_name = 'qpoll_250304'
     
+    # 분할 처리 행 수 (None: 파일 전체를 한 번에 처리, 예: 50000 - 큰 파일도 메모리 사용량 일정)
+    chunk_size = None
+    
+    # 이미 적재한 파일(내용 해시 + 시트 + 테이블/정제 설정이 같음)도 다시 적재할지 여부
+    force_reload = False
+    
     # 텍스트 분석할 컬럼 지정
     text_columns = ['구분', '고유번호', '성별', '나이', '지역', '설문일시']
     
     try:
+        if chunk_size:
+            # 청크 단위로 정제 및 저장
+            saved_count = pipeline.process_and_save_in_chunks(
+                file_path=excel_file_path,
+                table_name=table_name,
+                text_columns=text_columns,
+                sheet_name=0,
+                target_language='ko',
+                if_exists='replace',
+                header=1,
+                chunk_size=chunk_size,
+                force_reload=force_reload
+            )
+            if saved_count is None:
+                print("\n이미 적재한 파일이라 건너뛰었습니다. (다시 적재하려면 force_reload = True)")
+                return
+            print(f"\n분할 정제 완료! 최종 데이터 행 수: {saved_count}")
+            return
+        
         # 데이터 정제 및 저장
         result_df = pipeline.process_and_save(
             file_path=excel_file_path,
@@ -36,8 +66,12 @@ def main():
             sheet_name=0,  # 엑셀 파일 내 시트 번호 0 = 첫번째 시트 
             target_language='ko', # 한국어
             if_exists='replace', # 기존 테이블이 있으면 새로 만듬
-            header=1  # 두 번째 행을 헤더로 사용
+            header=1,  # 두 번째 행을 헤더로 사용
+            force_reload=force_reload
         )
+        if result_df is None:
+            print("\n이미 적재한 파일이라 건너뛰었습니다. (다시 적재하려면 force_reload = True)")
+            return
         
         print(f"\n정제 완료! 최종 데이터 행 수: {len(result_df)}")
         print("\n매핑 적용 후 데이터 미리보기:")
@@ -55,6 +89,11 @@ def main():
     except Exception as e:
         logger.error(f"프로세스 실행 중 오류 발생: {e}")
         raise
+    
+    finally:
+        # 언어 감지 프로세스 풀 종료 + 새로 감지한 언어 결과를 디스크 캐시에 반영
+        pipeline.close()
+        logger.info(f"커넥션 풀 통계: {pipeline.db_manager.pool_stats()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+# batch.py
+"""
+여러 엑셀 파일 일괄 처리 스크립트
+
+디렉터리 또는 glob 패턴에 맞는 파일(예: qpoll_join_*.xlsx)을 정제 프로세스 풀 + DB 저장 스레드로 처리
+일괄 처리 로직은 utils/batch_runner.py 에 있고, 여기서는 이 문항의 설정만 넘긴다.
+
+실행: python batch.py "C:/.../qpoll 데이터/필수"   또는   python batch.py "C:/.../qpoll_join_*.xlsx"
+"""
+import logging
+import sys
+from config import db_config
+from pipeline import CleaningPipeline, DataPipeline
+from utils.batch_runner import run_batch
+
+logging.basicConfig(level=db_config.LOG_LEVEL, format=db_config.LOG_FORMAT)
+
+
+def main():
+    """메인 실행 함수"""
+
+    # 처리할 파일 (디렉터리 또는 glob 패턴, 실행 인자로 바꿀 수 있음)
+    pattern = 'C:/Users/ecopl/Desktop/qpoll 데이터/필수/qpoll_join_*.xlsx'
+    if len(sys.argv) > 1:
+        pattern = sys.argv[1]
+
+    # 이미 적재한 파일(내용 해시 + 시트 + 테이블/정제 설정이 같음)도 다시 적재할지 여부
+    force_reload = False
+
+    # 텍스트 분석할 컬럼 지정
+    text_columns = ['구분', '고유번호', '성별', '나이', '지역', '설문일시']
+
+    statuses = run_batch(
+        pattern, db_config, DataPipeline, CleaningPipeline,
+        text_columns=text_columns,
+        sheet_name=0,           # 엑셀 파일 내 시트 번호 0 = 첫번째 시트
+        target_language='ko',   # 한국어
+        if_exists='replace',    # 파일마다 테이블을 새 데이터로 교체
+        header=1,               # 두 번째 행을 헤더로 사용
+        clean_workers=None,     # 정제 프로세스 수 (None: CPU 수)
+        db_workers=2,           # DB 저장 스레드 수 (POOL_CONFIG 의 pool_size 이하)
+        max_pending=2,          # 저장을 기다릴 수 있는 정제 결과 수
+        force_reload=force_reload
+    )
+    # 실패한 파일이 있으면 종료 코드 1
+    return 1 if any(status['status'] == 'failed' for status in statuses) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,6 +38,32 @@ QUESTION_MAPPINGS = {
     }
 }
 
+# 언어 감지 캐시 설정
+LANGUAGE_CACHE_CONFIG = {
+    'max_size': 100000,   # 메모리에 보관할 최대 텍스트 수
+    'cache_path': None    # 예: 'language_cache.sqlite3' - 지정하면 디스크에도 저장해 다음 실행에서 재사용
+}
+
+# 언어 필터 설정
+LANGUAGE_FILTER_CONFIG = {
+    'korean_threshold': 0.8,  # 글자 중 한글 비율이 이 값 이상이면 langdetect 없이 한국어로 판정 (None: 사용 안 함)
+    'workers': 1,             # langdetect 병렬 프로세스 수 (1: 병렬 처리 안 함, 예: os.cpu_count())
+    'chunk_size': 500         # 워커 하나에 한 번에 넘길 텍스트 수
+}
+
+# 커넥션 풀 설정 (같은 DB 를 쓰는 모든 파이프라인이 풀 하나를 공유)
+POOL_CONFIG = {
+    'pool_size': 5,           # 반환 후에도 열어 두는 연결 수
+    'max_overflow': 10,       # 모자랄 때 추가로 여는 연결 수
+    'pool_timeout': 30,       # 빈 연결을 기다리는 최대 시간(초)
+    'pool_recycle': 1800,     # 이 시간(초)보다 오래된 연결은 새로 연결
+    'pre_ping': True,         # 꺼낼 때 끊긴 연결인지 확인
+    'session_settings': {     # 연결마다 적용할 세션 설정 (대량 적재용)
+        'work_mem': '64MB',
+        'maintenance_work_mem': '256MB'
+    }
+}
+
 # 로깅 설정
 LOG_LEVEL = 'INFO'
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
\ No newline at end of file
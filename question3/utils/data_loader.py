@@ -3,7 +3,10 @@
 엑셀 파일 로드 및 매핑 처리
 """
 import pandas as pd
+import numpy as np
 import logging
+from openpyxl import load_workbook
+from utils.excel_cache import read_excel_cached, iter_cached_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -15,18 +18,129 @@ class DataLoader:
         self.question_mappings = question_mappings or {}
     
     def load_excel(self, file_path, sheet_name=None, header=0):
-        """엑셀 파일 로드"""
+        """엑셀 파일 로드 (파싱 결과 캐시 사용)"""
         try:
-            if sheet_name:
-                df = pd.read_excel(file_path, sheet_name=sheet_name, header=header)
-            else:
-                df = pd.read_excel(file_path, header=header)
+            df = read_excel_cached(file_path, sheet_name=sheet_name or 0, header=header)
             logger.info(f"엑셀 파일 로드 완료: {len(df)}행, {len(df.columns)}열")
             return df
         except Exception as e:
             logger.error(f"엑셀 파일 로드 실패: {e}")
             raise
     
+    @staticmethod
+    def _make_column_names(header_row):
+        """헤더 행 -> 컬럼명 (pd.read_excel 과 같이 빈 칸은 'Unnamed: n', 중복은 '.1' 접미사)"""
+        names = []
+        seen = {}
+        for i, value in enumerate(header_row):
+            name = f"Unnamed: {i}" if value is None or str(value).strip() == '' else value
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            names.append(name)
+        return names
+    
+    @staticmethod
+    def _rows_to_frame(rows, columns, start):
+        """행 목록 -> DataFrame (인덱스는 파일 전체 기준 행 번호)"""
+        df = pd.DataFrame.from_records(
+            rows, columns=columns, index=pd.RangeIndex(start, start + len(rows))
+        )
+        # 빈 셀(None)은 pd.read_excel 과 같이 NaN 으로
+        for col in df.select_dtypes(include=['object']).columns:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+        return df
+    
+    @staticmethod
+    def _pin_dtypes(chunk, dtypes):
+        """
+        청크의 컬럼 dtype 을 앞 청크들과 맞춤, (맞춘 청크, 다음 청크에 쓸 dtype 목록) 반환
+        청크마다 dtype 을 따로 추론하면 같은 행도 청크에 따라 값/해시가 달라지므로
+        처음 값이 나온 청크의 dtype 을 따르고, 그대로 담을 수 없으면 넓힌 dtype(정수 -> 실수 -> object)을 이후 청크에도 사용
+        dtypes 의 None 은 아직 빈 셀만 나온 컬럼
+        """
+        pinned = []
+        for position in range(chunk.shape[1]):
+            column = chunk.iloc[:, position]
+            dtype = dtypes[position] if dtypes is not None else None
+            empty = column.isna().all()
+            if dtype is None or column.dtype == dtype:
+                pinned.append(None if dtype is None and empty else column.dtype)
+                continue
+            
+            if empty and dtype.kind != 'b':
+                # 빈 셀만 있는 청크는 앞 청크의 dtype 으로 (정수는 결측치를 담을 수 있는 실수로)
+                if dtype.kind in 'iu':
+                    dtype = np.dtype('float64')
+            elif dtype.kind in 'iuf' and column.dtype.kind in 'iuf':
+                # 정수/실수가 섞이면 실수로 (결측치가 있는 청크는 정수로 담을 수 없음)
+                dtype = np.result_type(dtype, column.dtype)
+            elif dtype != object:
+                dtype = np.dtype(object)
+            chunk.isetitem(position, column.astype(dtype))
+            pinned.append(dtype)
+        return chunk, pinned
+    
+    def iter_excel_chunks(self, file_path, sheet_name=None, header=0, chunk_size=50000):
+        """
+        엑셀 파일을 chunk_size 행씩 나눠 DataFrame 으로 순서대로 반환 (제너레이터)
+        파일 전체를 메모리에 올리지 않아 파일 크기와 상관없이 메모리 사용량이 일정함
+        컬럼 dtype 은 첫 청크에 맞춤 (청크마다 따로 추론하지 않음)
+        """
+        dtypes = None
+        for chunk in self._iter_raw_chunks(file_path, sheet_name, header, chunk_size):
+            chunk, dtypes = self._pin_dtypes(chunk, dtypes)
+            yield chunk
+    
+    def _iter_raw_chunks(self, file_path, sheet_name, header, chunk_size):
+        """캐시 또는 openpyxl 에서 chunk_size 행씩 읽은 DataFrame (dtype 은 청크마다 추론)"""
+        # 이미 파싱해 둔 캐시가 있으면 캐시에서 분할 로드
+        cached_chunks = iter_cached_chunks(file_path, sheet_name or 0, chunk_size, header=header)
+        if cached_chunks is not None:
+            yield from cached_chunks
+            return
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            if sheet_name is None or isinstance(sheet_name, int):
+                worksheet = workbook.worksheets[sheet_name or 0]
+            else:
+                worksheet = workbook[sheet_name]
+            
+            columns = None
+            rows = []
+            total = 0
+            for row_number, row in enumerate(worksheet.iter_rows(values_only=True)):
+                # 헤더 이전 행은 건너뜀
+                if row_number < header:
+                    continue
+                if columns is None:
+                    columns = self._make_column_names(row)
+                    continue
+                # 빈 행은 건너뜀
+                if all(value is None for value in row):
+                    continue
+                
+                # 헤더 길이에 맞춰 자르거나 채움
+                row = tuple(row[:len(columns)]) + (None,) * (len(columns) - len(row))
+                rows.append(row)
+                if len(rows) >= chunk_size:
+                    yield self._rows_to_frame(rows, columns, total)
+                    total += len(rows)
+                    rows = []
+            
+            if rows:
+                yield self._rows_to_frame(rows, columns, total)
+                total += len(rows)
+            logger.info(f"엑셀 파일 분할 로드 완료: {total}행, {len(columns or [])}열")
+        except Exception as e:
+            logger.error(f"엑셀 파일 분할 로드 실패: {e}")
+            raise
+        finally:
+            workbook.close()
+    
     def map_stress_values(self, df):
         """문항1, 문항2, 문항3의 숫자를 의미 있는 텍스트로 변환"""
         logger.info("문항 매핑 시작...")
@@ -41,8 +155,10 @@ class DataLoader:
             if column in mapped_df.columns:
                 try:
                     # 숫자형으로 변환 후 매핑 적용
-                    mapped_df[column] = pd.to_numeric(mapped_df[column], errors='coerce')
-                    mapped_df[column] = mapped_df[column].map(mapping)
+                    codes = pd.to_numeric(mapped_df[column], errors='coerce')
+                    # 매핑 결과는 몇 가지 값만 반복되므로 범주형(정수 코드 + 범주 목록)으로 저장
+                    categories = pd.unique(pd.Series(list(mapping.values()), dtype=object))
+                    mapped_df[column] = pd.Categorical(codes.map(mapping), categories=categories)
                     logger.info(f"'{column}' 컬럼 매핑 완료")
                 except Exception as e:
                     logger.warning(f"'{column}' 컬럼 매핑 실패: {e}")
@@ -0,0 +1,255 @@
+"""
+엑셀 시트 파싱 결과 캐시
+
+같은 엑셀 파일을 여러 번 읽을 때 openpyxl 파싱을 반복하지 않도록,
+읽은 시트를 원본 파일 옆 .excel_cache 폴더에 Arrow IPC 파일로 저장해 두고 재사용한다.
+- 캐시 파일 이름에 원본 파일 내용의 해시가 들어가므로 파일이 바뀌면 자동으로 다시 파싱
+- 시트/읽기 옵션이 같으면 어느 스크립트에서 읽든 같은 캐시 파일을 공유
+- 숫자/문자가 섞인 컬럼(예: 다중 선택 문항 '1, 3' 과 4)은 값마다 [타입, 값] JSON 문자열로 저장
+  (pickle 을 쓰지 않으므로 공유 폴더의 캐시 파일을 읽어도 코드가 실행되지 않음, 모르는 타입이 있으면 캐시하지 않음)
+- pyarrow 가 없거나 저장할 수 없는 시트는 캐시 없이 pd.read_excel 결과를 그대로 사용
+"""
+import glob
+import hashlib
+import json
+import logging
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = '.excel_cache'
+
+# (경로, 크기, 수정 시각) -> 내용 해시 (같은 실행 안에서 해시 재계산 방지)
+_hash_memo = {}
+
+
+def file_content_hash(file_path, block_size=1024 * 1024):
+    """파일 내용의 SHA-256 해시"""
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _hash_memo:
+        return _hash_memo[memo_key]
+
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha.update(block)
+    _hash_memo[memo_key] = sha.hexdigest()
+    return _hash_memo[memo_key]
+
+
+def _options_key(sheet_name, read_options):
+    """시트 + 읽기 옵션을 짧은 문자열 키로 변환"""
+    text = repr((sheet_name, sorted(read_options.items())))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+
+
+def cache_file_path(file_path, sheet_name=0, **read_options):
+    """캐시 파일 경로: <원본 폴더>/.excel_cache/<파일명>.<옵션 키>.<내용 해시>.arrow"""
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+    stem = os.path.basename(file_path)
+    options_key = _options_key(sheet_name, read_options)
+    content_hash = file_content_hash(file_path)[:16]
+    return os.path.join(cache_dir, f"{stem}.{options_key}.{content_hash}.arrow")
+
+
+# 값마다 [타입, 값] JSON 으로 저장한 컬럼 목록을 기록하는 스키마 메타데이터 키
+# (이 키가 없는 캐시는 다른 형식이므로 읽지 않고 다시 파싱)
+_TAGGED_COLUMNS_KEY = b'excel_cache_tagged_columns'
+
+
+def _encode_value(value):
+    """셀 값 -> [타입, 값] JSON 문자열 (지원하지 않는 타입이면 TypeError)"""
+    if value is None:
+        tagged = ['none', None]
+    elif isinstance(value, (bool, np.bool_)):
+        tagged = ['bool', bool(value)]
+    elif isinstance(value, (int, np.integer)):
+        tagged = ['int', int(value)]
+    elif isinstance(value, (float, np.floating)):
+        # NaN/inf 도 그대로 복원되도록 repr 문자열로
+        tagged = ['float', repr(float(value))]
+    elif isinstance(value, str):
+        tagged = ['str', value]
+    elif isinstance(value, pd.Timestamp):
+        tagged = ['timestamp', value.isoformat()]
+    elif isinstance(value, datetime.datetime):
+        tagged = ['datetime', value.isoformat()]
+    elif isinstance(value, datetime.date):
+        tagged = ['date', value.isoformat()]
+    elif isinstance(value, datetime.time):
+        tagged = ['time', value.isoformat()]
+    else:
+        raise TypeError(f"캐시할 수 없는 셀 값 타입: {type(value).__name__}")
+    return json.dumps(tagged, ensure_ascii=False)
+
+
+_DECODERS = {
+    'none': lambda value: None,
+    'bool': bool,
+    'int': int,
+    'float': float,
+    'str': str,
+    'timestamp': pd.Timestamp,
+    'datetime': datetime.datetime.fromisoformat,
+    'date': datetime.date.fromisoformat,
+    'time': datetime.time.fromisoformat,
+}
+
+
+def _decode_value(text):
+    """[타입, 값] JSON 문자열 -> 셀 값 (모르는 타입이면 ValueError)"""
+    kind, value = json.loads(text)
+    if kind not in _DECODERS:
+        raise ValueError(f"엑셀 캐시에 알 수 없는 값 타입: {kind}")
+    return _DECODERS[kind](value)
+
+
+def _frame_to_table(df):
+    """DataFrame -> Arrow 테이블 (Arrow 로 변환할 수 없는 혼합 타입 컬럼은 값마다 [타입, 값] JSON)"""
+    import pyarrow as pa
+    encoded = df.copy()
+    tagged_positions = []
+    for position, col in enumerate(df.columns):
+        if df[col].dtype != object:
+            continue
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowException, TypeError, ValueError):
+            encoded.isetitem(position, [_encode_value(value) for value in df[col]])
+            tagged_positions.append(position)
+
+    table = pa.Table.from_pandas(encoded, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_TAGGED_COLUMNS_KEY] = json.dumps(tagged_positions).encode('utf-8')
+    return table.replace_schema_metadata(metadata)
+
+
+def _table_to_frame(table):
+    """Arrow 테이블 -> DataFrame ([타입, 값] JSON 으로 저장한 컬럼 복원)"""
+    metadata = table.schema.metadata or {}
+    if _TAGGED_COLUMNS_KEY not in metadata:
+        raise ValueError("알 수 없는 형식의 엑셀 캐시")
+    df = table.to_pandas()
+    tagged_positions = json.loads(metadata[_TAGGED_COLUMNS_KEY])
+    for position in tagged_positions:
+        values = [_decode_value(text) for text in df.iloc[:, position]]
+        df.isetitem(position, pd.Series(values, index=df.index, dtype=object))
+
+    # Arrow 는 문자열 컬럼의 빈 셀을 None 으로 돌려주므로 pd.read_excel 과 같이 NaN 으로
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        if position not in tagged_positions and column.dtype == object and column.isna().any():
+            df.isetitem(position, column.where(column.notna(), np.nan))
+    return df
+
+
+def _load_cache(path):
+    """Arrow IPC 캐시 파일을 메모리 매핑으로 읽기"""
+    import pyarrow as pa
+    with pa.memory_map(path, 'r') as source:
+        return _table_to_frame(pa.ipc.open_file(source).read_all())
+
+
+def _save_cache(df, path):
+    """DataFrame 을 Arrow IPC 파일로 저장 (임시 파일에 쓰고 교체), 예전 캐시는 삭제"""
+    import pyarrow as pa
+    table = _frame_to_table(df)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except Exception:
+        # 쓰다 만 임시 파일이 캐시 폴더에 남지 않도록
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # 같은 파일/옵션의 예전 내용 해시 캐시 정리
+    prefix = path.rsplit('.', 2)[0]
+    for old_path in glob.glob(glob.escape(prefix) + '.*.arrow'):
+        if old_path != path:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def _parse_sheet(file_path, sheet_name, excel_file, read_options):
+    """캐시가 없을 때 실제 파싱 (이미 열어 둔 pd.ExcelFile 이 있으면 재사용)"""
+    if excel_file is not None:
+        return excel_file.parse(sheet_name, **read_options)
+    return pd.read_excel(file_path, sheet_name=sheet_name, **read_options)
+
+
+def read_excel_cached(file_path, sheet_name=0, excel_file=None, **read_options):
+    """
+    pd.read_excel 과 같은 결과를 캐시를 거쳐 반환
+    excel_file: 이미 열어 둔 pd.ExcelFile (여러 시트를 읽을 때 파일을 한 번만 열기 위함)
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return _parse_sheet(file_path, sheet_name, excel_file, read_options)
+
+    path = cache_file_path(file_path, sheet_name, **read_options)
+    if os.path.exists(path):
+        try:
+            df = _load_cache(path)
+            logger.info(f"엑셀 캐시 사용: {os.path.basename(path)}")
+            return df
+        except Exception as e:
+            logger.warning(f"엑셀 캐시를 읽지 못해 원본을 다시 파싱합니다: {e}")
+
+    df = _parse_sheet(file_path, sheet_name, excel_file, read_options)
+    try:
+        _save_cache(df, path)
+    except Exception as e:
+        # 저장할 수 없는 시트는 캐시하지 않음
+        logger.warning(f"엑셀 캐시 저장 실패 (캐시 없이 진행): {e}")
+    return df
+
+
+def iter_cached_chunks(file_path, sheet_name=0, chunk_size=50000, **read_options):
+    """
+    캐시가 있으면 chunk_size 행씩 DataFrame 으로 반환 (메모리 매핑이라 메모리 사용량 일정)
+    캐시가 없거나 pyarrow 가 없으면 None
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+
+    path = cache_file_path(file_path, sheet_name, **read_options)
+    if not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path, 'r') as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except Exception as e:
+        logger.warning(f"엑셀 캐시를 읽지 못해 원본을 다시 파싱합니다: {e}")
+        return None
+    if _TAGGED_COLUMNS_KEY not in metadata:
+        # 다른 형식의 캐시는 읽지 않음 (원본을 다시 파싱하면서 새 캐시로 교체)
+        return None
+
+    def generate():
+        with pa.memory_map(path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+            for start in range(0, table.num_rows, chunk_size):
+                chunk = _table_to_frame(table.slice(start, chunk_size))
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                yield chunk
+
+    logger.info(f"엑셀 캐시에서 분할 로드: {os.path.basename(path)}")
+    return generate()
@@ -0,0 +1,127 @@
+"""
+설문 응답 변환 유틸리티
+
+응답 시트(사용자 1명 = 1행, 문항 = 컬럼)를 USER_PROFILE_ANSWERS 용 긴 형태
+(사용자, 문항, 답변 하나 = 1행)로 한 번에 변환한다.
+- 쉼표로 구분된 다중 선택 답변('2, 1')은 str.split + explode 로 펼침
+- 행 -> 문항 -> 답변 순서를 유지하므로 기존 반복문과 같은 행이 남음 (중복은 첫 행 기준)
+- 결과 DataFrame 은 bulk_loader.bulk_upsert 에 그대로 넘길 수 있음
+
+'나이' 컬럼('YYYY년 MM월 DD일 ...')도 행마다 파싱하지 않고 컬럼 단위로 datetime64 로 변환한다.
+"""
+import numpy as np
+import pandas as pd
+
+ANSWER_KEY_COLUMNS = ['user_id', 'question_id', 'answer_value']
+
+# 'YYYY년 MM월 DD일' (문자열 앞부분, 뒤에 '(만 32세)' 등이 붙어도 됨)
+BIRTHDATE_PATTERN = r'^(\d{4})년 (\d{2})월 (\d{2})일'
+
+# USERS 테이블에 필요한 응답 시트 컬럼 -> USERS 컬럼
+USER_COLUMNS = {'고유번호': 'user_id', '성별': 'gender', '나이': 'birth_date', '지역': 'region'}
+
+
+def parse_birthdates(values):
+    """
+    'YYYY년 MM월 DD일 ...' 컬럼 -> (datetime64 컬럼, 거부 마스크)
+    같은 문자열은 한 번만 파싱하고, 형식이 다르거나 없는 날짜(예: 2월 30일)는 NaT + 거부(True)
+    """
+    codes, uniques = pd.factorize(values)
+    parts = pd.Series(uniques, dtype=object).astype(str).str.extract(BIRTHDATE_PATTERN)
+    parsed = pd.to_datetime(parts[0] + '-' + parts[1] + '-' + parts[2], format='%Y-%m-%d', errors='coerce')
+
+    # 결측치(code -1)는 마지막 NaT 를 가리킴
+    lookup = np.append(parsed.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))
+    birth_dates = pd.Series(lookup[codes], index=values.index, name=values.name)
+    return birth_dates, birth_dates.isna()
+
+
+def build_user_frame(df):
+    """
+    응답 시트 -> USERS 행 DataFrame (user_id, gender, birth_date, region)
+    필수 컬럼이 비었거나 생년월일을 읽을 수 없는 행은 제외, 인덱스는 응답 시트의 행 인덱스 그대로
+    """
+    essential = df.reindex(columns=list(USER_COLUMNS))
+    birth_dates, rejected = parse_birthdates(essential['나이'])
+    valid = essential.notna().all(axis=1) & ~rejected
+
+    users = essential[valid]
+    return pd.DataFrame({
+        'user_id': users['고유번호'].astype(str).str.strip(),
+        'gender': users['성별'].astype(str).str.strip(),
+        'birth_date': birth_dates[valid],
+        'region': users['지역'].astype(str).str.strip(),
+    }, index=users.index)
+
+
+def normalize_answer_code(text):
+    """숫자 형태의 답변을 정수 문자열로 변환 (예: '4.0' -> '4'), 숫자가 아니면 그대로"""
+    try:
+        return str(int(float(text)))
+    except (ValueError, OverflowError):
+        return text
+
+
+def explode_multi_answers(df, question_columns, user_column, extra_columns=None,
+                          normalize_codes=False, code_map=None):
+    """
+    응답 DataFrame -> 다중 선택 답변을 한 행씩 펼친 DataFrame
+
+    question_columns: {응답 컬럼명: question_id}
+    user_column: 사용자 ID 컬럼 (앞뒤 공백을 제거해 user_id 로 사용)
+    extra_columns: 답변 행에 함께 옮길 컬럼 {응답 컬럼명: 결과 컬럼명} (예: {'설문일시': 'answered_at'})
+    normalize_codes: True 이면 '4.0' 같은 숫자 답변을 '4' 로
+    code_map: {(question_id, 답변 텍스트): 선택지 코드} - 텍스트 답변을 코드로 바꿀 때 (정규화 전에 적용)
+    반환: user_id, question_id, answer_value (+ extra) 컬럼, (user_id, question_id, answer_value) 중복은 첫 행만
+    """
+    extra_columns = extra_columns or {}
+    # 응답 시트에 없는 문항 컬럼은 건너뜀 (row.get 과 동일)
+    columns = [col for col in question_columns if col in df.columns]
+    n_rows = len(df)
+
+    # 행 우선 순서로 한 줄로 펼침 (행 -> 문항 순서)
+    values = pd.Series(df[columns].to_numpy(dtype=object).ravel(), dtype=object)
+    row_positions = np.repeat(np.arange(n_rows), len(columns))
+    question_ids = np.tile(np.array([question_columns[col] for col in columns], dtype=object), n_rows)
+
+    # 빈 셀 / 공백뿐인 셀 제외
+    present = values.notna().to_numpy()
+    texts = values[present].astype(str)
+    answered = (texts.str.strip() != '').to_numpy()
+    keep = np.flatnonzero(present)[answered]
+
+    long_df = pd.DataFrame({
+        '_row': row_positions[keep],
+        'question_id': question_ids[keep],
+        'answer_value': texts[answered].to_numpy(),
+    })
+
+    # 쉼표로 나눠 한 행씩 (explode 는 나눈 순서를 유지)
+    long_df['answer_value'] = long_df['answer_value'].str.split(',')
+    long_df = long_df.explode('answer_value', ignore_index=True)
+    long_df['answer_value'] = long_df['answer_value'].str.strip()
+    long_df = long_df[long_df['answer_value'] != '']
+
+    if code_map:
+        codes = pd.DataFrame(
+            [(question_id, text, code) for (question_id, text), code in code_map.items()],
+            columns=['question_id', 'answer_value', '_code']
+        )
+        long_df = long_df.merge(codes, on=['question_id', 'answer_value'], how='left')
+        long_df['answer_value'] = long_df['_code'].where(long_df['_code'].notna(), long_df['answer_value'])
+        long_df = long_df.drop(columns='_code')
+
+    if normalize_codes:
+        # 답변 종류는 많지 않으므로 고유값만 변환
+        codes, uniques = pd.factorize(long_df['answer_value'])
+        normalized = np.array([normalize_answer_code(value) for value in uniques], dtype=object)
+        long_df['answer_value'] = normalized[codes]
+
+    user_ids = df[user_column].astype(str).str.strip().to_numpy()
+    long_df.insert(0, 'user_id', user_ids[long_df['_row'].to_numpy()])
+    for source, target in extra_columns.items():
+        source_values = df[source].to_numpy() if source in df.columns else np.full(n_rows, None)
+        long_df[target] = source_values[long_df['_row'].to_numpy()]
+
+    long_df = long_df.drop(columns='_row')
+    return long_df.drop_duplicates(subset=ANSWER_KEY_COLUMNS, keep='first', ignore_index=True)
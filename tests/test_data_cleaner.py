@@ -0,0 +1,84 @@
+"""
+행 해시 중복 제거가 drop_duplicates(keep='first') 와 같은 행을 남기는지 확인
+
+question1~3 의 cleaners/data_cleaner.py 는 같은 파일이므로 question1 것으로 확인
+(결측치, 범주형, 정수/실수 혼합, 해시 충돌, 청크 간 중복 포함)
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'question1'))
+from cleaners.data_cleaner import DataCleaner, SeenRows  # noqa: E402
+
+
+def _sample_frame(seed, n_rows=400):
+    """값 종류가 적어 중복이 많은 DataFrame (결측치, 범주형, 정수/실수/문자 혼합 컬럼 포함)"""
+    rng = np.random.default_rng(seed)
+    mixed_values = np.array([1, 1.0, 2, 2.5, '1', 'a', None, np.nan], dtype=object)
+    df = pd.DataFrame({
+        '구분': rng.choice(['가', '나', None], n_rows),
+        '성별': pd.Categorical(rng.choice(['남', '여'], n_rows)),
+        '나이': rng.integers(20, 23, n_rows),
+        '점수': np.where(rng.random(n_rows) < 0.2, np.nan, rng.integers(0, 3, n_rows).astype(float)),
+        '혼합': mixed_values[rng.integers(0, len(mixed_values), n_rows)],
+    })
+    df.index = rng.permutation(n_rows) + 1000
+    return df
+
+
+def _coarse_fingerprints(df):
+    """해시 충돌을 일부러 많이 만드는 행 해시 (2비트)"""
+    return _real_fingerprints(df) % np.uint64(4)
+
+
+_real_fingerprints = DataCleaner.row_fingerprints
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('collide', [False, True])
+def test_remove_duplicates_matches_drop_duplicates(seed, collide, monkeypatch):
+    """한 번에 중복 제거한 결과가 drop_duplicates(keep='first') 와 같아야 함"""
+    if collide:
+        monkeypatch.setattr(DataCleaner, 'row_fingerprints', staticmethod(_coarse_fingerprints))
+    df = _sample_frame(seed)
+    expected = df.drop_duplicates(keep='first')
+    result = DataCleaner.remove_duplicates(df)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def _chunked_dedup(df, chunk_size):
+    """process_in_chunks 와 같은 순서: 청크마다 중복 제거 -> SeenRows 로 앞 청크와 겹치는 행 제거"""
+    seen_rows = SeenRows()
+    kept = []
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        # 청크마다 dtype 이 달라지는 경우 (결측치가 섞인 청크의 정수 컬럼은 실수, 고유값이 많은 청크는 범주형이 아님)
+        if start // chunk_size % 2:
+            chunk = chunk.astype({'나이': 'float64', '성별': object})
+        chunk, fingerprints = DataCleaner.remove_duplicates(chunk, return_fingerprints=True)
+        chunk, _ = seen_rows.filter_new(chunk, fingerprints)
+        kept.append(chunk.index)
+    return kept[0].append(kept[1:]) if kept else pd.Index([])
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('chunk_size', [7, 64, 1000])
+@pytest.mark.parametrize('collide', [False, True])
+def test_chunked_dedup_matches_drop_duplicates(seed, chunk_size, collide, monkeypatch):
+    """청크로 나눠 중복 제거해도 전체에 drop_duplicates(keep='first') 한 것과 같은 행이 남아야 함"""
+    if collide:
+        monkeypatch.setattr(DataCleaner, 'row_fingerprints', staticmethod(_coarse_fingerprints))
+    df = _sample_frame(seed)
+    expected = df.astype({'성별': object}).drop_duplicates(keep='first').index
+    assert _chunked_dedup(df, chunk_size).equals(expected)
+
+
+def test_seen_rows_keys_compare_values():
+    """행 키는 정수/실수가 같은 값이면 같고, 문자 '1' 과 숫자 1, 결측치와 문자 'nan' 은 구분"""
+    left = pd.DataFrame({'a': [1, 2, None], 'b': pd.Categorical(['x', 'y', 'x'])})
+    right = pd.DataFrame({'a': [1.0, '2', 'nan'], 'b': ['x', 'y', 'x']})
+    assert (SeenRows.row_keys(left) == SeenRows.row_keys(right)).tolist() == [True, False, False]
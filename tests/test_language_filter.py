@@ -0,0 +1,99 @@
+"""
+벡터화한 LanguageFilter.filter_by_language 가 예전 iterrows 방식과 같은 행을 남기는지 확인
+
+셀 단위 언어 감지는 langdetect 대신 규칙이 정해진 가짜 감지기로 바꿔서
+(고유값 단위 감지 + 행렬 판정 + 동점 처리) 부분만 비교
+question1~3 의 cleaners/language_filter.py 는 같은 파일이므로 question1 것으로 확인
+"""
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'question1'))
+from cleaners import language_filter  # noqa: E402
+from cleaners.language_cache import LanguageCache  # noqa: E402
+from cleaners.language_filter import LanguageFilter  # noqa: E402
+
+# 언어가 섞인 셀 값 (결측치, 짧은 값, 숫자/기호, 한글 비율이 낮은 값 포함)
+CELL_VALUES = [
+    None, np.nan, '', '  ', '가', 'ab', ' 가나 ', '12345', '3.5', '!?!', 7, 2.5,
+    '안녕하세요', '좋아요 good', 'hello world', 'good day', 'こんにちは', 'ありがとう',
+    'bonjour tout', 'bonjour', 'mixed 한 text here', '   hello   ',
+]
+
+
+def fake_detect(text):
+    """langdetect 대신 쓰는 감지기 - 글자가 없으면 실패, 한글/가나/특정 단어로 판정"""
+    if not re.search(r'[^\W\d_]', text):
+        raise ValueError('No features in text.')
+    if re.search(r'[가-힣]', text):
+        return 'ko'
+    if re.search(r'[ぁ-ん]', text):
+        return 'ja'
+    if 'bonjour' in text:
+        return 'fr'
+    return 'en'
+
+
+def old_filter_by_language(df, text_columns, target_language='ko'):
+    """예전 구현 (행마다 컬럼별 감지 -> 한국어 우선 -> 전부 unknown -> value_counts 최다 언어)"""
+    language_results = []
+    for _, row in df.iterrows():
+        row_languages = [LanguageFilter.detect_language(row[col]) for col in text_columns]
+        if target_language in row_languages:
+            language_results.append(target_language)
+        elif 'unknown' in row_languages and len(set(row_languages)) == 1:
+            language_results.append('unknown')
+        else:
+            language_results.append(pd.Series(row_languages).value_counts().index[0])
+    detected = pd.Series(language_results, index=df.index)
+    if target_language == 'ko':
+        return df[(detected == 'ko') | (detected == 'unknown')]
+    return df[detected == target_language]
+
+
+def _sample_frame(seed, n_rows=300):
+    """셀 값을 섞은 DataFrame (범주형 컬럼, 숫자/문자 혼합 컬럼 포함)"""
+    rng = np.random.default_rng(seed)
+    values = np.array(CELL_VALUES, dtype=object)
+    df = pd.DataFrame({f'문항{j}': values[rng.integers(0, len(values), n_rows)] for j in range(4)})
+    df['지역'] = pd.Categorical(rng.choice(['서울', 'tokyo', 'paris bonjour', None], n_rows))
+    # 동점: 한국어 없이 최다 언어가 둘 이상인 행 (나오는 순서를 바꿔 가며, unknown 과의 동점 포함)
+    df.loc[0] = ['hello world', 'こんにちは', 'good day', 'ありがとう', None]
+    df.loc[1] = ['こんにちは', 'hello world', 'ありがとう', 'good day', None]
+    df.loc[2] = ['bonjour', 'good day', 'ありがとう', 'bonjour tout', 'tokyo']
+    df.loc[3] = ['12345', 'hello world', 'ありがとう', '!?!', 'tokyo']
+    return df
+
+
+@pytest.fixture(autouse=True)
+def _fake_langdetect(monkeypatch):
+    monkeypatch.setattr(language_filter, 'detect', fake_detect)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('target_language', ['ko', 'en', 'ja'])
+def test_filter_matches_iterrows_version(seed, target_language):
+    """같은 셀 감지 결과라면 예전 구현과 같은 행이 같은 순서로 남아야 함"""
+    df = _sample_frame(seed)
+    text_columns = list(df.columns)
+    expected = old_filter_by_language(df, text_columns, target_language)
+    result = LanguageFilter(LanguageCache()).filter_by_language(df, text_columns, target_language)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_tied_rows_follow_value_counts_order():
+    """최다 언어가 동점인 행은 value_counts() 의 첫 언어로 판정"""
+    df = _sample_frame(0).iloc[:4]
+    matrix, languages = LanguageFilter(LanguageCache())._detect_language_matrix(df, list(df.columns))
+    verdict = LanguageFilter._decide_row_languages(matrix, languages, 'ko')
+    expected = []
+    for row in df.itertuples(index=False):
+        counts = pd.Series([LanguageFilter.detect_language(value) for value in row]).value_counts()
+        assert counts.iloc[0] == counts.iloc[1]
+        expected.append(counts.index[0])
+    assert verdict.tolist() == expected
@@ -0,0 +1,107 @@
+"""
+pg_binary 바이너리 COPY 가 text/CSV COPY 와 같은 값을 저장하는지 확인
+
+PostgreSQL 이 필요한 테스트는 PG_TEST_DSN 환경 변수(psycopg2 연결 문자열)가 있을 때만 실행
+예: PG_TEST_DSN="host=localhost user=postgres dbname=postgres" python -m pytest tests
+"""
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pg_binary  # noqa: E402
+
+PG_TEST_DSN = os.environ.get('PG_TEST_DSN')
+# db_manager 의 CSV COPY 와 같은 NULL 표기
+COPY_NULL = '\\N'
+
+# 마이크로초 아래 자릿수가 0.5 경계, 반올림 올림/내림, 올림으로 초가 넘어가는 경우, 2000년 이전 값
+TIMESTAMPS = [
+    '2024-03-01 12:00:00.123456500',
+    '2024-03-01 12:00:00.123457500',
+    '2024-03-01 12:00:00.123456499',
+    '2024-03-01 12:00:00.123456501',
+    '2024-03-01 23:59:59.999999500',
+    '1999-12-31 23:59:59.999999700',
+    '1969-07-20 20:17:40.000000500',
+    '2000-01-01 00:00:00.000000000',
+]
+
+
+def _sample_frame():
+    """지원하는 타입을 모두 담은 DataFrame (결측치 포함)"""
+    timestamps = pd.to_datetime(pd.Series(TIMESTAMPS + [None]))
+    n_rows = len(timestamps)
+    return pd.DataFrame({
+        'i2': pd.array([1, -2, None, 300, 4, 5, 6, 7, 8], dtype='Int64'),
+        'i4': np.arange(n_rows, dtype=np.int64) * 1000,
+        'i8': np.arange(n_rows, dtype=np.int64) * 10**12,
+        'f4': np.linspace(-1.5, 2.5, n_rows),
+        'f8': [0.1, 1e-300, -2.5, np.nan, 3.0, 1e300, 0.0, 7.25, 1 / 3],
+        'b': [True, False, None, True, False, True, False, True, False],
+        't': ['가나다', '', None, 'a,b', '따옴표"', '줄\n바꿈', 'x' * 50, '\\N 아님', 'ok'],
+        'd': pd.to_datetime(pd.Series(['2024-03-01', '1999-12-31', None, '1970-01-01', '2000-01-01',
+                                       '2038-01-19', '1900-02-28', '2024-02-29', '2001-01-01'])),
+        'ts': timestamps,
+        'tstz': timestamps.dt.tz_localize('Asia/Seoul'),
+    })
+
+
+COLUMNS_SQL = (
+    'i2 SMALLINT, i4 INTEGER, i8 BIGINT, f4 REAL, f8 DOUBLE PRECISION, b BOOLEAN, t TEXT, '
+    'd DATE, ts TIMESTAMP, tstz TIMESTAMPTZ'
+)
+
+
+def test_round_microseconds_matches_postgres_rint():
+    """나노초 -> 마이크로초는 버림이 아니라 rint(frac * 1e6) (0.5 는 짝수 쪽)"""
+    ns = (pd.to_datetime(pd.Series(TIMESTAMPS)).to_numpy(dtype='datetime64[ns]')
+          - pg_binary._PG_EPOCH).astype(np.int64)
+    seconds, frac_ns = np.divmod(ns, 10**9)
+    expected = [int(second) * 10**6 + int(np.rint(float(f'0.{frac:09d}') * 1e6))
+                for second, frac in zip(seconds, frac_ns)]
+    assert pg_binary._round_microseconds(ns).tolist() == expected
+    # 0.5 경계는 짝수 쪽, 올림으로 다음 초가 되는 경우
+    micros = pg_binary._round_microseconds(ns) % 10**6
+    assert micros[0] == 123456 and micros[1] == 123458 and micros[4] == 0
+
+
+@pytest.mark.skipif(not PG_TEST_DSN, reason='PG_TEST_DSN 이 없으면 PostgreSQL 테스트 생략')
+def test_binary_copy_matches_csv_copy():
+    """같은 DataFrame 을 바이너리 COPY 와 CSV COPY 로 적재한 결과가 같아야 함"""
+    psycopg2 = pytest.importorskip('psycopg2')
+    df = _sample_frame()
+    columns = list(df.columns)
+    conn = psycopg2.connect(PG_TEST_DSN)
+    try:
+        cur = conn.cursor()
+        cur.execute("SET TIME ZONE 'UTC'")
+        cur.execute(f'CREATE TEMP TABLE pg_binary_bin ({COLUMNS_SQL})')
+        cur.execute(f'CREATE TEMP TABLE pg_binary_csv ({COLUMNS_SQL})')
+
+        kinds = pg_binary.column_types(cur, 'pg_binary_bin', columns)
+        assert None not in kinds
+        pg_binary.copy_binary(cur, 'pg_binary_bin', columns, df, kinds)
+
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+        buffer.seek(0)
+        cur.copy_expert(
+            f"COPY pg_binary_csv ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            buffer
+        )
+
+        order = ', '.join(columns)
+        cur.execute(f'SELECT {order} FROM pg_binary_bin ORDER BY i4')
+        binary_rows = cur.fetchall()
+        cur.execute(f'SELECT {order} FROM pg_binary_csv ORDER BY i4')
+        csv_rows = cur.fetchall()
+        assert len(binary_rows) == len(df)
+        assert binary_rows == csv_rows
+    finally:
+        conn.rollback()
+        conn.close()
@@ -1,6 +1,7 @@
 import pandas as pd
-import psycopg2
-import re
+from excel_cache import read_excel_cached
+from connectDB import get_connection, release_connection
+from survey_transform import parse_birthdates
 
 # ## ----------------- 1. 설정 부분 (사용자 환경에 맞게 수정) ----------------- ##
 
@@ -24,24 +25,12 @@ HEADER_ROW_INDEX = 1  # 엑셀 파일 컬럼명 행
 # ## --------------------------------------------------------------------- ##
 
 
-def parse_birthdate(text):
-    """ 'YYYY년 MM월 DD일 ...' 형식의 문자열에서 날짜만 추출 """
-    try:
-        # 'YYYY년 MM월 DD일' 부분만 추출
-        date_str = re.match(r'\d{4}년 \d{2}월 \d{2}일', str(text))
-        if date_str:
-            return pd.to_datetime(date_str.group(), format='%Y년 %m월 %d일').date()
-    except (ValueError, TypeError):
-        pass
-    return None
-
-
 def process_survey_to_db(file_path, survey_name):
     """ 엑셀 파일을 읽어 4개 테이블에 데이터를 저장하는 메인 함수 """
     conn = None
     try:
         # 데이터베이스 연결
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_connection(DB_CONFIG)  # 프로세스 공용 커넥션 풀에서 꺼내기
         cur = conn.cursor()
         print("데이터베이스에 성공적으로 연결되었습니다.")
 
@@ -54,7 +43,9 @@ def process_survey_to_db(file_path, survey_name):
         print(f"-> Surveys 테이블: '{survey_name}' 등록 완료 (survey_id: {survey_id})")
 
         # 2. 엑셀 파일 읽기
-        df = pd.read_excel(file_path, header=HEADER_ROW_INDEX)
+        df = read_excel_cached(file_path, header=HEADER_ROW_INDEX)
+        # '나이' 컬럼의 생년월일을 한 번에 파싱 (컬럼이 없으면 모든 행이 거부됨)
+        birth_dates, rejected_birth_dates = parse_birthdates(df.reindex(columns=['나이'])['나이'])
         
         # 3. questions 테이블에 문항 정보 저장하고, {컬럼명: question_id} 맵핑 만들기
         question_map = {}
@@ -86,10 +77,10 @@ def process_survey_to_db(file_path, survey_name):
             respondent_uid = row['고유번호']
             gender = row['성별']
             region = row['지역']
-            birthdate = parse_birthdate(row['나이'])
+            birthdate = birth_dates[index]
 
-            # birthdate가 정상적으로 파싱되지 않으면(None이면) 해당 행 건너뛰기
-            if birthdate is None:
+            # birthdate가 정상적으로 파싱되지 않으면 해당 행 건너뛰기
+            if rejected_birth_dates[index]:
                 print(f"INFO: {index + HEADER_ROW_INDEX + 2}번째 행의 '나이' 형식이 잘못되어 건너뜁니다.")
                 continue
             
@@ -137,7 +128,7 @@ def process_survey_to_db(file_path, survey_name):
         # 연결 종료
         if conn:
             cur.close()
-            conn.close()
+            release_connection(conn)  # 닫지 않고 풀에 반환
             print("데이터베이스 연결을 종료했습니다.")
 
 
@@ -1,6 +1,8 @@
 import pandas as pd
-import psycopg2
-import re
+from excel_cache import read_excel_cached
+from connectDB import get_connection, release_connection
+from survey_transform import parse_birthdates
+from user_cache import UserCache
 from datetime import date
 
 # ## ----------------- 1. 설정 부분 (사용자 환경에 맞게 수정) ----------------- ##
@@ -30,17 +32,6 @@ HEADER_ROW_INDEX = 1
 # ## --------------------------------------------------------------------- ##
 
 
-def parse_birthdate(text):
-    """ 'YYYY년 MM월 DD일 ...' 형식의 문자열에서 날짜만 추출 """
-    try:
-        # 'YYYY년 MM월 DD일' 부분만 추출
-        date_str = re.match(r'\d{4}년 \d{2}월 \d{2}일', str(text))
-        if date_str:
-            return pd.to_datetime(date_str.group(), format='%Y년 %m월 %d일').date()
-    except (ValueError, TypeError):
-        pass
-    return None
-
 def process_poll_data_to_db(file_path, poll_title):
     """ 
     엑셀 파일을 읽어 POLLS, USERS, USER_POLL_RESPONSES 테이블에 데이터를 저장하는 메인 함수 
@@ -48,7 +39,7 @@ def process_poll_data_to_db(file_path, poll_title):
     conn = None
     try:
         # 데이터베이스 연결
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_connection(DB_CONFIG)  # 프로세스 공용 커넥션 풀에서 꺼내기
         cur = conn.cursor()
         print("데이터베이스에 성공적으로 연결되었습니다.")
 
@@ -67,13 +58,17 @@ def process_poll_data_to_db(file_path, poll_title):
         print(f"-> POLLS 테이블: '{poll_title}' 등록 완료 (poll_id: {poll_id})")
 
         # 2. 엑셀 파일 읽기
-        df = pd.read_excel(file_path, header=HEADER_ROW_INDEX)
+        df = read_excel_cached(file_path, header=HEADER_ROW_INDEX)
+        # '나이' 컬럼의 생년월일을 한 번에 파싱 (컬럼이 없으면 모든 행이 거부됨)
+        birth_dates, rejected_birth_dates = parse_birthdates(df.reindex(columns=['나이'])['나이'])
         print(f"'{file_path}' 파일에서 총 {len(df)}개의 행을 읽었습니다.")
         
-        # 3. 엑셀 행(row)을 하나씩 읽으며 USERS, USER_POLL_RESPONSES 테이블에 저장
+        # 3. 엑셀 행(row)을 하나씩 읽으며 USERS, USER_POLL_RESPONSES 에 저장할 행 모으기
         inserted_users_count = 0
         updated_users_count = 0
         responses_count = 0
+        user_rows = []
+        response_rows = []
 
         for index, row in df.iterrows():
             # USERS 테이블에 필요한 필수 컬럼 목록
@@ -84,32 +79,19 @@ def process_poll_data_to_db(file_path, poll_title):
                 print(f"INFO: {index + HEADER_ROW_INDEX + 2}번째 행의 사용자 필수 정보가 비어있어 건너뜁니다.")
                 continue
 
-            # 3a. USERS 테이블 처리
+            # 3a. USERS 행 만들기
             user_id = str(row['고유번호']).strip()
             gender = str(row['성별']).strip()
             region = str(row['지역']).strip()
-            birth_date = parse_birthdate(row['나이'])
+            birth_date = birth_dates[index]
 
-            if birth_date is None:
+            if rejected_birth_dates[index]:
                 print(f"INFO: {index + HEADER_ROW_INDEX + 2}번째 행의 '나이' 형식이 잘못되어 건너뜁니다.")
                 continue
             
-            # user_id가 이미 존재하면 정보를 업데이트하고, 없으면 새로 추가
-            cur.execute(
-                """
-                INSERT INTO USERS (user_id, gender, birth_date, region, updated_at) 
-                VALUES (%s, %s, %s, %s, NOW())
-                ON CONFLICT (user_id) 
-                DO UPDATE SET
-                    gender = EXCLUDED.gender,
-                    birth_date = EXCLUDED.birth_date,
-                    region = EXCLUDED.region,
-                    updated_at = NOW();
-                """,
-                (user_id, gender, birth_date, region)
-            )
-            if cur.rowcount > 0:
-                responses_count += 1
+            # USERS 는 반복이 끝난 뒤 기존 값과 비교해서 한 번에 저장
+            user_rows.append((user_id, gender, birth_date, region))
+            responses_count += 1
 
 
             # 3b. USER_POLL_RESPONSES 테이블 처리
@@ -128,18 +110,42 @@ def process_poll_data_to_db(file_path, poll_title):
                 except ValueError:
                     pass # 텍스트 답변은 그대로 사용
 
-                # 동일한 유저가 동일한 설문에 중복 응답한 경우, 최신 응답으로 업데이트
-                cur.execute(
-                    """
-                    INSERT INTO USER_POLL_RESPONSES (user_id, poll_id, response_value, responded_at) 
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (user_id, poll_id)
-                    DO UPDATE SET
-                        response_value = EXCLUDED.response_value,
-                        responded_at = EXCLUDED.responded_at;
-                    """,
-                    (user_id, poll_id, final_answer, responded_at)
-                )
+                response_rows.append((user_id, poll_id, final_answer, responded_at))
+
+        # 3c. USERS 테이블 처리 - 새 사용자 / 값이 바뀐 사용자만
+        # user_id가 이미 존재하면 정보를 업데이트하고, 없으면 새로 추가
+        users = pd.DataFrame(user_rows, columns=['user_id', 'gender', 'birth_date', 'region'])
+        changed_users = UserCache(cur).pending(users)
+        for user_row in changed_users.itertuples(index=False, name=None):
+            cur.execute(
+                """
+                INSERT INTO USERS (user_id, gender, birth_date, region, updated_at) 
+                VALUES (%s, %s, %s, %s, NOW())
+                ON CONFLICT (user_id) 
+                DO UPDATE SET
+                    gender = EXCLUDED.gender,
+                    birth_date = EXCLUDED.birth_date,
+                    region = EXCLUDED.region,
+                    updated_at = NOW();
+                """,
+                user_row
+            )
+        print(f"-> USERS {len(users)}행 중 {len(changed_users)}행을 새로 쓰거나 갱신했습니다.")
+
+        # 3d. USER_POLL_RESPONSES 테이블 처리
+        # 동일한 유저가 동일한 설문에 중복 응답한 경우, 최신 응답으로 업데이트
+        for response_row in response_rows:
+            cur.execute(
+                """
+                INSERT INTO USER_POLL_RESPONSES (user_id, poll_id, response_value, responded_at) 
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (user_id, poll_id)
+                DO UPDATE SET
+                    response_value = EXCLUDED.response_value,
+                    responded_at = EXCLUDED.responded_at;
+                """,
+                response_row
+            )
 
         # 모든 작업이 성공하면 변경사항을 DB에 최종 반영
         conn.commit()
@@ -159,7 +165,7 @@ def process_poll_data_to_db(file_path, poll_title):
         # 연결 종료
         if conn:
             cur.close()
-            conn.close()
+            release_connection(conn)  # 닫지 않고 풀에 반환
             print("데이터베이스 연결을 종료했습니다.")
 
 
@@ -1,6 +1,9 @@
 import pandas as pd
-import psycopg2
-import re
+from workbook import SurveyWorkbook
+from connectDB import get_connection, release_connection
+from bulk_loader import bulk_upsert
+from survey_transform import build_user_frame, explode_multi_answers
+from user_cache import UserCache
 
 # ## ----------------- 1. 설정 부분 (사용자 환경에 맞게 수정) ----------------- ##
 
@@ -31,16 +34,6 @@ OPTIONS_START_CELL_LOCATION = (1, 1)
 # ## --------------------------------------------------------------------- ##
 
 
-def parse_birthdate(text):
-    """ 'YYYY년 MM월 DD일 ...' 형식의 문자열에서 날짜만 추출 """
-    try:
-        date_str = re.match(r'\d{4}년 \d{2}월 \d{2}일', str(text))
-        if date_str:
-            return pd.to_datetime(date_str.group(), format='%Y년 %m월 %d일').date()
-    except (ValueError, TypeError):
-        pass
-    return None
-
 def process_profile_data_to_db(file_path):
     """ 
     엑셀 파일의 두 시트를 읽어 다중 답변을 처리하여 DB에 저장하는 메인 함수
@@ -48,12 +41,16 @@ def process_profile_data_to_db(file_path):
     conn = None
     try:
         # --- 1. 데이터베이스 연결 ---
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_connection(DB_CONFIG)  # 프로세스 공용 커넥션 풀에서 꺼내기
         cur = conn.cursor()
         print("데이터베이스에 성공적으로 연결되었습니다.")
 
+        # 질문 시트와 응답 시트를 파일 한 번만 열어서 읽기
+        with SurveyWorkbook(file_path) as workbook:
+            df_info = workbook.read_sheet(SHEET_QUESTION_INFO, header=None)
+            df_responses = workbook.read_sheet(SHEET_RESPONSES, header=HEADER_ROW_RESPONSES)
+
         # --- 2. 시트2에서 질문(Question) 및 선택지(Options) 정보 읽기 ---
-        df_info = pd.read_excel(file_path, sheet_name=SHEET_QUESTION_INFO, header=None)
         
         # 2a. PROFILE_QUESTIONS 테이블에 질문 저장
         question_text = df_info.iloc[QUESTION_CELL_LOCATION[0], QUESTION_CELL_LOCATION[1]]
@@ -90,20 +87,13 @@ def process_profile_data_to_db(file_path):
         print(f"-> PROFILE_ANSWER_OPTIONS 테이블에 {option_count}개의 선택지 처리 완료.")
         
         # --- 3. 시트1에서 사용자 응답(Responses) 정보 읽고 DB에 저장 ---
-        df_responses = pd.read_excel(file_path, sheet_name=SHEET_RESPONSES, header=HEADER_ROW_RESPONSES)
         print(f"'{file_path}' (시트: {SHEET_RESPONSES}) 파일에서 총 {len(df_responses)}개의 응답 행을 읽었습니다.")
 
-        for index, row in df_responses.iterrows():
-            # 3a. USERS 테이블 처리 (변경 없음)
-            essential_cols = ['고유번호', '성별', '나이', '지역']
-            if any(pd.isna(row.get(col)) for col in essential_cols):
-                continue
-
-            user_id = str(row['고유번호']).strip()
-            birth_date = parse_birthdate(row['나이'])
-            if birth_date is None:
-                continue
-
+        # 3a. USERS 테이블 처리 (필수 정보가 비었거나 생년월일 형식이 잘못된 행 제외)
+        user_rows = build_user_frame(df_responses)
+        # 기존 USERS 와 값이 같은 사용자는 건너뛰고 새 사용자 / 바뀐 사용자만 저장
+        changed_users = UserCache(cur).pending(user_rows)
+        for user_row in changed_users.itertuples(index=False, name=None):
             cur.execute(
                 """
                 INSERT INTO USERS (user_id, gender, birth_date, region, updated_at) 
@@ -112,35 +102,26 @@ def process_profile_data_to_db(file_path):
                     gender = EXCLUDED.gender, birth_date = EXCLUDED.birth_date,
                     region = EXCLUDED.region, updated_at = NOW();
                 """,
-                (user_id, str(row['성별']).strip(), birth_date, str(row['지역']).strip())
+                user_row
             )
 
-            # ####################################################################
-            # ### 3b. USER_PROFILE_ANSWERS 테이블 처리 (핵심 변경 부분) ###
-            # ####################################################################
-            answer_value_raw = row.get(ANSWER_COLUMN_NAME)
-            answered_at = row.get('설문일시')
-
-            if pd.notna(answer_value_raw) and str(answer_value_raw).strip():
-                # 쉼표(,)를 기준으로 답변들을 분리하여 리스트로 만듭니다. (예: '2, 1' -> ['2', '1'])
-                answers = str(answer_value_raw).split(',')
-
-                # 분리된 각 답변에 대해 반복 작업을 수행합니다.
-                for single_answer in answers:
-                    final_answer = single_answer.strip() # 답변 앞뒤의 공백 제거
-                    
-                    if not final_answer: # 값이 비어있으면 건너뛰기
-                        continue
-
-                    # 각 답변을 별도의 행으로 INSERT 합니다.
-                    cur.execute(
-                        """
-                        INSERT INTO USER_PROFILE_ANSWERS (user_id, question_id, answer_value, answered_at)
-                        VALUES (%s, %s, %s, %s)
-                        ON CONFLICT (user_id, question_id, answer_value) DO NOTHING;
-                        """,
-                        (user_id, question_id, final_answer, answered_at)
-                    )
+        print(f"-> USERS {len(user_rows)}행 중 {len(changed_users)}행을 새로 쓰거나 갱신했습니다.")
+
+        # ####################################################################
+        # ### 3b. USER_PROFILE_ANSWERS 테이블 처리 (핵심 변경 부분) ###
+        # ####################################################################
+        # 쉼표(,)로 구분된 답변을 한 번에 한 행씩 펼칩니다. (예: '2, 1' -> '2', '1' 두 행)
+        answer_rows = explode_multi_answers(
+            df_responses.loc[user_rows.index], {ANSWER_COLUMN_NAME: question_id}, '고유번호',
+            extra_columns={'설문일시': 'answered_at'}
+        )
+        # 펼친 답변 전체를 COPY 로 한 번에 적재 (같은 답변은 첫 번째 행 유지 = 기존 DO NOTHING 과 동일)
+        bulk_upsert(
+            cur, 'USER_PROFILE_ANSWERS', ['user_id', 'question_id', 'answer_value', 'answered_at'], answer_rows,
+            conflict_columns=['user_id', 'question_id', 'answer_value'],
+            keep='first'
+        )
+        print(f"-> USER_PROFILE_ANSWERS {len(answer_rows)}행 처리를 완료했습니다.")
 
         # --- 4. 최종 커밋 ---
         conn.commit()
@@ -156,7 +137,7 @@ def process_profile_data_to_db(file_path):
     finally:
         if conn:
             cur.close()
-            conn.close()
+            release_connection(conn)  # 닫지 않고 풀에 반환
             print("데이터베이스 연결을 종료했습니다.")
 
 if __name__ == "__main__":
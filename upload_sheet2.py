@@ -1,5 +1,6 @@
 import pandas as pd
-import psycopg2
+from excel_cache import read_excel_cached
+from connectDB import get_connection, release_connection
 import re
 
 # ## ----------------- 1. 설정 부분 (사용자 환경에 맞게 수정) ----------------- ##
@@ -38,13 +39,13 @@ def process_question_sheet_to_db(file_path):
     conn = None
     try:
         # --- 1. 데이터베이스 연결 ---
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_connection(DB_CONFIG)  # 프로세스 공용 커넥션 풀에서 꺼내기
         cur = conn.cursor()
         print("데이터베이스에 성공적으로 연결되었습니다.")
 
         # --- 2. 엑셀 파일의 두 번째 시트 읽기 ---
         # header=None: 시트의 첫 줄을 컬럼명으로 인식하지 않고, 데이터 그대로 읽어옴
-        df_info = pd.read_excel(file_path, sheet_name=SHEET_QUESTION_INFO, header=None)
+        df_info = read_excel_cached(file_path, sheet_name=SHEET_QUESTION_INFO, header=None)
         print(f"'{file_path}' 파일의 시트(인덱스: {SHEET_QUESTION_INFO})를 성공적으로 읽었습니다.")
         
         # --- 3. PROFILE_QUESTIONS 테이블에 질문 저장 ---
@@ -110,7 +111,7 @@ def process_question_sheet_to_db(file_path):
     finally:
         if conn:
             cur.close()
-            conn.close()
+            release_connection(conn)  # 닫지 않고 풀에 반환
             print("데이터베이스 연결을 종료했습니다.")
 
 
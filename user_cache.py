@@ -0,0 +1,88 @@
+"""
+USERS 차원 캐시
+
+업로드할 때마다 응답 행 전부에 INSERT ... ON CONFLICT DO UPDATE 를 실행하면
+값이 그대로인 사용자도 매번 갱신되어(updated_at = NOW()) WAL 과 dead tuple 만 늘어난다.
+기존 USERS 를 COPY 로 한 번 읽어 두고 들어온 사용자와 컬럼 단위로 비교해서
+새 사용자 / 값이 바뀐 사용자만 DB 에 쓴다.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+# user_id 외에 비교하는 USERS 컬럼
+USER_ATTRIBUTES = ['gender', 'birth_date', 'region']
+
+
+class UserCache:
+    """USERS 테이블 (user_id -> gender, birth_date, region) 메모리 캐시"""
+
+    def __init__(self, cur, table='USERS'):
+        self.table = table
+        self.users = self._load(cur)
+
+    def _load(self, cur):
+        """기존 USERS 를 COPY 한 번으로 읽기 (성별/지역은 category 로 작게 보관)"""
+        buffer = io.StringIO()
+        cur.copy_expert(
+            f"COPY (SELECT user_id, gender, to_char(birth_date, 'YYYY-MM-DD'), region FROM {self.table}) "
+            "TO STDOUT WITH (FORMAT csv, NULL '\\N')",
+            buffer
+        )
+        buffer.seek(0)
+        users = pd.read_csv(
+            buffer, names=['user_id'] + USER_ATTRIBUTES, dtype=str,
+            keep_default_na=False, na_values=['\\N']
+        )
+        users['gender'] = users['gender'].astype('category')
+        users['region'] = users['region'].astype('category')
+        users['birth_date'] = pd.to_datetime(users['birth_date'], format='%Y-%m-%d')
+        return users.set_index('user_id')
+
+    def __len__(self):
+        return len(self.users)
+
+    def pending(self, users, update=True, keep=None):
+        """
+        들어온 USERS 행 중 DB 에 써야 하는 행만 반환
+        update=True : 새 사용자 + 값이 바뀐 사용자 (ON CONFLICT DO UPDATE 용, 같은 user_id 는 마지막 행)
+        update=False: 새 사용자만 (ON CONFLICT DO NOTHING 용, 같은 user_id 는 첫 행)
+        users 에 없는 속성 컬럼은 비교하지 않음
+        """
+        keep = keep or ('last' if update else 'first')
+        users = users.drop_duplicates('user_id', keep=keep)
+        is_new = ~users['user_id'].isin(self.users.index).to_numpy()
+        if not update:
+            return users[is_new]
+
+        stored = self.users.reindex(users['user_id'])
+        changed = np.zeros(len(users), dtype=bool)
+        for col in USER_ATTRIBUTES:
+            if col not in users.columns:
+                continue
+            if col == 'birth_date':
+                incoming = pd.to_datetime(users[col]).to_numpy(dtype='datetime64[ns]')
+                current = stored[col].to_numpy(dtype='datetime64[ns]')
+                same = (incoming == current) | (np.isnat(incoming) & np.isnat(current))
+            else:
+                incoming = users[col].to_numpy(dtype=object)
+                current = stored[col].to_numpy(dtype=object)
+                same = (incoming == current) | (pd.isna(incoming) & pd.isna(current))
+            changed |= ~same
+        return users[is_new | changed]
+
+    def remember(self, users):
+        """DB 에 쓴 행을 캐시에 반영 (같은 프로세스의 다음 업로드에서 다시 쓰지 않도록)"""
+        if users.empty:
+            return
+        rows = users.set_index('user_id').reindex(columns=USER_ATTRIBUTES)
+        # 속성 없이 user_id 만 쓴 경우(DO NOTHING)에는 기존 값을 유지
+        rows = rows.combine_first(self.users.reindex(rows.index))
+        rows['birth_date'] = pd.to_datetime(rows['birth_date'])
+        labels = {'gender': object, 'region': object}
+        kept = self.users.drop(index=rows.index, errors='ignore').astype(labels)
+        merged = pd.concat([kept, rows.astype(labels)])
+        merged['gender'] = merged['gender'].astype('category')
+        merged['region'] = merged['region'].astype('category')
+        self.users = merged
@@ -1,5 +1,10 @@
 import pandas as pd
-import psycopg2
+from workbook import SurveyWorkbook
+from connectDB import get_connection, release_connection
+from bulk_loader import bulk_upsert
+from survey_transform import explode_multi_answers
+from user_cache import UserCache
+from checkpoint import ChunkedImport
 import re
 from datetime import date
 
@@ -20,19 +25,57 @@ SHEET_LABEL = 'label'    # 질문/선택지 정보 시트 이름
 # 리스트가 비어있으면 모든 질문을 처리합니다.
 QUESTIONS_TO_PROCESS = ['Q1', 'Q5', 'Q5_1', 'Q6','Q7','Q9_1','Q9_2','Q10','Q11_1','Q11_2'] 
 
+# 전체를 한 트랜잭션으로 적재할지 여부
+# True : 기존처럼 전부 성공하거나 전부 롤백 (기본값)
+# False: 사용자 단위 청크(checkpoint.CHECKPOINT_CHUNK_ROWS 행)마다 커밋하고 체크포인트를 남김 (큰 파일에서 선택)
+#        -> 도중에 실패해도 다시 실행하면 마지막으로 커밋한 청크 다음부터 이어서 적재
+#        -> 대신 도중에 실패하면 앞 청크까지만 반영된 상태가 DB 에 남음
+ATOMIC_IMPORT = True
+
+def save_poll_responses(cur, df_chunk, user_ids, question_columns, question_map):
+    """
+    USER_POLL_RESPONSES 저장. 응답이 비어 있지 않은 (사용자, 질문) 칸마다 한 행, 저장한 응답 행 DataFrame 반환
+    같은 (user_id, poll_id) 는 마지막 행이 남고, responded_at 은 처음 저장할 때만 현재 시각으로 채움
+    """
+    columns = ['user_id', 'poll_id', 'response_value', 'responded_at']
+    if not question_columns:
+        return pd.DataFrame(columns=columns)
+    # stack 은 행 순서 -> 질문 순서로 펼침 (기존 행 단위 INSERT 순서와 같음)
+    cells = df_chunk.loc[user_ids != '', [col.lower() for col in question_columns]].stack().str.strip()
+    cells = cells[cells != '']
+    # NOW() 와 같은 값 (트랜잭션 시작 시각, 세션 시간대 기준)
+    cur.execute("SELECT LOCALTIMESTAMP;")
+    responded_at = cur.fetchone()[0]
+    response_rows = pd.DataFrame({
+        'user_id': user_ids.loc[cells.index.get_level_values(0)].to_numpy(),
+        'poll_id': [question_map[col.upper()]['poll_id'] for col in cells.index.get_level_values(1)],
+        'response_value': cells.to_numpy(),
+        'responded_at': responded_at
+    }, columns=columns)
+    # 이미 있는 응답은 값만 바꾸고 responded_at 은 그대로 둠
+    bulk_upsert(
+        cur, 'USER_POLL_RESPONSES', columns, response_rows,
+        conflict_columns=['user_id', 'poll_id'],
+        update_columns=['response_value'],
+        keep='last'
+    )
+    return response_rows
+
 def process_survey_from_excel(cur, file_path):
     """
     세로 블록 형태의 질문/응답 엑셀 파일을 읽어 정규화된 DB에 저장합니다.
     다중 선택 답변(쉼표 구분)을 처리하여 개별 행으로 저장하고, 진행 상황을 표시합니다.
     """
     
+    # 'label' 시트와 'data' 시트를 파일 한 번만 열어서 읽기
+    workbook = SurveyWorkbook(file_path)
+
     # === 1. 질문/선택지 시트('label') 처리 ===
     print("-> [1/2] 'label' 시트에서 질문/선택지 정보를 읽어 DB에 저장합니다...")
     try:
         # --- [최종 수정] 세 번째 열('문항 유형')까지 읽도록 수정 ---
-        df_label = pd.read_excel(
-            file_path, 
-            sheet_name=SHEET_LABEL, 
+        df_label = workbook.read_sheet(
+            SHEET_LABEL, 
             skiprows=1, 
             header=None, 
             names=['id', 'text', 'type'], # 컬럼 이름에 'type' 추가
@@ -42,6 +85,7 @@ def process_survey_from_excel(cur, file_path):
         ).fillna('')
     except Exception as e:
         print(f"\n[치명적 오류] 'label' 시트를 읽는 중 오류가 발생했습니다: {e}")
+        workbook.close()
         return
 
     question_map = {} 
@@ -110,7 +154,8 @@ def process_survey_from_excel(cur, file_path):
 
     # === 2. 사용자 응답 시트('data') 처리 ===
     print("-> [2/2] 'data' 시트에서 사용자 응답을 읽어 DB에 저장합니다...")
-    df_responses = pd.read_excel(file_path, sheet_name=SHEET_RESPONSES, header=0, dtype=str).fillna('')
+    df_responses = workbook.read_sheet(SHEET_RESPONSES, header=0, dtype=str).fillna('')
+    workbook.close()
     df_responses.columns = [str(col).lower() for col in df_responses.columns]
     question_columns = [col.upper() for col in df_responses.columns if col.upper() in question_map]
     
@@ -118,53 +163,60 @@ def process_survey_from_excel(cur, file_path):
     if question_columns:
         print(f"-> 처리 대상 질문: {question_columns}")
 
-    total_rows = len(df_responses)
-    for index, row in df_responses.iterrows():
-        if (index + 1) % 1000 == 0:
-            print(f"  ... {index + 1} / {total_rows} 행 처리 중 ...")
-
-        user_id = row.get('mb_sn', '').strip()
-        if not user_id: continue
-
-        cur.execute("INSERT INTO USERS (user_id) VALUES (%s) ON CONFLICT (user_id) DO NOTHING;", (user_id,))
-
-        for question_id_upper in question_columns:
-            question_id_lower = question_id_upper.lower()
-            answer_value_raw = row.get(question_id_lower, '').strip()
-
-            if not answer_value_raw: continue
+    has_users = 'mb_sn' in df_responses.columns
+    user_ids = df_responses['mb_sn'].str.strip() if has_users else pd.Series('', index=df_responses.index)
+    # 사용자 단위 청크마다 커밋 (ATOMIC_IMPORT 이면 한 번에), 체크포인트가 있으면 이어서 적재
+    plan = ChunkedImport(
+        cur, file_path, SHEET_RESPONSES, f"WELCOME:{','.join(QUESTIONS_TO_PROCESS)}", user_ids,
+        atomic=ATOMIC_IMPORT
+    )
+    cache = UserCache(cur) if has_users else None
+    new_user_count = 0
+    response_count = 0
+    answer_count = 0
 
-            answers = [ans.strip() for ans in answer_value_raw.split(',')]
-            poll_id = question_map[question_id_upper]['poll_id']
-
-            cur.execute(
-                "INSERT INTO USER_POLL_RESPONSES (user_id, poll_id, response_value, responded_at) VALUES (%s, %s, %s, NOW()) ON CONFLICT (user_id, poll_id) DO UPDATE SET response_value = EXCLUDED.response_value;",
-                (user_id, poll_id, answer_value_raw)
+    total_rows = len(df_responses)
+    processed_rows = 0
+    for chunk, chunk_users in plan.pending_chunks():
+        df_chunk = df_responses[user_ids.isin(chunk_users)]
+        processed_rows += len(df_chunk)
+        print(f"  ... {processed_rows} / {total_rows} 행 처리 중 ...")
+
+        # USERS 는 user_id 만 DO NOTHING 으로 저장하므로 DB 에 없는 사용자만 적재
+        if has_users:
+            chunk_ids = df_chunk['mb_sn'].str.strip()
+            new_users = cache.pending(pd.DataFrame({'user_id': chunk_ids[chunk_ids != '']}), update=False)
+            bulk_upsert(cur, 'USERS', ['user_id'], new_users, conflict_columns=['user_id'], keep='first')
+            new_user_count += len(new_users)
+
+            # 응답이 있는 (사용자, 질문) 칸만 행 순서 -> 질문 순서로 펼쳐서 USER_POLL_RESPONSES 에 적재
+            response_rows = save_poll_responses(cur, df_chunk, chunk_ids, question_columns, question_map)
+            response_count += len(response_rows)
+
+        # 다중 선택 답변을 한 번에 한 행씩 펼침 (선택지 텍스트 -> 코드, '4.0' -> '4')
+        if has_users:
+            df_answered = df_chunk[df_chunk['mb_sn'].str.strip() != '']
+            answer_rows = explode_multi_answers(
+                df_answered, {col.lower(): col for col in question_columns}, 'mb_sn',
+                normalize_codes=True, code_map=code_map
             )
+            bulk_upsert(
+                cur, 'USER_PROFILE_ANSWERS', ['user_id', 'question_id', 'answer_value'], answer_rows,
+                conflict_columns=['user_id', 'question_id', 'answer_value'],
+                keep='first'
+            )
+            answer_count += len(answer_rows)
 
-            for single_answer in answers:
-                if not single_answer: continue
-                clean_answer = single_answer
-                
-                if (question_id_upper, clean_answer) in code_map:
-                    clean_answer = code_map[(question_id_upper, clean_answer)]
-                
-                try:
-                    clean_answer = str(int(float(clean_answer)))
-                except ValueError:
-                    pass
-                
-                cur.execute(
-                    """
-                    INSERT INTO USER_PROFILE_ANSWERS (user_id, question_id, answer_value) 
-                    VALUES (%s, %s, %s) 
-                    ON CONFLICT (user_id, question_id, answer_value) DO NOTHING;
-                    """,
-                    (user_id, question_id_upper, clean_answer)
-                )
+        plan.commit(chunk)
+    plan.finish()
+
+    if has_users:
+        print(f"-> 새 사용자 {new_user_count}명을 USERS 에 추가했습니다.")
+        print(f"-> USER_POLL_RESPONSES {response_count}행 처리를 완료했습니다.")
+        print(f"-> USER_PROFILE_ANSWERS {answer_count}행 처리를 완료했습니다.")
 
     if total_rows > 0:
-      print(f"-> 'data' 시트 처리 완료. {index + 1}번째 행까지 처리했습니다.")
+      print(f"-> 'data' 시트 처리 완료. {total_rows}개 행을 처리했습니다.")
     else:
       print("-> 'data' 시트에 처리할 데이터가 없습니다.")
 
@@ -173,7 +225,7 @@ def process_survey_from_excel(cur, file_path):
 if __name__ == "__main__":
     conn = None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_connection(DB_CONFIG)  # 프로세스 공용 커넥션 풀에서 꺼내기
         cur = conn.cursor()
         print("데이터베이스에 성공적으로 연결되었습니다.\n")
         
@@ -187,11 +239,15 @@ if __name__ == "__main__":
     except Exception as e:
         if conn:
             conn.rollback()
-        print(f"\n오류가 발생하여 작업을 취소하고 롤백했습니다.\n에러: {e}")
+        if ATOMIC_IMPORT:
+            print(f"\n오류가 발생하여 작업을 취소하고 롤백했습니다.\n에러: {e}")
+        else:
+            print(f"\n오류가 발생하여 마지막 커밋 이후의 작업을 롤백했습니다.\n에러: {e}")
+            print("다시 실행하면 커밋한 청크 다음부터 이어서 적재합니다.")
 
     finally:
         if conn:
             cur.close()
-            conn.close()
+            release_connection(conn)  # 닫지 않고 풀에 반환
             print("데이터베이스 연결을 종료했습니다.")
 
@@ -0,0 +1,54 @@
+"""
+여러 시트를 읽는 엑셀 파일을 한 번만 여는 워크북 클래스
+
+pd.read_excel 을 시트마다 따로 호출하면 호출할 때마다 zip 압축 해제와
+공유 문자열(shared strings) 테이블 파싱을 처음부터 다시 한다.
+SurveyWorkbook 은 파일을 한 번 열어(pd.ExcelFile) 질문 시트, 응답 시트를
+필요할 때 꺼내 주므로 시트당 비용은 그 시트 크기만큼만 든다.
+이미 캐시(excel_cache)에 있는 시트는 파일을 열지 않고 캐시에서 바로 읽는다.
+"""
+import pandas as pd
+
+from excel_cache import read_excel_cached
+
+
+class SurveyWorkbook:
+    """엑셀 파일을 한 번 열어 시트를 필요할 때마다 DataFrame 으로 반환하는 클래스"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._excel_file = None  # 캐시에 없는 시트를 처음 읽을 때 연다
+
+    def _open(self):
+        """파일 열기 (zip/공유 문자열 파싱은 여기서 한 번만)"""
+        if self._excel_file is None:
+            self._excel_file = pd.ExcelFile(self.file_path, engine='openpyxl')
+        return self._excel_file
+
+    def read_sheet(self, sheet_name=0, **read_options):
+        """시트 하나를 pd.read_excel 과 같은 옵션으로 읽기"""
+        return read_excel_cached(
+            self.file_path, sheet_name=sheet_name, excel_file=_LazyExcelFile(self), **read_options
+        )
+
+    def close(self):
+        """열어 둔 파일 닫기"""
+        if self._excel_file is not None:
+            self._excel_file.close()
+            self._excel_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _LazyExcelFile:
+    """캐시에 없어 실제로 파싱할 때만 워크북 파일을 열도록 parse 호출을 늦추는 래퍼"""
+
+    def __init__(self, workbook):
+        self._workbook = workbook
+
+    def parse(self, sheet_name, **read_options):
+        return self._workbook._open().parse(sheet_name, **read_options)